@@ -0,0 +1,200 @@
+"""
+Auditoría de la cadena: verificación de un bloque y auditoría paralela por tramos.
+
+En modo paralelo la cadena se divide en tramos de `AUDIT_SHARD_SIZE` bloques que se
+reparten entre varios procesos. Cada tramo recibe solo el hash del bloque anterior a
+su inicio, de modo que el enlace en la frontera entre tramos se comprueba sin enviar
+bloques adicionales. Dentro de cada proceso los bloques del tramo se auditan en orden
+con `verify_block`, que valida las firmas una transacción tras otra (`Transaction.is_valid`).
+
+Los procesos comparten el menor índice fallido encontrado hasta el momento: cada uno
+se detiene en cuanto sobrepasa ese índice, así que nunca se descarta un fallo anterior
+y el error reportado es el mismo que daría la auditoría secuencial.
+"""
+
+import math
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from exceptions import InvalidBlockError, InvalidTransactionError
+from mining import resolve_workers
+from utils import AUDIT_SHARD_SIZE, MAX_FUTURE_BLOCK_TIME
+
+# Sin fallos conocidos, el índice compartido vale este centinela.
+_NO_FAILURE = 2 ** 62
+
+# Menor índice fallido, compartido entre procesos (se asigna en `_init_worker`).
+_lowest_failure = None
+
+
+def check_timestamp(block, median_time):
+    """
+    La marca de tiempo de un bloque debe ser un número posterior a `median_time` (la
+    mediana de los bloques anteriores, ver `difficulty.median_time_past`) y no adelantarse
+    más de `MAX_FUTURE_BLOCK_TIME` al reloj local. Lanza `InvalidBlockError`.
+    """
+    timestamp = block.timestamp
+    if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)) or not math.isfinite(timestamp):
+        raise InvalidBlockError(f"La marca de tiempo del bloque {block.index} no es válida.")
+    if timestamp <= median_time:
+        raise InvalidBlockError(
+            f"La marca de tiempo del bloque {block.index} no es posterior a la mediana de los bloques anteriores."
+        )
+    if timestamp > time.time() + MAX_FUTURE_BLOCK_TIME:
+        raise InvalidBlockError(f"La marca de tiempo del bloque {block.index} está demasiado en el futuro.")
+
+
+def verify_block(current_block, previous_hash, expected_target=None, median_time=None):
+    """
+    Verifica un bloque de la cadena dado el hash del bloque anterior.
+    1. Verifica la integridad de su raíz de Merkle.
+    2. Verifica la integridad del hash del bloque.
+    3. Verifica el enlace con el bloque anterior.
+    4. Verifica que lleve el objetivo de dificultad que le corresponde (si se indica
+       `expected_target`) y que su hash lo cumpla (prueba de trabajo).
+    5. Verifica su marca de tiempo (si se indica `median_time`, ver `check_timestamp`).
+    6. Verifica la validez de cada transacción del bloque.
+    En un bloque podado (solo cabecera) se omiten los pasos 1 y 6.
+    Lanza `InvalidBlockError` ante el primer fallo.
+    """
+    pruned = current_block.transactions is None
+
+    # 1. ¿La raíz de Merkle corresponde a las transacciones del bloque?
+    if not pruned and current_block.merkle_root != current_block.calculate_merkle_root():
+        raise InvalidBlockError(
+            f"La raíz de Merkle del bloque {current_block.index} no coincide con sus transacciones."
+        )
+
+    # 2. ¿El hash del bloque es correcto?
+    if current_block.hash != current_block.calculate_hash():
+        raise InvalidBlockError(f"Hash del bloque {current_block.index} es inválido.")
+
+    # 3. ¿El puntero al hash anterior es correcto?
+    if current_block.previous_hash != previous_hash:
+        raise InvalidBlockError(
+            f"Enlace roto: El hash previo del bloque {current_block.index} "
+            f"no coincide con el hash del bloque {current_block.index - 1}."
+        )
+
+    # 4. ¿El objetivo es el que corresponde y el hash lo cumple?
+    if expected_target is not None and current_block.target != expected_target:
+        raise InvalidBlockError(
+            f"El bloque {current_block.index} no lleva el objetivo de dificultad que le corresponde."
+        )
+    if not current_block.meets_target():
+        raise InvalidBlockError(f"El hash del bloque {current_block.index} no cumple su objetivo de dificultad.")
+
+    # 5. ¿La marca de tiempo es posterior a la mediana reciente y no está en el futuro?
+    if median_time is not None:
+        check_timestamp(current_block, median_time)
+
+    # 6. ¿Todas las transacciones en el bloque son válidas?
+    for tx in current_block.transactions or ():
+        try:
+            # Se vuelve a validar cada transacción como parte de la auditoría
+            tx.is_valid()
+        except InvalidTransactionError as e:
+            raise InvalidBlockError(f"Transacción inválida en bloque {current_block.index}: {e}")
+
+
+def verify_header(header, height, previous_hash, expected_target, median_time=None):
+    """
+    Verifica una cabecera suelta (sin transacciones): su altura, el enlace con la anterior,
+    su hash, que lleve el objetivo esperado y que su hash lo cumpla y, si se indica
+    `median_time`, su marca de tiempo (ver `check_timestamp`).
+    Lanza `InvalidBlockError` ante el primer fallo.
+    """
+    if header.index != height:
+        raise InvalidBlockError(f"Cabecera fuera de orden: se esperaba la altura {height}.")
+    if header.previous_hash != previous_hash:
+        raise InvalidBlockError(f"La cabecera {height} no enlaza con la cadena local.")
+    if header.hash != header.calculate_hash():
+        raise InvalidBlockError(f"El hash de la cabecera {height} no es válido.")
+    if header.target != expected_target:
+        raise InvalidBlockError(f"La cabecera {height} no lleva el objetivo de dificultad esperado.")
+    if not header.meets_target():
+        raise InvalidBlockError(f"La cabecera {height} no cumple su objetivo de dificultad.")
+    if median_time is not None:
+        check_timestamp(header, median_time)
+
+
+def _init_worker(lowest_failure):
+    global _lowest_failure
+    _lowest_failure = lowest_failure
+
+
+def _audit_shard(blocks, previous_hash, targets, median_times):
+    """
+    Audita un tramo de bloques consecutivos (`targets` son sus objetivos esperados y
+    `median_times`, las medianas de tiempo que debe superar cada uno).
+    Retorna `None` si todo es válido (o si se detuvo porque otro proceso ya encontró un
+    fallo anterior) y `(índice, mensaje)` si falla.
+    """
+    for block, target, median_time in zip(blocks, targets, median_times):
+        if block.index > _lowest_failure.value:
+            return None
+        try:
+            verify_block(block, previous_hash, target, median_time)
+        except InvalidBlockError as e:
+            with _lowest_failure.get_lock():
+                if block.index < _lowest_failure.value:
+                    _lowest_failure.value = block.index
+            return (block.index, str(e))
+        previous_hash = block.hash
+    return None
+
+
+def audit_chain_parallel(chain, workers=None, progress=None, shard_size=AUDIT_SHARD_SIZE, expected_target=None,
+                         median_time=None):
+    """
+    Audita `chain` (a partir del bloque 1) repartiendo tramos entre `workers` procesos.
+    Lanza `InvalidBlockError` con el fallo de menor índice; retorna `True` si es válida.
+    `progress(checked, total)` se invoca cada vez que termina un tramo.
+    `expected_target(altura)` da el objetivo que debe llevar cada bloque y `median_time(altura)`,
+    la mediana de tiempo que debe superar; se calculan en este proceso porque dependen de
+    bloques de tramos anteriores.
+    """
+    workers = resolve_workers(workers)
+    total = len(chain) - 1
+    starts = list(range(1, len(chain), shard_size))
+
+    ctx = multiprocessing.get_context()
+    lowest_failure = ctx.Value('q', _NO_FAILURE)
+    failures = []
+    checked = 0
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(lowest_failure,)
+    ) as executor:
+        in_flight = {}
+        next_shard = 0
+        while next_shard < len(starts) or in_flight:
+            # Se limita el número de tramos en vuelo para no serializar toda la cadena de golpe.
+            while next_shard < len(starts) and len(in_flight) < workers * 2:
+                start = starts[next_shard]
+                if start > lowest_failure.value:
+                    next_shard = len(starts)
+                    break
+                end = min(start + shard_size, len(chain))
+                blocks = [chain[i] for i in range(start, end)]
+                targets = [expected_target(i) if expected_target else None for i in range(start, end)]
+                median_times = [median_time(i) if median_time else None for i in range(start, end)]
+                future = executor.submit(_audit_shard, blocks, chain[start - 1].hash, targets, median_times)
+                in_flight[future] = end - start
+                next_shard += 1
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                checked += in_flight.pop(future)
+                result = future.result()
+                if result is not None:
+                    failures.append(result)
+                if progress:
+                    progress(min(checked, total), total)
+
+    if failures:
+        _, message = min(failures)
+        raise InvalidBlockError(message)
+    return True
@@ -0,0 +1,99 @@
+"""
+Compara la admisión de transacciones una a una (`add_transaction` en un bucle) con la
+admisión por lotes (`add_transactions`) para varios tamaños de lote. Cada medición parte
+de una cadena nueva con las cachés de firmas vacías, y las transacciones se firman antes
+de medir. Una fracción `--invalid` de cada lote lleva la firma alterada o gasta más de lo
+que tiene, para que ambos caminos también paguen los rechazos.
+
+Uso:
+    python benchmarks/bench_batch_tx.py [--batch-sizes 100 1000] [--senders 20] [--workers N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from blockchain import Block, Blockchain, Transaction  # noqa: E402
+from exceptions import BlockchainError  # noqa: E402
+from mining import resolve_workers  # noqa: E402
+from sigcache import clear_caches  # noqa: E402
+from utils import COINBASE_SENDER  # noqa: E402
+from wallet import generate_wallets  # noqa: E402
+
+FUNDS_PER_SENDER = 10000
+
+
+def make_batch(senders, recipients, size, invalid, rng):
+    transactions = []
+    for _ in range(size):
+        sender = rng.choice(senders)
+        tx = Transaction(sender.get_public_key_hex(), rng.choice(recipients), round(rng.uniform(1, 20), 2),
+                         fee=round(rng.uniform(0, 0.5), 2))
+        tx.sign(sender)
+        if rng.random() < invalid:
+            if rng.random() < 0.5:
+                tx.amount += 1  # La firma ya no corresponde
+            else:
+                tx.amount = FUNDS_PER_SENDER * 2
+                tx.sign(sender)
+        transactions.append(tx)
+    return transactions
+
+
+def fresh_chain(senders):
+    """Cadena con un génesis que financia a todos los remitentes."""
+    funding = [Transaction(COINBASE_SENDER, s.get_public_key_hex(), FUNDS_PER_SENDER) for s in senders]
+    return Blockchain(genesis_block=Block(0, funding, "0"))
+
+
+def run_single(senders, batch):
+    blockchain = fresh_chain(senders)
+    clear_caches()
+    accepted = 0
+    start = time.perf_counter()
+    for tx in batch:
+        try:
+            blockchain.add_transaction(tx)
+            accepted += 1
+        except BlockchainError:
+            pass
+    return time.perf_counter() - start, accepted
+
+
+def run_batch(senders, batch, workers):
+    blockchain = fresh_chain(senders)
+    clear_caches()
+    start = time.perf_counter()
+    results = blockchain.add_transactions(batch, workers=workers)
+    return time.perf_counter() - start, sum(error is None for error in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000], help="Tamaños de lote.")
+    parser.add_argument("--senders", type=int, default=20, help="Remitentes distintos en cada lote.")
+    parser.add_argument("--invalid", type=float, default=0.05, help="Fracción de transacciones inválidas.")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para verificar firmas (por defecto, todos los núcleos).")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    workers = resolve_workers(args.workers)
+
+    senders = generate_wallets(args.senders)
+    recipients = [wallet.get_public_key_hex() for wallet in generate_wallets(10)]
+    print(f"{'Lote':>6} {'Una a una':>12} {'tx/s':>9} {'Por lotes':>12} {'tx/s':>9} {'Mejora':>8}  ({workers} procesos)")
+    for size in args.batch_sizes:
+        batch = make_batch(senders, recipients, size, args.invalid, rng)
+        single_seconds, single_accepted = run_single(senders, batch)
+        batch_seconds, batch_accepted = run_batch(senders, batch, workers)
+        assert single_accepted == batch_accepted, "Ambos caminos deben aceptar las mismas transacciones"
+        print(f"{size:>6} {single_seconds:>11.3f}s {size / single_seconds:>9.0f} "
+              f"{batch_seconds:>11.3f}s {size / batch_seconds:>9.0f} {single_seconds / batch_seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
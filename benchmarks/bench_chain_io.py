@@ -0,0 +1,81 @@
+"""
+Mide la exportación e importación en flujo de `chain_io.py` para varias longitudes de
+cadena guardada en disco: tiempo, tamaño del archivo y pico de memoria (tracemalloc)
+en JSON Lines y en binario. El pico de exportación no debe crecer con la longitud; el
+de importación solo con los índices de saldos y de transacciones.
+
+Uso:
+    python benchmarks/bench_chain_io.py [--lengths 200 800] [--block-txs 10] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from blockchain import Blockchain, Transaction  # noqa: E402
+from chain_io import FORMATS, export_chain, import_chain  # noqa: E402
+from wallet import Wallet  # noqa: E402
+
+
+def build_chain(data_dir, length, block_txs):
+    """Cadena en disco de `length` bloques con `block_txs` transferencias cada uno."""
+    funder, recipient, miner = Wallet(), Wallet(), Wallet()
+    blockchain = Blockchain(
+        difficulty=1, data_dir=data_dir, initial_beneficiary=funder.get_public_key_hex(), initial_funds=10 ** 9
+    )
+    while len(blockchain.chain) < length:
+        for i in range(block_txs):
+            tx = Transaction(funder.get_public_key_hex(), recipient.get_public_key_hex(), 1 + i, fee=0.01)
+            tx.sign(funder)
+            blockchain.add_transaction(tx)
+        blockchain.mine_pending_transactions(miner.get_public_key_hex())
+    return blockchain
+
+
+def measured(function):
+    """Retorna (segundos, pico de memoria en bytes, resultado) de `function()`."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[200, 800], help="Longitudes de cadena a medir.")
+    parser.add_argument("--block-txs", type=int, default=10, help="Transacciones por bloque.")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos para auditar cada lote al importar.")
+    args = parser.parse_args()
+
+    print(f"{'Bloques':>8} {'Formato':>8} {'Archivo':>10} {'Exportar':>10} {'Pico exp.':>10} "
+          f"{'Importar':>10} {'Pico imp.':>10}")
+    for length in args.lengths:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = build_chain(os.path.join(tmp, "origen"), length, args.block_txs)
+            try:
+                for fmt in FORMATS:
+                    path = os.path.join(tmp, f"cadena.{fmt}")
+                    export_seconds, export_peak, _ = measured(lambda: export_chain(source, path, fmt))
+                    target_dir = os.path.join(tmp, f"destino_{fmt}")
+                    import_seconds, import_peak, imported = measured(
+                        lambda: import_chain(path, target_dir, workers=args.workers)
+                    )
+                    assert imported.get_latest_block().hash == source.get_latest_block().hash
+                    imported.close()
+                    print(f"{length:>8} {fmt:>8} {os.path.getsize(path) / 1024:>8.0f}KB "
+                          f"{export_seconds:>9.3f}s {export_peak / 1024:>8.0f}KB "
+                          f"{import_seconds:>9.3f}s {import_peak / 1024:>8.0f}KB")
+            finally:
+                source.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Banco de pruebas de rendimiento de las rutas críticas del motor.
+
+Genera cadenas sintéticas (muchas billeteras, miles de bloques) y mide, para cada
+combinación de parámetros:
+- `Block.calculate_hash` según el número de transacciones del bloque,
+- `Block.mine_block` según la dificultad en bits (latencia por bloque y hashes por segundo),
+- `Blockchain.add_transaction` según el tamaño de la mempool,
+- `Blockchain.get_balance` (y el recorrido completo `calculate_balance_from_chain`)
+  según la longitud de la cadena,
+- `Blockchain.is_chain_valid` según la longitud de la cadena, secuencial y en paralelo,
+  con las cachés de firmas vacías.
+
+Los resultados se escriben en JSON con `--output` y pueden compararse con otra ejecución
+guardada con `--baseline`: las operaciones cuyo rendimiento cae más de `--tolerance`
+se marcan como regresión y el programa termina con código 1.
+
+Uso:
+    python benchmarks/bench_core.py [--quick] [--output resultados.json] [--baseline base.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from blockchain import Block, Blockchain, Transaction  # noqa: E402
+from difficulty import target_from_zero_bits  # noqa: E402
+from mining import resolve_workers  # noqa: E402
+from sigcache import clear_caches  # noqa: E402
+from utils import COINBASE_SENDER, MINING_REWARD  # noqa: E402
+from wallet import Wallet, generate_wallets  # noqa: E402
+
+PRESETS = {
+    "full": {
+        "chain_lengths": [500, 2000],
+        "block_txs": [1, 100, 1000],
+        "difficulty_bits": [8, 12, 16],
+        "mempool_sizes": [0, 1000, 4000],
+    },
+    "quick": {
+        "chain_lengths": [100, 400],
+        "block_txs": [1, 100],
+        "difficulty_bits": [8, 12],
+        "mempool_sizes": [0, 1000],
+    },
+}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def time_calls(function, samples, inner=1):
+    """Duración por llamada de `samples` muestras; cada muestra ejecuta `inner` llamadas."""
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(inner):
+            function()
+        durations.append((time.perf_counter() - start) / inner)
+    return durations
+
+
+def make_result(name, params, durations, **extra):
+    mean = sum(durations) / len(durations)
+    return dict({
+        "name": name,
+        "params": params,
+        "samples": len(durations),
+        "mean": mean,
+        "p50": percentile(durations, 0.50),
+        "p95": percentile(durations, 0.95),
+        "ops_per_sec": 1 / mean if mean else float("inf"),
+    }, **extra)
+
+
+def result_key(result):
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+
+def throughput(result):
+    """
+    Valor que se compara con la base. En minería se usan los hashes por segundo: el tiempo
+    por bloque depende de la suerte con el nonce y varía demasiado entre ejecuciones.
+    """
+    return result.get("hash_rate", result["ops_per_sec"])
+
+
+# --- Datos sintéticos ---
+
+class SyntheticChain:
+    """
+    Cadena de prueba con `wallets` billeteras que se pagan entre sí. La estructura (quién
+    paga a quién, montos, mineros) se deriva de `seed`; las claves y las marcas de tiempo
+    no, así que los hashes cambian entre ejecuciones pero la carga de trabajo no.
+    """
+
+    def __init__(self, wallets, txs_per_block, seed, difficulty=1):
+        self.rng = random.Random(seed)
+        self.txs_per_block = txs_per_block
+        self.funder = Wallet()
+        self.wallets = generate_wallets(wallets)
+        self.addresses = [wallet.get_public_key_hex() for wallet in self.wallets]
+        self.blockchain = Blockchain(
+            difficulty=difficulty, initial_beneficiary=self.funder.get_public_key_hex(), initial_funds=10 ** 9
+        )
+
+    def extend(self, length):
+        """Mina y añade (con `add_block`) bloques hasta que la cadena tenga `length`."""
+        blockchain = self.blockchain
+        while len(blockchain.chain) < length:
+            transactions = []
+            spent = {}
+            for _ in range(self.txs_per_block):
+                sender = self.rng.choice(self.wallets + [self.funder])
+                address = sender.get_public_key_hex()
+                amount = round(self.rng.uniform(0.5, 5), 2)
+                fee = round(self.rng.uniform(0, 0.1), 2)
+                if blockchain.get_balance(address) - spent.get(address, 0) < amount + fee:
+                    sender, address = self.funder, self.funder.get_public_key_hex()
+                tx = Transaction(address, self.rng.choice(self.addresses), amount, fee=fee)
+                tx.sign(sender)
+                spent[address] = spent.get(address, 0) + amount + fee
+                transactions.append(tx)
+            fees = sum(tx.fee for tx in transactions)
+            coinbase = Transaction(COINBASE_SENDER, self.rng.choice(self.addresses), MINING_REWARD + fees)
+            latest = blockchain.get_latest_block()
+            block = Block(latest.index + 1, [coinbase] + transactions, latest.hash,
+                          target=blockchain.get_next_target())
+            block.mine_block()
+            blockchain.add_block(block)
+
+    def signed_transactions(self, count, sender=None):
+        """Transacciones firmadas nuevas (la firma no forma parte de las mediciones)."""
+        sender = sender or self.funder
+        transactions = []
+        for _ in range(count):
+            tx = Transaction(sender.get_public_key_hex(), self.rng.choice(self.addresses), 1, fee=0.01)
+            tx.sign(sender)
+            transactions.append(tx)
+        return transactions
+
+
+def filler_transactions(template, count):
+    """Copias de `template` con marcas de tiempo distintas (ids distintos, firma no válida)."""
+    transactions = []
+    for i in range(count):
+        tx = Transaction.from_dict(template.to_dict())
+        tx.timestamp += i + 1
+        transactions.append(tx)
+    return transactions
+
+
+# --- Mediciones ---
+
+def bench_calculate_hash(synthetic, block_tx_counts):
+    template = synthetic.signed_transactions(1)[0]
+    results = []
+    for count in block_tx_counts:
+        block = Block(1, filler_transactions(template, count), "0" * 64)
+        results.append(make_result("Block.calculate_hash", {"block_txs": count},
+                                   time_calls(block.calculate_hash, 20, inner=500)))
+    return results
+
+
+def bench_mine_block(synthetic, difficulty_bits):
+    template = synthetic.signed_transactions(1)[0]
+    results = []
+    for bits in difficulty_bits:
+        samples = max(3, 40 // (2 ** max((bits - 8) // 2, 0)))
+        durations = []
+        hashes = 0
+        for i in range(samples):
+            block = Block(1, filler_transactions(template, 10), "0" * 64)
+            block.timestamp += i
+            start = time.perf_counter()
+            hashes += block.mine_block(target_from_zero_bits(bits))
+            durations.append(time.perf_counter() - start)
+        results.append(make_result("Block.mine_block", {"difficulty_bits": bits}, durations,
+                                   hash_rate=hashes / sum(durations)))
+    return results
+
+
+def bench_add_transaction(synthetic, mempool_sizes, samples=200):
+    blockchain = synthetic.blockchain
+    template = synthetic.signed_transactions(1, sender=synthetic.wallets[0])[0]
+    results = []
+    for size in mempool_sizes:
+        blockchain.mempool.clear()
+        # El relleno entra directamente en la mempool: solo interesa su tamaño, no su validación.
+        for tx in filler_transactions(template, size):
+            blockchain.mempool.add(tx)
+        transactions = synthetic.signed_transactions(samples)
+        durations = []
+        for tx in transactions:
+            start = time.perf_counter()
+            blockchain.add_transaction(tx)
+            durations.append(time.perf_counter() - start)
+        results.append(make_result("Blockchain.add_transaction", {"mempool_size": size}, durations))
+    blockchain.mempool.clear()
+    return results
+
+
+def bench_chain_queries(synthetic, length, workers):
+    blockchain = synthetic.blockchain
+    addresses = synthetic.addresses
+    rng = random.Random(length)
+    params = {"chain_length": length}
+    results = [
+        make_result("Blockchain.get_balance", params,
+                    time_calls(lambda: blockchain.get_balance(rng.choice(addresses)), 20, inner=1000)),
+        make_result("Blockchain.calculate_balance_from_chain", params,
+                    time_calls(lambda: blockchain.calculate_balance_from_chain(rng.choice(addresses)), 3)),
+    ]
+    for worker_count in sorted({1, workers}):
+        durations = []
+        for _ in range(2):
+            clear_caches()
+            start = time.perf_counter()
+            blockchain.is_chain_valid(workers=worker_count)
+            durations.append(time.perf_counter() - start)
+        results.append(make_result("Blockchain.is_chain_valid",
+                                   dict(params, workers=worker_count), durations))
+    return results
+
+
+def run_suite(args):
+    sizes = PRESETS["quick" if args.quick else "full"]
+    workers = resolve_workers(args.workers)
+    synthetic = SyntheticChain(args.wallets, args.txs_per_block, args.seed)
+    results = []
+
+    def report(new_results):
+        for result in new_results:
+            extra = f"  {result['hash_rate']:,.0f} H/s" if "hash_rate" in result else ""
+            print(f"  {result['name']:<40} {json.dumps(result['params']):<40} "
+                  f"{result['ops_per_sec']:>14,.1f} ops/s  p95 {result['p95'] * 1000:>10.3f} ms{extra}")
+        results.extend(new_results)
+
+    report(bench_calculate_hash(synthetic, sizes["block_txs"]))
+    report(bench_mine_block(synthetic, sizes["difficulty_bits"]))
+    for length in sorted(sizes["chain_lengths"]):
+        start = time.perf_counter()
+        synthetic.extend(length)
+        print(f"  (cadena sintética de {length} bloques generada en {time.perf_counter() - start:.1f} s)")
+        report(bench_chain_queries(synthetic, length, workers))
+    report(bench_add_transaction(synthetic, sizes["mempool_sizes"]))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Imprime la comparación con `baseline` y retorna las regresiones encontradas."""
+    previous = {result_key(result): result for result in baseline["results"]}
+    regressions = []
+    print(f"\n{'Operación':<40} {'Parámetros':<40} {'Base':>14} {'Actual':>14} {'Relación':>9}")
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        ratio = throughput(result) / throughput(old)
+        flag = ""
+        if ratio < 1 - tolerance:
+            regressions.append(result)
+            flag = "  REGRESIÓN"
+        print(f"{result['name']:<40} {json.dumps(result['params']):<40} {throughput(old):>14,.1f} "
+              f"{throughput(result):>14,.1f} {ratio:>8.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Tamaños reducidos para una ejecución rápida.")
+    parser.add_argument("--wallets", type=int, default=50)
+    parser.add_argument("--txs-per-block", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos para la auditoría paralela (por defecto, todos los núcleos).")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument("--baseline", help="Resultados anteriores (JSON) con los que comparar.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Caída relativa de rendimiento a partir de la cual se marca una regresión.")
+    args = parser.parse_args()
+
+    print(f"Banco de pruebas ({'rápido' if args.quick else 'completo'}, semilla {args.seed})")
+    results = run_suite(args)
+
+    document = {
+        "meta": {
+            "created": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "preset": "quick" if args.quick else "full",
+            "wallets": args.wallets,
+            "txs_per_block": args.txs_per_block,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regresiones por encima del {args.tolerance:.0%}.")
+            sys.exit(1)
+        print("\nSin regresiones.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Compara la representación actual de `Transaction` y `Block` (`__slots__` + codificación
+binaria de `encoding.py`) con la representación anterior (objetos con `__dict__` y
+`json.dumps(..., sort_keys=True)` como forma canónica).
+
+Mide memoria por objeto (con tracemalloc) y rendimiento de codificación para:
+- los datos que se firman (`get_signing_data`),
+- el hash de un bloque (`calculate_hash`),
+- la serialización completa de un bloque.
+
+Uso:
+    python benchmarks/bench_encoding.py [--objects 20000] [--block-txs 100]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from blockchain import Block, Transaction  # noqa: E402
+from wallet import Wallet  # noqa: E402
+
+
+class LegacyTransaction:
+    """Réplica de la transacción anterior: atributos en `__dict__` y firma sobre JSON."""
+
+    def __init__(self, sender, recipient, amount, fee, timestamp, signature):
+        self.sender = sender
+        self.recipient = recipient
+        self.amount = amount
+        self.fee = fee
+        self.timestamp = timestamp
+        self.signature = signature
+
+    def get_signing_data(self):
+        data = {
+            "sender": self.sender,
+            "recipient": self.recipient,
+            "amount": self.amount,
+            "fee": self.fee,
+            "timestamp": self.timestamp
+        }
+        return json.dumps(data, sort_keys=True)
+
+
+class LegacyBlock:
+    """Réplica del bloque anterior: hash sobre el JSON de todas sus transacciones."""
+
+    def __init__(self, index, timestamp, transactions, previous_hash, nonce):
+        self.index = index
+        self.timestamp = timestamp
+        self.transactions = transactions
+        self.previous_hash = previous_hash
+        self.nonce = nonce
+
+    def calculate_hash(self):
+        tx_data = "".join([json.dumps(tx.__dict__, sort_keys=True) for tx in self.transactions])
+        block_content = f"{self.index}{self.timestamp}{tx_data}{self.previous_hash}{self.nonce}"
+        return hashlib.sha256(block_content.encode('utf-8')).hexdigest()
+
+    def to_json(self):
+        return json.dumps({
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "previous_hash": self.previous_hash,
+            "nonce": self.nonce,
+            "transactions": [tx.__dict__ for tx in self.transactions],
+        }, sort_keys=True)
+
+
+def make_transactions(count):
+    sender, recipient = Wallet(), Wallet()
+    template = Transaction(sender.get_public_key_hex(), recipient.get_public_key_hex(), 12.5, fee=0.25)
+    template.sign(sender)
+    current = []
+    legacy = []
+    for i in range(count):
+        tx = Transaction.from_dict(template.to_dict())
+        tx.timestamp += i
+        current.append(tx)
+        legacy.append(LegacyTransaction(tx.sender, tx.recipient, tx.amount, tx.fee, tx.timestamp, tx.signature))
+    return current, legacy
+
+
+def measure_memory(factory, count):
+    """Bytes asignados por objeto al crear `count` objetos con `factory(i)`."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count
+
+
+def throughput(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    elapsed = time.perf_counter() - start
+    return repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=20000, help="Transacciones para medir memoria y firma.")
+    parser.add_argument("--block-txs", type=int, default=100, help="Transacciones por bloque de prueba.")
+    args = parser.parse_args()
+
+    current, legacy = make_transactions(args.objects)
+    sample = current[0]
+
+    # Ambas versiones comparten las mismas cadenas; solo cuenta el objeto y su marca de tiempo.
+    def new_current(i):
+        tx = Transaction(sample.sender, sample.recipient, sample.amount, sample.signature, sample.fee)
+        tx.timestamp = float(i)
+        return tx
+
+    mem_current = measure_memory(new_current, args.objects)
+    mem_legacy = measure_memory(
+        lambda i: LegacyTransaction(sample.sender, sample.recipient, sample.amount, sample.fee, float(i), sample.signature),
+        args.objects
+    )
+
+    sign_current = throughput(lambda: [tx.get_signing_data() for tx in current], 1) * args.objects
+    sign_legacy = throughput(lambda: [tx.get_signing_data() for tx in legacy], 1) * args.objects
+
+    block = Block(1, current[:args.block_txs], "0" * 64)
+    legacy_block = LegacyBlock(1, block.timestamp, legacy[:args.block_txs], "0" * 64, 0)
+    hash_current = throughput(block.calculate_hash, 2000)
+    hash_legacy = throughput(legacy_block.calculate_hash, 200)
+    encode_current = throughput(block.to_bytes, 200)
+    encode_legacy = throughput(legacy_block.to_json, 200)
+    size_current = len(block.to_bytes())
+    size_legacy = len(legacy_block.to_json().encode("utf-8"))
+
+    rows = [
+        ("Memoria por transacción (bytes)", mem_legacy, mem_current),
+        ("Datos firmados por segundo", sign_legacy, sign_current),
+        (f"Hash de bloque ({args.block_txs} tx) por segundo", hash_legacy, hash_current),
+        (f"Serialización de bloque ({args.block_txs} tx) por segundo", encode_legacy, encode_current),
+        (f"Tamaño serializado del bloque ({args.block_txs} tx, bytes)", size_legacy, size_current),
+    ]
+    print(f"{'Métrica':<50} {'Anterior':>14} {'Actual':>14} {'Relación':>10}")
+    for name, old, new in rows:
+        print(f"{name:<50} {old:>14,.0f} {new:>14,.0f} {new / old:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
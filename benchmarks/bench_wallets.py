@@ -0,0 +1,77 @@
+"""
+Mide el coste de preparar billeteras y firmas para pruebas de carga:
+- generación de billeteras en serie frente a `generate_wallets` con varios procesos,
+- firma aleatoria frente a determinista (RFC 6979),
+- verificación con y sin tablas precalculadas de la clave pública,
+- recarga desde el almacén cifrado (`keystore.py`) frente a regenerar.
+
+Uso:
+    python benchmarks/bench_wallets.py [--wallets 2000] [--workers N] [--signatures 200]
+"""
+
+import argparse
+import binascii
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from keystore import load_keystore, save_keystore  # noqa: E402
+from mining import resolve_workers  # noqa: E402
+from sigcache import precompute_verifying_key  # noqa: E402
+from wallet import Wallet, generate_wallets  # noqa: E402
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wallets", type=int, default=2000, help="Billeteras a generar y guardar.")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para la generación (por defecto, todos los núcleos).")
+    parser.add_argument("--signatures", type=int, default=200, help="Firmas y verificaciones a medir.")
+    args = parser.parse_args()
+    workers = resolve_workers(args.workers)
+
+    serial, _ = timed(lambda: generate_wallets(args.wallets, workers=1))
+    parallel, wallets = timed(lambda: generate_wallets(args.wallets, workers=workers))
+
+    wallet = Wallet()
+    message = b"transaccion de prueba"
+    random_sign, _ = timed(lambda: [wallet.sign_transaction(message, deterministic=False) for _ in range(args.signatures)])
+    rfc6979_sign, signatures = timed(lambda: [wallet.sign_transaction(message) for _ in range(args.signatures)])
+    signature = binascii.unhexlify(signatures[0])
+
+    plain_key = wallet.public_key
+    precompute, precomputed_key = timed(lambda: precompute_verifying_key(plain_key))
+    plain_verify, _ = timed(lambda: [plain_key.verify(signature, message, hashfunc=hashlib.sha256) for _ in range(args.signatures)])
+    fast_verify, _ = timed(lambda: [precomputed_key.verify(signature, message, hashfunc=hashlib.sha256) for _ in range(args.signatures)])
+
+    named = {f"wallet{i}": w for i, w in enumerate(wallets)}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wallets.json")
+        save, _ = timed(lambda: save_keystore(path, named, "benchmark"))
+        load, loaded = timed(lambda: load_keystore(path, "benchmark"))
+    assert loaded["wallet0"].get_public_key_hex() == wallets[0].get_public_key_hex()
+
+    n = args.signatures
+    print(f"{'Operación':<52} {'Tiempo':>12}")
+    print(f"{f'Generar {args.wallets} billeteras (1 proceso)':<52} {serial:>11.3f}s")
+    print(f"{f'Generar {args.wallets} billeteras ({workers} procesos)':<52} {parallel:>11.3f}s")
+    print(f"{f'Guardar {args.wallets} billeteras cifradas':<52} {save:>11.3f}s")
+    print(f"{f'Cargar {args.wallets} billeteras cifradas':<52} {load:>11.3f}s")
+    print(f"{'Firma aleatoria (por firma)':<52} {random_sign / n * 1000:>10.3f}ms")
+    print(f"{'Firma determinista RFC 6979 (por firma)':<52} {rfc6979_sign / n * 1000:>10.3f}ms")
+    print(f"{'Verificación sin tablas (por firma)':<52} {plain_verify / n * 1000:>10.3f}ms")
+    print(f"{'Verificación con tablas (por firma)':<52} {fast_verify / n * 1000:>10.3f}ms")
+    print(f"{'Precálculo de tablas (por clave)':<52} {precompute * 1000:>10.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
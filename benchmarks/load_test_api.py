@@ -0,0 +1,181 @@
+"""
+Prueba de carga local de la API HTTP del nodo (`node_api.py`).
+
+Arranca un nodo en un proceso aparte, con fondos iniciales para una billetera de
+prueba, y lanza `--concurrency` clientes con conexiones keep-alive que mezclan:
+- lecturas: estado, saldo y últimos bloques,
+- escrituras: transacciones firmadas (preparadas antes de medir).
+
+Con `--mine-every` se pide además un bloque cada N segundos, para observar la
+latencia de las lecturas mientras se mina. Al final muestra peticiones por segundo
+y percentiles de latencia por tipo de petición.
+
+Uso:
+    python benchmarks/load_test_api.py [--requests 2000] [--concurrency 20] [--mine-every 2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from blockchain import Transaction  # noqa: E402
+from wallet import Wallet  # noqa: E402
+
+
+class HTTPClient:
+    """Cliente HTTP/1.1 mínimo con conexión persistente."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write((
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode("latin-1") + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, await self.reader.readexactly(length)
+
+    def close(self):
+        self.writer.close()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def wait_for_node(host, port, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            client = HTTPClient(host, port)
+            await client.connect()
+            client.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("El nodo no arrancó a tiempo.")
+
+
+async def run_load(args, transactions, sender_address):
+    latencies = {}
+    statuses = {}
+    requests_left = [args.requests]
+    tx_iter = iter(transactions)
+
+    async def worker():
+        client = HTTPClient(args.host, args.port)
+        await client.connect()
+        rng = random.Random()
+        try:
+            while requests_left[0] > 0:
+                requests_left[0] -= 1
+                choice = rng.random()
+                if choice < args.write_ratio:
+                    tx = next(tx_iter, None)
+                    kind, request = ("POST /api/transactions", ("POST", "/api/transactions", tx)) if tx else \
+                        ("GET /api/status", ("GET", "/api/status", None))
+                elif choice < args.write_ratio + (1 - args.write_ratio) / 3:
+                    kind, request = "GET /api/balance", ("GET", f"/api/balance/{sender_address}", None)
+                elif choice < args.write_ratio + 2 * (1 - args.write_ratio) / 3:
+                    kind, request = "GET /api/blocks", ("GET", "/api/blocks?limit=5", None)
+                else:
+                    kind, request = "GET /api/status", ("GET", "/api/status", None)
+                start = time.perf_counter()
+                status, _ = await client.request(*request)
+                latencies.setdefault(kind, []).append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            client.close()
+
+    async def miner():
+        client = HTTPClient(args.host, args.port)
+        await client.connect()
+        try:
+            while requests_left[0] > 0:
+                await asyncio.sleep(args.mine_every)
+                await client.request("POST", "/api/mine", {"miner_address": sender_address})
+        finally:
+            client.close()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(args.concurrency)]
+    miner_task = asyncio.create_task(miner()) if args.mine_every else None
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    if miner_task:
+        miner_task.cancel()
+    return latencies, statuses, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="Fracción de peticiones que envían transacciones.")
+    parser.add_argument("--mine-every", type=float, default=0, help="Segundos entre peticiones de minería (0 = no minar).")
+    parser.add_argument("--difficulty", type=int, default=4)
+    args = parser.parse_args()
+
+    wallet, recipient = Wallet(), Wallet()
+    sender_address = wallet.get_public_key_hex()
+    tx_count = int(args.requests * args.write_ratio) + 1
+    print(f"Firmando {tx_count} transacciones de prueba...")
+    transactions = []
+    for _ in range(tx_count):
+        tx = Transaction(sender_address, recipient.get_public_key_hex(), 1)
+        tx.sign(wallet)
+        transactions.append(tx.to_dict())
+
+    node = subprocess.Popen([
+        sys.executable, os.path.join(ROOT, "node_api.py"),
+        "--host", args.host, "--port", str(args.port), "--difficulty", str(args.difficulty),
+        "--genesis-address", sender_address, "--genesis-funds", str(tx_count * 10),
+    ], stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_for_node(args.host, args.port))
+        latencies, statuses, elapsed = asyncio.run(run_load(args, transactions, sender_address))
+    finally:
+        node.terminate()
+        node.wait()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"\nPeticiones: {total} en {elapsed:.2f} s -> {total / elapsed:,.0f} peticiones/s "
+          f"(concurrencia {args.concurrency}, minería cada {args.mine_every or '-'} s)")
+    print(f"Códigos de estado: {dict(sorted(statuses.items()))}")
+    print(f"\n{'Petición':<26} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'máx ms':>9}")
+    for kind, values in sorted(latencies.items()):
+        print(f"{kind:<26} {len(values):>6} {percentile(values, 0.50) * 1000:>9.2f} "
+              f"{percentile(values, 0.95) * 1000:>9.2f} {percentile(values, 0.99) * 1000:>9.2f} "
+              f"{max(values) * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Simulación de una red local de nodos (`p2p.py`), cada uno en su propio proceso.
+
+Arranca `--nodes` nodos en puertos consecutivos, todos con el mismo bloque génesis, y
+conecta cada nodo con los `--degree` anteriores. Después mide:
+- propagación de transacciones: desde que se envían a un nodo al azar hasta que todos
+  los nodos las aceptan en su mempool,
+- propagación de bloques: desde que un nodo mina un bloque hasta que todos lo aceptan,
+- sincronización: para cada longitud de `--sync-lengths`, se alarga la cadena de la red
+  y se arranca un nodo nuevo que se pone al día (cabeceras primero, cuerpos en paralelo).
+
+Los tiempos se toman de los eventos que publica cada nodo (`subscribe`); todos los
+procesos comparten el reloj de la máquina.
+
+Uso:
+    python benchmarks/simulate_network.py [--nodes 6] [--transactions 50] [--blocks 5]
+                                          [--sync-lengths 100 300 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from blockchain import Block, Blockchain, Transaction  # noqa: E402
+from p2p import Peer, PeerError, STREAM_LIMIT, serve  # noqa: E402
+from utils import COINBASE_SENDER, MINING_REWARD  # noqa: E402
+from wallet import Wallet  # noqa: E402
+
+HOST = "127.0.0.1"
+
+
+def run_node(port, peer_ports, genesis, difficulty):
+    """Punto de entrada de cada proceso nodo."""
+    sys.stdout = sys.stderr = open(os.devnull, "w")
+    blockchain = Blockchain(difficulty=difficulty, genesis_block=Block.from_dict(genesis))
+    try:
+        asyncio.run(serve(blockchain, HOST, port, [(HOST, p) for p in peer_ports]))
+    except KeyboardInterrupt:
+        pass
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summary(values):
+    if not values:
+        return "sin datos"
+    return (f"n={len(values)}  p50={percentile(values, 0.5) * 1000:.1f} ms  "
+            f"p95={percentile(values, 0.95) * 1000:.1f} ms  máx={max(values) * 1000:.1f} ms")
+
+
+class Network:
+    def __init__(self, args, genesis):
+        self.args = args
+        self.genesis = genesis
+        self.context = mp.get_context("spawn")
+        self.processes = {}
+        self.control = {}
+        self.events = []
+
+    def spawn(self, port, peer_ports):
+        process = self.context.Process(
+            target=run_node, args=(port, peer_ports, self.genesis, self.args.difficulty), daemon=True
+        )
+        process.start()
+        self.processes[port] = process
+
+    def terminate(self, port):
+        process = self.processes.pop(port)
+        process.terminate()
+        process.join()
+        peer = self.control.pop(port, None)
+        if peer is not None:
+            peer.close()
+
+    def shutdown(self):
+        for port in list(self.processes):
+            self.terminate(port)
+
+    async def connect(self, port, timeout=20):
+        deadline = time.time() + timeout
+        while True:
+            peer = Peer(HOST, port)
+            try:
+                await peer.connect()
+                self.control[port] = peer
+                return peer
+            except OSError:
+                if time.time() > deadline:
+                    raise RuntimeError(f"El nodo {port} no arrancó a tiempo.")
+                await asyncio.sleep(0.1)
+
+    async def subscribe(self, port):
+        """Recoge en `self.events` todos los eventos que publica el nodo."""
+        reader, writer = await asyncio.open_connection(HOST, port, limit=STREAM_LIMIT)
+        writer.write(json.dumps({"type": "subscribe"}).encode("utf-8") + b"\n")
+        await reader.readline()
+
+        async def collect():
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.events.append(json.loads(line))
+            writer.close()
+
+        return asyncio.ensure_future(collect())
+
+    async def wait_for(self, predicate, timeout):
+        deadline = time.time() + timeout
+        while not predicate():
+            if time.time() > deadline:
+                return False
+            await asyncio.sleep(0.02)
+        return True
+
+    async def wait_for_height(self, ports, height, timeout=120):
+        deadline = time.time() + timeout
+        for port in ports:
+            while (await self.control[port].request("status"))["height"] < height:
+                if time.time() > deadline:
+                    raise RuntimeError(f"El nodo {port} no alcanzó la altura {height}.")
+                await asyncio.sleep(0.05)
+
+
+def accept_times(events, event, key, value):
+    return {e["port"]: e["time"] for e in events if e["event"] == event and e.get(key) == value}
+
+
+def signed_transaction(funder, recipient_address, amount=1, fee=0.01):
+    tx = Transaction(funder.get_public_key_hex(), recipient_address, amount, fee=fee)
+    tx.sign(funder)
+    return tx
+
+
+async def measure_transactions(network, ports, funder, recipients):
+    latencies = []
+    for _ in range(network.args.transactions):
+        tx = signed_transaction(funder, random.choice(recipients))
+        sent_at = time.time()
+        tx_id = (await network.control[random.choice(ports)].request("submit_tx", transaction=tx.to_dict()))["id"]
+        await network.wait_for(
+            lambda: len(accept_times(network.events, "tx_accepted", "id", tx_id)) == len(ports), 10
+        )
+        times = accept_times(network.events, "tx_accepted", "id", tx_id)
+        if len(times) == len(ports):
+            latencies.append(max(times.values()) - sent_at)
+    return latencies
+
+
+async def measure_blocks(network, ports, funder, recipients):
+    latencies = []
+    for _ in range(network.args.blocks):
+        miner_port = random.choice(ports)
+        miner = network.control[miner_port]
+        await miner.request("submit_tx", transaction=signed_transaction(funder, random.choice(recipients)).to_dict())
+        block_hash = (await miner.request("mine", miner_address=random.choice(recipients)))["block"]["hash"]
+        await network.wait_for(
+            lambda: len(accept_times(network.events, "block_accepted", "hash", block_hash)) == len(ports), 30
+        )
+        times = accept_times(network.events, "block_accepted", "hash", block_hash)
+        if len(times) == len(ports):
+            latencies.append(max(times.values()) - times[miner_port])
+    return latencies
+
+
+async def extend_chain(network, ports, local_chain, funder, recipients, target_height):
+    """
+    Alarga la cadena de la red hasta `target_height` con bloques minados en este proceso
+    (una transacción cada uno) y entregados como difusión al primer nodo.
+    """
+    entry = network.control[ports[0]]
+    status = await entry.request("status")
+    if status["height"] > len(local_chain.chain):
+        response = await entry.request("get_blocks", start=len(local_chain.chain), end=status["height"])
+        for data in response["blocks"]:
+            local_chain.add_block(Block.from_dict(data))
+        return await extend_chain(network, ports, local_chain, funder, recipients, target_height)
+
+    while len(local_chain.chain) < target_height:
+        tx = signed_transaction(funder, random.choice(recipients))
+        coinbase = Transaction(COINBASE_SENDER, funder.get_public_key_hex(), MINING_REWARD + tx.fee)
+        latest = local_chain.get_latest_block()
+        block = Block(latest.index + 1, [coinbase, tx], latest.hash, target=local_chain.get_next_target())
+        block.mine_block()
+        local_chain.add_block(block)
+        entry.send("block", block=block.to_dict())
+    await network.wait_for_height(ports, target_height)
+
+
+async def measure_sync(network, ports, local_chain, funder, recipients):
+    results = []
+    next_port = max(ports) + 1
+    for length in sorted(network.args.sync_lengths):
+        await extend_chain(network, ports, local_chain, funder, recipients, length)
+        started = time.perf_counter()
+        network.spawn(next_port, ports)
+        node = await network.connect(next_port)
+        while True:
+            status = await node.request("status")
+            if status["height"] >= length and status["last_sync"]:
+                break
+            await asyncio.sleep(0.05)
+        total = time.perf_counter() - started
+        results.append((length, status["last_sync"], total))
+        network.terminate(next_port)
+        next_port += 1
+    return results
+
+
+async def run(args):
+    funder = Wallet()
+    recipients = [Wallet().get_public_key_hex() for _ in range(10)]
+    local_chain = Blockchain(
+        difficulty=args.difficulty, initial_beneficiary=funder.get_public_key_hex(), initial_funds=10 ** 9
+    )
+    genesis = local_chain.chain[0].to_dict()
+    network = Network(args, genesis)
+    ports = list(range(args.base_port, args.base_port + args.nodes))
+    try:
+        for i, port in enumerate(ports):
+            network.spawn(port, ports[max(0, i - args.degree):i])
+            await network.connect(port)
+        collectors = [await network.subscribe(port) for port in ports]
+        if len(ports) > 1:
+            for port in ports:
+                while not (await network.control[port].request("status"))["peers"]:
+                    await asyncio.sleep(0.05)
+
+        print(f"Red de {args.nodes} nodos (grado {args.degree}, dificultad {args.difficulty})")
+        tx_latencies = await measure_transactions(network, ports, funder, recipients)
+        print(f"Propagación de transacciones a todos los nodos: {summary(tx_latencies)}")
+        block_latencies = await measure_blocks(network, ports, funder, recipients)
+        print(f"Propagación de bloques a todos los nodos:       {summary(block_latencies)}")
+
+        print(f"\n{'Longitud':>9} {'Bloques':>8} {'Pares':>6} {'Sincronía s':>12} {'Bloques/s':>10} {'Total s':>9}")
+        for length, sync, total in await measure_sync(network, ports, local_chain, funder, recipients):
+            print(f"{length:>9} {sync['blocks']:>8} {sync['peers']:>6} {sync['elapsed']:>12.2f} "
+                  f"{sync['blocks'] / max(sync['elapsed'], 1e-9):>10,.0f} {total:>9.2f}")
+        for collector in collectors:
+            collector.cancel()
+    finally:
+        network.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=6)
+    parser.add_argument("--degree", type=int, default=2, help="Cada nodo se conecta con los N anteriores.")
+    parser.add_argument("--base-port", type=int, default=9100)
+    parser.add_argument("--difficulty", type=int, default=2)
+    parser.add_argument("--transactions", type=int, default=50)
+    parser.add_argument("--blocks", type=int, default=5)
+    parser.add_argument("--sync-lengths", type=int, nargs="*", default=[100, 300, 1000])
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    except PeerError as e:
+        print(f"Error de red: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,136 @@
-import json
+import math
 import time
+import struct
 import hashlib
 import binascii
+import threading
 
 import ecdsa
 
 # Importaciones locales
-from exceptions import InvalidSignatureError, InvalidBlockError, InsufficientFundsError, InvalidTransactionError
-from utils import COINBASE_SENDER, MINING_REWARD
+from exceptions import (
+    BlockchainError, InvalidSignatureError, InvalidBlockError, InsufficientFundsError, InvalidTransactionError,
+    DuplicateTransactionError, SnapshotError, OrphanBlockError,
+)
+from utils import (
+    COINBASE_SENDER, MINING_REWARD, MAX_BLOCK_TRANSACTIONS, AUDIT_SHARD_SIZE, RETARGET_INTERVAL, REORG_MAX_DEPTH,
+)
+from difficulty import (
+    MAX_TARGET, block_work, expected_target, format_target, median_time_past, meets_target, parse_target,
+    target_from_hex_difficulty,
+)
+from ledger import BalanceLedger, scan_balances
+from chain_index import ChainIndex, DiskChainIndex
+from mempool import Mempool
+from merkle import build_merkle_proof, compute_merkle_root
+from encoding import (
+    INT_MAX, INT_MIN, MAX_SIGNATURE_SIZE, MAX_TEXT_SIZE, decode_block, decode_transaction, encode_block,
+    encode_header_prefix, encode_nonce, encode_signing_data, encode_transaction,
+)
+from audit import audit_chain_parallel, verify_block
+from mining import MiningStats, mine_parallel
+from sigcache import (
+    SIGNATURE_CACHE, get_verifying_key, is_canonical_signature, signature_cache_key, verify_signatures,
+)
+from storage import BlockStore, LazyChain
+from snapshot import build_snapshot, verify_snapshot
+from metrics import METRICS
+
+def _is_finite_number(value):
+    return not isinstance(value, bool) and isinstance(value, (int, float)) and math.isfinite(value)
+
+def _has_valid_amounts(tx):
+    """Monto positivo y comisión no negativa, ambos números finitos (NaN o infinito no pasan)."""
+    return _is_finite_number(tx.amount) and _is_finite_number(tx.fee) and tx.amount > 0 and tx.fee >= 0
 
 class Transaction:
-    def __init__(self, sender_pub_key, recipient_pub_key, amount, signature=None):
+    __slots__ = ("sender", "recipient", "amount", "fee", "timestamp", "signature")
+
+    def __init__(self, sender_pub_key, recipient_pub_key, amount, signature=None, fee=0):
         self.sender = sender_pub_key
         self.recipient = recipient_pub_key
         self.amount = amount
+        self.fee = fee  # Comisión para el minero; determina la prioridad en la mempool
         self.timestamp = time.time()
         self.signature = signature
 
     def __repr__(self):
         return (
             f"Transaction(sender={self.sender[:10]}..., recipient={self.recipient[:10]}..., "
-            f"amount={self.amount}, timestamp={self.timestamp})"
+            f"amount={self.amount}, fee={self.fee}, timestamp={self.timestamp})"
         )
 
     def get_signing_data(self):
         """
-        Genera la representación canónica de los datos que se firman.
-        Es VITAL que `sort_keys=True` para garantizar que el hash sea siempre idéntico.
+        Genera la representación canónica (binaria, ver `encoding.py`) de los datos que se firman.
+        La codificación es determinista, así que el hash es siempre idéntico.
         La firma no se incluye en los datos que se firman.
         """
-        data = {
+        return encode_signing_data(self)
+
+    def get_id(self):
+        """
+        Identificador de la transacción: SHA-256 de su codificación binaria completa (firma incluida).
+        Se recalcula en cada llamada para que cualquier alteración cambie el identificador.
+        """
+        return hashlib.sha256(encode_transaction(self)).hexdigest()
+
+    def to_bytes(self):
+        """Codificación binaria compacta de la transacción."""
+        return encode_transaction(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Reconstruye una transacción desde `to_bytes`."""
+        return cls.from_dict(decode_transaction(data)[0])
+
+    def to_dict(self):
+        """Representación serializable (JSON) de la transacción, firma incluida."""
+        return {
             "sender": self.sender,
             "recipient": self.recipient,
             "amount": self.amount,
-            "timestamp": self.timestamp
+            "fee": self.fee,
+            "timestamp": self.timestamp,
+            "signature": self.signature,
         }
-        return json.dumps(data, sort_keys=True)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reconstruye una transacción desde `to_dict`, conservando su marca de tiempo.
+        Lanza `InvalidTransactionError` si los campos no se pueden codificar (ver `check_fields`).
+        """
+        tx = cls(data["sender"], data["recipient"], data["amount"], data.get("signature"), data.get("fee", 0))
+        tx.timestamp = data["timestamp"]
+        tx.check_fields()
+        return tx
+
+    def check_fields(self):
+        """
+        Comprueba que los campos tengan la forma que admite la codificación binaria (ver
+        `encoding.py`): direcciones de texto, monto, comisión y marca de tiempo numéricos
+        (los enteros, dentro de 64 bits con signo) y firma hexadecimal de hasta
+        `MAX_SIGNATURE_SIZE` bytes. Lanza `InvalidTransactionError` (o `InvalidSignatureError`).
+        """
+        for value in (self.sender, self.recipient):
+            if not isinstance(value, str) or (len(value) > MAX_TEXT_SIZE // 4
+                                              and len(value.encode("utf-8")) > MAX_TEXT_SIZE):
+                raise InvalidTransactionError("El remitente y el receptor deben ser texto de longitud acotada.")
+        for value in (self.amount, self.fee, self.timestamp):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise InvalidTransactionError("El monto, la comisión y la marca de tiempo deben ser números.")
+            if isinstance(value, int) and not INT_MIN <= value <= INT_MAX:
+                raise InvalidTransactionError(f"El valor {value} no cabe en un entero de 64 bits.")
+        if self.signature is not None:
+            if not isinstance(self.signature, str):
+                raise InvalidSignatureError("La firma de la transacción debe ser texto hexadecimal.")
+            try:
+                signature = bytes.fromhex(self.signature)
+            except ValueError:
+                raise InvalidSignatureError("La firma de la transacción no es hexadecimal.")
+            if len(signature) > MAX_SIGNATURE_SIZE:
+                raise InvalidSignatureError(f"La firma de la transacción supera los {MAX_SIGNATURE_SIZE} bytes.")
 
     def sign(self, wallet):
         """Firma la transacción usando la billetera proporcionada."""
@@ -49,6 +144,9 @@ class Transaction:
         Valida la transacción.
         1. Las transacciones de recompensa (coinbase) son válidas por definición si no tienen firma.
         2. Para otras transacciones, se verifica la firma contra la clave pública del remitente.
+           Las verificaciones superadas se recuerdan en `sigcache.SIGNATURE_CACHE`.
+        3. La firma debe ser canónica (`s` bajo); si no, la misma transacción podría volver
+           a enviarse con otra firma válida y otro identificador.
         """
         if self.sender == COINBASE_SENDER:
             return True # Las transacciones de recompensa se consideran válidas.
@@ -57,15 +155,30 @@ class Transaction:
             raise InvalidTransactionError("La transacción no tiene firma o remitente.")
 
         try:
-            public_key_bytes = binascii.unhexlify(self.sender)
-            verifying_key = ecdsa.VerifyingKey.from_string(public_key_bytes, curve=ecdsa.SECP256k1)
-            
+            signature = binascii.unhexlify(self.signature)
+        except binascii.Error:
+            raise InvalidSignatureError("La firma de la transacción es inválida.")
+        if not is_canonical_signature(signature):
+            raise InvalidSignatureError("La firma de la transacción no es canónica (su componente s es alto).")
+
+        signing_data = self.get_signing_data()
+        # Si este contenido exacto ya se verificó con esta firma, no se repite el ECDSA.
+        cache_key = signature_cache_key(signing_data, self.signature)
+        if SIGNATURE_CACHE.get(cache_key):
+            METRICS.inc("signature_cache_hits_total")
+            return True
+
+        try:
+            verifying_key = get_verifying_key(self.sender)
+
             # Verifica la firma contra los datos originales de la transacción.
-            is_signature_ok = verifying_key.verify(
-                binascii.unhexlify(self.signature),
-                self.get_signing_data().encode('utf-8'),
-                hashfunc=hashlib.sha256
-            )
+            with METRICS.time("transaction_verify_seconds", profile="is_valid"):
+                is_signature_ok = verifying_key.verify(
+                    signature,
+                    signing_data,
+                    hashfunc=hashlib.sha256
+                )
+            SIGNATURE_CACHE.put(cache_key, True)
             return is_signature_ok
         except (binascii.Error, ecdsa.BadSignatureError):
             raise InvalidSignatureError("La firma de la transacción es inválida.")
@@ -73,46 +186,198 @@ class Transaction:
             raise InvalidTransactionError(f"Error inesperado durante la validación: {e}")
 
 class Block:
-    def __init__(self, index, transactions, previous_hash, nonce=0):
+    __slots__ = ("index", "timestamp", "transactions", "previous_hash", "target", "nonce", "merkle_root", "hash")
+
+    def __init__(self, index, transactions, previous_hash, nonce=0, target=MAX_TARGET):
         self.index = index
         self.timestamp = time.time()
         self.transactions = transactions
         self.previous_hash = previous_hash
+        self.target = target  # Objetivo de dificultad (entero de 256 bits, ver `difficulty.py`)
         self.nonce = nonce
+        # La raíz de Merkle se calcula una sola vez; la cabecera tiene tamaño fijo.
+        self.merkle_root = self.calculate_merkle_root()
         self.hash = self.calculate_hash()
 
     def __repr__(self):
         return (
             f"Block(index={self.index}, hash={self.hash[:10]}..., "
-            f"previous_hash={self.previous_hash[:10]}..., tx_count={len(self.transactions)})"
+            f"previous_hash={self.previous_hash[:10]}..., "
+            f"tx_count={'podado' if self.transactions is None else len(self.transactions)})"
         )
 
-    def calculate_hash(self):
+    def to_dict(self):
         """
-        Genera el hash SHA-256 del bloque completo.
-        Para asegurar consistencia, las transacciones son serializadas.
+        Representación serializable (JSON) del bloque con sus transacciones
+        (`None` si el bloque está podado y solo conserva la cabecera).
         """
-        # Serializamos cada transacción de forma consistente
-        tx_data = "".join([json.dumps(tx.__dict__, sort_keys=True) for tx in self.transactions])
-        
-        block_content = f"{self.index}{self.timestamp}{tx_data}{self.previous_hash}{self.nonce}"
-        return hashlib.sha256(block_content.encode('utf-8')).hexdigest()
+        return {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "previous_hash": self.previous_hash,
+            "merkle_root": self.merkle_root,
+            "target": format_target(self.target),
+            "nonce": self.nonce,
+            "hash": self.hash,
+            "transactions": None if self.transactions is None else [tx.to_dict() for tx in self.transactions],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Reconstruye un bloque desde `to_dict` sin recalcular nada: la raíz de Merkle y el
+        hash guardados se conservan tal cual para que la auditoría detecte alteraciones.
+        """
+        block = cls.__new__(cls)
+        block.index = data["index"]
+        block.timestamp = data["timestamp"]
+        transactions = data["transactions"]
+        block.transactions = None if transactions is None else [Transaction.from_dict(tx) for tx in transactions]
+        block.previous_hash = data["previous_hash"]
+        block.target = parse_target(data["target"])
+        block.nonce = data["nonce"]
+        block.merkle_root = data["merkle_root"]
+        block.hash = data["hash"]
+        return block
+
+    def to_bytes(self):
+        """Codificación binaria compacta del bloque (la que se guarda en disco)."""
+        return encode_block(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Reconstruye un bloque desde `to_bytes`, igual que `from_dict`."""
+        return cls.from_dict(decode_block(data)[0])
+
+    def get_header(self):
+        """Cabecera del bloque (todo menos las transacciones), para la sincronización por cabeceras."""
+        return {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "previous_hash": self.previous_hash,
+            "merkle_root": self.merkle_root,
+            "target": format_target(self.target),
+            "nonce": self.nonce,
+            "hash": self.hash,
+        }
+
+    @classmethod
+    def from_header(cls, header):
+        """Bloque solo de cabecera (`transactions` es `None`); basta para verificar su hash."""
+        block = cls.__new__(cls)
+        block.index = header["index"]
+        block.timestamp = header["timestamp"]
+        block.transactions = None
+        block.previous_hash = header["previous_hash"]
+        block.target = parse_target(header["target"])
+        block.nonce = header["nonce"]
+        block.merkle_root = header["merkle_root"]
+        block.hash = header["hash"]
+        return block
+
+    def calculate_merkle_root(self):
+        """Calcula la raíz de Merkle sobre los identificadores de las transacciones."""
+        return compute_merkle_root([tx.get_id() for tx in self.transactions])
 
-    def mine_block(self, difficulty):
+    def get_header_prefix(self):
         """
-        Algoritmo de Prueba de Trabajo (PoW). Busca un hash que comience con 'N' ceros.
+        Cabecera binaria del bloque sin el nonce. Las transacciones solo intervienen a través
+        de la raíz de Merkle, así que su tamaño no depende del número de transacciones.
         """
-        target = "0" * difficulty
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
-            self.hash = self.calculate_hash()
+        return encode_header_prefix(self)
+
+    def calculate_hash(self):
+        """Genera el hash SHA-256 de la cabecera del bloque (incluido el nonce)."""
+        return hashlib.sha256(self.get_header_prefix() + encode_nonce(self.nonce)).hexdigest()
+
+    def meets_target(self):
+        """Indica si el hash del bloque cumple el objetivo de dificultad de su cabecera."""
+        return meets_target(self.hash, self.target)
+
+    def mine_block(self, target=None):
+        """
+        Algoritmo de Prueba de Trabajo (PoW). Busca un nonce cuyo hash, como entero de
+        256 bits, no supere el objetivo. Con `target` se fija antes el objetivo del bloque.
+        Retorna el número de hashes calculados.
+        """
+        if target is not None:
+            self.target = target
+        target = self.target
+        from_bytes = int.from_bytes
+        # "Midstate": el prefijo de la cabecera se procesa una sola vez y se copia por intento.
+        base = hashlib.sha256(self.get_header_prefix())
+        nonce = self.nonce
+        attempt = base.copy()
+        attempt.update(encode_nonce(nonce))
+        hashes = 1
+        # Se compara el resumen crudo; el texto hexadecimal solo se genera para el nonce ganador.
+        while from_bytes(attempt.digest(), "big") > target:
+            nonce += 1
+            attempt = base.copy()
+            attempt.update(encode_nonce(nonce))
+            hashes += 1
+        self.nonce = nonce
+        self.hash = attempt.hexdigest()
+        return hashes
 
 class Blockchain:
-    def __init__(self, difficulty=4, initial_beneficiary=None, initial_funds=0):
+    def __init__(self, difficulty=4, initial_beneficiary=None, initial_funds=0, data_dir=None, genesis_block=None,
+                 target_block_time=None, retarget_interval=RETARGET_INTERVAL, snapshot=None, prune_depth=None):
+        """
+        `difficulty` (en ceros hexadecimales) fija el objetivo de dificultad del génesis,
+        que heredan los bloques siguientes. Con `target_block_time` (segundos) el objetivo
+        se reajusta cada `retarget_interval` bloques para acercarse a ese tiempo por bloque.
+        Con `data_dir` la cadena se guarda en disco (ver `storage.BlockStore`). Si el
+        directorio ya contiene bloques, la cadena se reanuda desde ellos y no se crea
+        un nuevo génesis.
+        Con `genesis_block` se parte de un génesis dado, de modo que varios nodos
+        compartan la misma cadena desde el primer bloque.
+        Con `snapshot` (ver `snapshot.py`) se parte del estado y las cabeceras de una
+        instantánea ya verificada, en lugar de rehacer la cadena desde el génesis.
+        Con `prune_depth` solo se conservan completos los últimos bloques: cuando hay
+        `2 * prune_depth` sin podar, los anteriores a los últimos `prune_depth` se quedan
+        en cabecera (ver `prune`). La poda solo aplica a cadenas en memoria.
+        """
+        self.store = None
+        self.loaded_from_disk = False
         self.chain = []
-        self.pending_transactions = []
+        self.mempool = Mempool()
         self.difficulty = difficulty
-        
+        self.target_block_time = target_block_time
+        self.retarget_interval = retarget_interval
+        self.last_mining_stats = None
+        self.ledger = BalanceLedger()
+        self.index = ChainIndex()  # Con `data_dir`, un `DiskChainIndex` que se pone al día en la primera consulta
+        self.block_listeners = []  # Funciones llamadas con cada bloque añadido a la cadena
+        self.transaction_listeners = []  # Funciones llamadas con cada transacción admitida en la mempool
+        self.pruned_height = 0  # Los bloques por debajo de esta altura solo conservan la cabecera
+        # Árbol de bloques: la cadena principal está en `self.chain` (indexada por hash en
+        # `self.index`) y los bloques de ramas competidoras, por hash, en `side_blocks`.
+        self.side_blocks = {}
+        self.prune_depth = prune_depth
+        # Protege cadena, índices y mempool cuando se usan desde varios hilos (p. ej. la API HTTP)
+        self._lock = threading.RLock()
+
+        if (snapshot is not None or prune_depth) and data_dir is not None:
+            raise ValueError("Las instantáneas y la poda solo aplican a cadenas en memoria (sin `data_dir`).")
+
+        if snapshot is not None:
+            self._load_snapshot(snapshot)
+            return
+
+        if data_dir is not None:
+            self.store = BlockStore(data_dir)
+            self.chain = LazyChain(self.store, Block)
+            self.index = DiskChainIndex(self.store)
+            if len(self.chain):
+                self.loaded_from_disk = True
+                self._load_ledger()
+                return
+
+        if genesis_block is not None:
+            self._append_block(genesis_block)
+            return
+
         # Crear el bloque génesis, otorgando fondos iniciales si se especifica
         genesis_transactions = []
         if initial_beneficiary and initial_funds > 0:
@@ -123,134 +388,832 @@ class Blockchain:
             )
             genesis_transactions.append(genesis_tx)
             
-        self.chain.append(self.create_genesis_block(genesis_transactions))
+        self._append_block(self.create_genesis_block(genesis_transactions))
+
+    def _load_ledger(self):
+        """
+        Restaura el índice de saldos y sus registros de deshacer desde el último punto de
+        control guardado y aplica solo los bloques posteriores. Sin punto de control válido
+        (o si es de una versión que no guardaba los registros de deshacer), lo reconstruye
+        entero: sin esos registros no se podría reorganizar ni un bloque.
+        """
+        checkpoint = self.store.load_ledger_checkpoint()
+        if (checkpoint and "undo_records" in checkpoint and 0 < checkpoint["height"] <= len(self.chain)
+                and self.store.get_hash(checkpoint["height"] - 1) == checkpoint["tip_hash"]):
+            self.ledger.balances = checkpoint["balances"]
+            self.ledger.height = checkpoint["height"]
+            self.ledger.undo_records.extend(checkpoint["undo_records"])
+            for height in range(checkpoint["height"], len(self.chain)):
+                self.ledger.apply_block(self.chain[height])
+        else:
+            self.rebuild_ledger()
+
+    def close(self):
+        """Guarda el punto de control de saldos y cierra el almacén en disco (si lo hay)."""
+        if self.store is None:
+            return
+        self.store.save_ledger_checkpoint(
+            self.ledger.balances, self.ledger.height, self.get_latest_block().hash, self.ledger.undo_records
+        )
+        self.index.close()
+        self.store.close()
+        self.store = None
 
     def create_genesis_block(self, transactions):
         """Crea el primer bloque de la cadena."""
-        genesis_block = Block(index=0, transactions=transactions, previous_hash="0")
+        genesis_block = Block(
+            index=0, transactions=transactions, previous_hash="0",
+            target=target_from_hex_difficulty(self.difficulty)
+        )
         return genesis_block
 
+    def _append_block(self, block):
+        """Añade un bloque a la cadena y actualiza el índice de saldos y los índices de consulta."""
+        with self._lock:
+            self.chain.append(block)
+            self.ledger.apply_block(block)
+            if self.index.height == len(self.chain) - 1:
+                self.index.add_block(block)
+            if self.prune_depth and len(self.chain) - self.pruned_height >= 2 * self.prune_depth:
+                self.prune(len(self.chain) - self.prune_depth)
+        METRICS.set("chain_height", len(self.chain))
+        for listener in self.block_listeners:
+            listener(block)
+
+    def add_block_listener(self, listener):
+        """Registra `listener(block)`, que se llamará cada vez que se añada un bloque."""
+        self.block_listeners.append(listener)
+
+    def add_transaction_listener(self, listener):
+        """Registra `listener(transaction)`, que se llamará con cada transacción admitida en la mempool."""
+        self.transaction_listeners.append(listener)
+
     def get_latest_block(self):
         """Retorna el último bloque de la cadena."""
         return self.chain[-1]
 
+    def get_target_for(self, index, lookup=None):
+        """
+        Objetivo de dificultad que debe llevar el bloque de altura `index`: el del bloque
+        anterior o, en cada reajuste, ese mismo reescalado según lo que tardaron los
+        últimos `retarget_interval` bloques. `lookup(altura)` permite calcularlo sobre
+        cabeceras que aún no están en la cadena (por defecto se usa `self.chain`).
+        """
+        return expected_target(
+            index, lookup or self.chain.__getitem__, self.target_block_time, self.retarget_interval
+        )
+
+    def get_median_time_for(self, index, lookup=None):
+        """
+        Mediana de las marcas de tiempo que debe superar el bloque de altura `index` (ver
+        `difficulty.median_time_past`); `lookup` como en `get_target_for`.
+        """
+        return median_time_past(index, lookup or self.chain.__getitem__)
+
+    def get_next_target(self):
+        """Objetivo de dificultad del próximo bloque que se mine."""
+        return self.get_target_for(len(self.chain))
+
+    @property
+    def pending_transactions(self):
+        """Transacciones pendientes en orden de prioridad (mayor comisión primero)."""
+        with self._lock:
+            return list(self.mempool)
+
     def add_transaction(self, transaction):
         """
-        Añade una transacción a la lista de pendientes después de validarla.
+        Añade una transacción a la mempool después de validarla.
         Validaciones:
-        1. Datos básicos (remitente, receptor, monto).
-        2. Firma digital.
-        3. Fondos suficientes (excepto para coinbase).
+        1. Datos básicos (remitente, receptor, monto, comisión); las recompensas (coinbase) no se admiten.
+        2. Que no esté ya pendiente.
+        3. Firma digital.
+        4. Fondos suficientes descontando lo ya comprometido en pendientes.
+        """
+        with METRICS.time("add_transaction_seconds", profile="add_transaction"):
+            try:
+                self._admit_transaction(transaction)
+            except BlockchainError as e:
+                METRICS.inc("transactions_rejected_total", reason=type(e).__name__)
+                raise
+        METRICS.inc("transactions_accepted_total")
+        METRICS.set("mempool_size", len(self.mempool))
+        for listener in self.transaction_listeners:
+            listener(transaction)
+        return True
+
+    def add_transactions(self, transactions, workers=None):
+        """
+        Añade un lote de transacciones a la mempool con las mismas validaciones que
+        `add_transaction`, pero amortizadas sobre el lote:
+        - las firmas que no están en la caché se verifican juntas y, si son al menos
+          `PARALLEL_VERIFY_MIN_BATCH`, repartidas entre `workers` procesos (`None` usa
+          todos los núcleos),
+        - el saldo de cada remitente se consulta una sola vez y, como en llamadas
+          sucesivas, cada transacción descuenta lo ya comprometido por las anteriores
+          del mismo remitente (también las del propio lote).
+        No se detiene en la primera rechazada: retorna una lista alineada con
+        `transactions` con `None` para cada transacción aceptada y, para cada rechazada,
+        la excepción (`BlockchainError`) que habría lanzado `add_transaction`.
         """
-        if not transaction.sender or not transaction.recipient or transaction.amount <= 0:
-            raise InvalidTransactionError("La transacción tiene datos incompletos o monto inválido.")
+        with METRICS.time("add_transactions_seconds", profile="add_transactions"):
+            results = self._admit_batch(transactions, workers)
+        for error in results:
+            if error is None:
+                METRICS.inc("transactions_accepted_total")
+            else:
+                METRICS.inc("transactions_rejected_total", reason=type(error).__name__)
+        METRICS.set("mempool_size", len(self.mempool))
+        for transaction, error in zip(transactions, results):
+            if error is None:
+                for listener in self.transaction_listeners:
+                    listener(transaction)
+        return results
+
+    def _precheck_transaction(self, transaction):
+        """Comprobaciones previas a la firma (datos básicos y repeticiones); retorna el identificador."""
+        transaction.check_fields()
+        if not transaction.sender or not transaction.recipient:
+            raise InvalidTransactionError("La transacción tiene datos incompletos.")
+        if transaction.sender == COINBASE_SENDER:
+            # La recompensa solo la crea el minero al armar el bloque; no se firma ni tiene fondos.
+            raise InvalidTransactionError("Las transacciones de recompensa no se admiten en la mempool.")
+        if not _has_valid_amounts(transaction):
+            raise InvalidTransactionError(
+                "El monto debe ser un número finito positivo y la comisión uno finito no negativo."
+            )
+
+        tx_id = transaction.get_id()
+        if tx_id in self.mempool:
+            raise DuplicateTransactionError(f"La transacción {tx_id[:10]}... ya está pendiente.")
+        if self._is_confirmed(tx_id):
+            raise DuplicateTransactionError(f"La transacción {tx_id[:10]}... ya está en la cadena.")
+        return tx_id
 
-        # La validación de firma es crucial
+    def _check_funds(self, transaction, balance):
+        """No se permite gastar más de `balance`, contando los gastos aún pendientes del remitente."""
+        available = balance - self.mempool.get_pending_debit(transaction.sender)
+        needed = transaction.amount + transaction.fee
+        if available < needed:
+            raise InsufficientFundsError(
+                f"Fondos insuficientes para {transaction.sender[:10]}... "
+                f"(Disponible: {available}, Necesita: {needed})"
+            )
+
+    def _admit_transaction(self, transaction):
+        tx_id = self._precheck_transaction(transaction)
+
+        # La validación de firma es crucial (y costosa: se hace fuera del bloqueo)
         transaction.is_valid()
 
-        # No se permite gastar más de lo que se tiene
-        if transaction.sender != COINBASE_SENDER:
-            sender_balance = self.get_balance(transaction.sender)
-            if sender_balance < transaction.amount:
-                raise InsufficientFundsError(
-                    f"Fondos insuficientes para {transaction.sender[:10]}... "
-                    f"(Saldo: {sender_balance}, Necesita: {transaction.amount})"
-                )
-        
-        self.pending_transactions.append(transaction)
-        return True
+        with self._lock:
+            self._check_funds(transaction, self.get_balance(transaction.sender))
+            self.mempool.add(transaction, tx_id)
+
+    def _admit_batch(self, transactions, workers):
+        results = [None] * len(transactions)
+        tx_ids = [None] * len(transactions)
+        seen = set()
+        pending_signatures = []  # (posición, clave de la caché, datos firmados)
+        for position, tx in enumerate(transactions):
+            try:
+                tx_id = self._precheck_transaction(tx)
+                if tx_id in seen:
+                    raise DuplicateTransactionError(f"La transacción {tx_id[:10]}... está repetida en el lote.")
+                seen.add(tx_id)
+                tx_ids[position] = tx_id
+                if not tx.signature:
+                    raise InvalidTransactionError("La transacción no tiene firma o remitente.")
+                signing_data = tx.get_signing_data()
+                cache_key = signature_cache_key(signing_data, tx.signature)
+                if SIGNATURE_CACHE.get(cache_key):
+                    METRICS.inc("signature_cache_hits_total")
+                else:
+                    pending_signatures.append((position, cache_key, signing_data))
+            except BlockchainError as e:
+                results[position] = e
+            except (ValueError, TypeError, struct.error) as e:
+                # Datos que no se pueden codificar: se rechaza esta transacción, no el lote.
+                results[position] = InvalidTransactionError(f"Transacción mal formada: {e}")
+
+        # Las firmas se verifican fuera del bloqueo, como en `add_transaction`.
+        verified = verify_signatures(
+            [(transactions[p].sender, transactions[p].signature, data) for p, _, data in pending_signatures], workers
+        )
+        for (position, cache_key, _), outcome in zip(pending_signatures, verified):
+            if outcome is True:
+                SIGNATURE_CACHE.put(cache_key, True)
+            elif outcome is False:
+                results[position] = InvalidSignatureError("La firma de la transacción es inválida.")
+            else:
+                results[position] = InvalidTransactionError(f"Error inesperado durante la validación: {outcome}")
+
+        with self._lock:
+            balances = {}  # Un solo acceso al índice de saldos por remitente
+            for position, tx in enumerate(transactions):
+                if results[position] is not None:
+                    continue
+                try:
+                    if tx.sender not in balances:
+                        balances[tx.sender] = self.get_balance(tx.sender)
+                    self._check_funds(tx, balances[tx.sender])
+                    self.mempool.add(tx, tx_ids[position])
+                except BlockchainError as e:
+                    results[position] = e
+        return results
+
+    def mine_pending_transactions(self, miner_reward_address, workers=1, max_transactions=MAX_BLOCK_TRANSACTIONS):
+        """
+        Mina un nuevo bloque con las transacciones pendientes de mayor comisión
+        (hasta `max_transactions`) y recompensa al minero con la recompensa fija más
+        las comisiones. Con `workers` > 1 (o `None` para usar todos los núcleos) el
+        espacio de nonces se reparte entre varios procesos. Las estadísticas de la
+        última minería quedan en `self.last_mining_stats` (y en `metrics.METRICS`).
+        Retorna el bloque, o `None` si no hay pendientes o si la cadena avanzó mientras
+        se minaba. Para minar sin bloquear a quien llama, ver `miner.BackgroundMiner`.
+        """
+        new_block = self.build_block_template(miner_reward_address, max_transactions)
+        if new_block is None:
+            return None
+
+        with METRICS.time("mining_block_seconds", profile="mine"):
+            if workers == 1:
+                start_t = time.time()
+                hashes = new_block.mine_block()
+                stats = MiningStats(hashes, time.time() - start_t, 1)
+            else:
+                stats = mine_parallel(new_block, workers)
+        return self.submit_mined_block(new_block, stats)
 
-    def mine_pending_transactions(self, miner_reward_address):
+    def build_block_template(self, miner_reward_address, max_transactions=MAX_BLOCK_TRANSACTIONS):
         """
-        Mina un nuevo bloque con las transacciones pendientes y recompensa al minero.
+        Bloque candidato, aún sin minar, sobre la punta actual: la recompensa del minero
+        (recompensa fija más comisiones) seguida de las pendientes de mayor comisión
+        (hasta `max_transactions`). Retorna `None` si no hay pendientes.
         """
-        if not self.pending_transactions:
-            print("No hay transacciones pendientes para minar.")
+        with self._lock:
+            template = self.mempool.get_block_template(max_transactions)
+            last_block = self.get_latest_block()
+            target = self.get_next_target()
+        if not template:
             return None
 
         # Recompensa para el minero (transacción coinbase)
         reward_tx = Transaction(
             sender_pub_key=COINBASE_SENDER,
             recipient_pub_key=miner_reward_address,
-            amount=MINING_REWARD
+            amount=MINING_REWARD + sum(tx.fee for tx in template)
         )
         # Añadimos la recompensa al principio de la lista para minarla en este bloque
-        block_transactions = [reward_tx] + self.pending_transactions
-
-        last_block = self.get_latest_block()
-        new_block = Block(
-            index=len(self.chain),
-            transactions=block_transactions,
-            previous_hash=last_block.hash
+        return Block(
+            index=last_block.index + 1,
+            transactions=[reward_tx] + template,
+            previous_hash=last_block.hash,
+            target=target
         )
-        
-        print(f"\n--- Iniciando minería de bloque {new_block.index} con {len(block_transactions)} transacciones ---")
-        start_t = time.time()
-        new_block.mine_block(self.difficulty)
-        end_t = time.time()
-        print(f"Tiempo de cómputo: {end_t - start_t:.4f} segundos.")
-        print(f"Bloque #{new_block.index} minado con éxito. Hash: {new_block.hash[:20]}...")
 
-        self.chain.append(new_block)
-        self.pending_transactions = [] # Limpiar mempool
-        return new_block
+    def submit_mined_block(self, block, stats):
+        """
+        Añade un bloque de `build_block_template` ya minado y registra sus estadísticas
+        (`MiningStats`) en `self.last_mining_stats`. Retorna el bloque, o `None` si la
+        cadena avanzó mientras se minaba.
+        """
+        self.last_mining_stats = stats
+        METRICS.inc("mining_hashes_total", stats.hashes)
+        METRICS.set("mining_hash_rate", stats.hash_rate)
+
+        with self._lock:
+            if self.get_latest_block().hash != block.previous_hash:
+                # Otro bloque llegó a la cadena mientras se minaba: este ya no enlaza con la punta.
+                METRICS.inc("mining_discarded_total")
+                return None
+            self.mempool.remove_transactions(block.transactions[1:]) # Retirar de la mempool lo ya minado
+            self._append_block(block)
+        METRICS.inc("mining_blocks_total")
+        METRICS.set("mempool_size", len(self.mempool))
+        return block
+
+    def add_block(self, block):
+        """
+        Valida y añade un bloque minado por otro nodo.
+        Además de la auditoría de `verify_block` (que incluye la prueba de trabajo), comprueba
+        que el bloque lleve el objetivo de dificultad que le corresponde, que la recompensa
+        no supere lo permitido, que ninguna transacción esté ya en la cadena y que cada
+        remitente tenga fondos para todo lo que gasta en el bloque.
+        Si el bloque no continúa la punta sino otro bloque conocido, se guarda en una rama
+        lateral y, si esa rama acumula más trabajo que la principal desde el punto en que
+        se separan, la cadena se reorganiza hacia ella (ver `_reorganize`).
+        Retorna el bloque, o `None` si ya se conocía. Lanza `OrphanBlockError` si no se
+        conoce su padre e `InvalidBlockError` si el bloque no es aceptable.
+        """
+        with self._lock:
+            if block.transactions is None:
+                raise InvalidBlockError(f"El bloque {block.index} llegó sin transacciones (podado).")
+            if self.has_block(block.hash):
+                return None
+            latest = self.get_latest_block()
+            if block.previous_hash != latest.hash:
+                return self._add_side_block(block)
+            if block.index != latest.index + 1:
+                raise InvalidBlockError(
+                    f"El bloque {block.index} no continúa la cadena (altura actual: {len(self.chain)})."
+                )
+            verify_block(block, latest.hash, self.get_target_for(block.index), self.get_median_time_for(block.index))
+            self._connect_block(block)
+            self._revalidate_mempool({tx.sender for tx in block.transactions})
+            self._prune_side_blocks()
+        return block
+
+    def import_blocks(self, blocks, workers=1):
+        """
+        Valida y añade en orden un lote de bloques consecutivos que continúa la punta (ver
+        `chain_io.import_chain`). Hace las mismas comprobaciones que `add_block`, pero la
+        auditoría de `verify_block` de todo el lote (firmas incluidas) se hace antes de
+        añadir nada y, con `workers` > 1, se reparte entre varios procesos.
+        Si la auditoría falla no se añade ningún bloque; si falla una regla económica,
+        quedan añadidos los bloques anteriores del lote. Lanza `InvalidBlockError` y
+        retorna el número de bloques añadidos.
+        """
+        if not blocks:
+            return 0
+        with self._lock:
+            first = len(self.chain)
+            for offset, block in enumerate(blocks):
+                if block.transactions is None:
+                    raise InvalidBlockError(f"El bloque {block.index} llegó sin transacciones (podado).")
+                if block.index != first + offset:
+                    raise InvalidBlockError(
+                        f"El bloque {block.index} no continúa la cadena (se esperaba la altura {first + offset})."
+                    )
+
+            def lookup(height):
+                return blocks[height - first] if height >= first else self.chain[height]
+
+            if workers == 1:
+                previous_hash = self.chain[first - 1].hash
+                for block in blocks:
+                    verify_block(block, previous_hash, self.get_target_for(block.index, lookup),
+                                 self.get_median_time_for(block.index, lookup))
+                    previous_hash = block.hash
+            else:
+                # El tramo empieza con la punta actual para que se compruebe el enlace del primer bloque.
+                audit_chain_parallel(
+                    [self.chain[first - 1]] + list(blocks), workers,
+                    expected_target=lambda position: self.get_target_for(first - 1 + position, lookup),
+                    median_time=lambda position: self.get_median_time_for(first - 1 + position, lookup),
+                )
+
+            senders = set()
+            for block in blocks:
+                self._connect_block(block)
+                senders.update(tx.sender for tx in block.transactions)
+            self._revalidate_mempool(senders)
+            self._prune_side_blocks()
+        return len(blocks)
+
+    def has_block(self, block_hash):
+        """Indica si el bloque está en la cadena principal o en una rama lateral."""
+        with self._lock:
+            if block_hash in self.side_blocks:
+                return True
+            self.index.sync(self.chain)
+            return self.index.get_height(block_hash) is not None
+
+    def _connect_block(self, block):
+        """Comprueba las reglas económicas de un bloque ya verificado y lo añade sobre la punta."""
+        self._check_block_transactions(block)
+        self.mempool.remove_transactions(block.transactions)
+        self._append_block(block)
+
+    def _disconnect_tip(self):
+        """Retira el último bloque de la cadena deshaciendo su efecto y lo guarda como rama lateral."""
+        block = self.chain[-1]
+        self.ledger.revert_block()
+        if self.index.height == len(self.chain):
+            self.index.remove_block(block)
+        self.chain.pop()
+        self.side_blocks[block.hash] = block
+        return block
+
+    def _get_branch(self, block):
+        """
+        Rama lateral que termina en `block`: retorna la altura del bloque de la cadena
+        principal del que se separa y la lista de bloques de la rama, en orden.
+        """
+        branch = [block]
+        parent_hash = block.previous_hash
+        while parent_hash in self.side_blocks:
+            parent = self.side_blocks[parent_hash]
+            branch.append(parent)
+            parent_hash = parent.previous_hash
+        fork_height = self.index.get_height(parent_hash)
+        if fork_height is None:
+            raise OrphanBlockError(f"Se desconoce el bloque padre del bloque {block.index} ({parent_hash[:10]}...).")
+        branch.reverse()
+        return fork_height, branch
+
+    def _add_side_block(self, block):
+        fork_height, branch = self._get_branch(block)
+        if block.index != fork_height + len(branch):
+            raise InvalidBlockError(f"El índice del bloque {block.index} no corresponde con su posición en la rama.")
+        depth = len(self.chain) - 1 - fork_height
+        if depth > len(self.ledger.undo_records) or fork_height + 1 < self.pruned_height:
+            raise InvalidBlockError(
+                f"El bloque {block.index} se separa de la cadena {depth} bloques por debajo de la punta; "
+                f"no se puede reorganizar a tanta profundidad."
+            )
+
+        def lookup(height):
+            return branch[height - fork_height - 1] if height > fork_height else self.chain[height]
+
+        parent_hash = branch[-2].hash if len(branch) > 1 else self.chain[fork_height].hash
+        verify_block(block, parent_hash, self.get_target_for(block.index, lookup),
+                     self.get_median_time_for(block.index, lookup))
+        self.side_blocks[block.hash] = block
+        METRICS.set("chain_side_blocks", len(self.side_blocks))
+
+        # Solo se compara el trabajo desde la bifurcación: el costo depende de la profundidad.
+        branch_work = sum(block_work(b.target) for b in branch)
+        main_work = sum(block_work(self.chain[h].target) for h in range(fork_height + 1, len(self.chain)))
+        if branch_work > main_work:
+            self._reorganize(fork_height, branch)
+        self._prune_side_blocks()
+        return block
+
+    def _reorganize(self, fork_height, branch):
+        """
+        Cambia la punta a `branch`, que parte del bloque `fork_height`: se deshacen los
+        bloques de la cadena principal por encima de la bifurcación (con los registros de
+        deshacer del índice de saldos) y se aplican los de la rama. Si un bloque de la rama
+        incumple las reglas económicas, se descarta la rama, se restaura la cadena anterior y
+        las pendientes que había tomado la rama vuelven a la mempool.
+        Las transacciones de los bloques retirados que no entran en la rama vuelven a la mempool.
+        """
+        disconnected = []
+        while len(self.chain) - 1 > fork_height:
+            disconnected.append(self._disconnect_tip())
+        connected = 0
+        try:
+            for block in branch:
+                self._connect_block(block)
+                del self.side_blocks[block.hash]
+                connected += 1
+        except InvalidBlockError:
+            for _ in range(connected):
+                self._disconnect_tip()
+            for block in branch:
+                self.side_blocks.pop(block.hash, None)
+            for block in reversed(disconnected):
+                del self.side_blocks[block.hash]
+                self._append_block(block)
+            # Las pendientes que se retiraron de la mempool al conectar la rama vuelven a ella.
+            self._readmit_transactions(branch[:connected])
+            raise
+
+        senders = self._readmit_transactions(reversed(disconnected))
+        for block in branch:
+            senders.update(tx.sender for tx in block.transactions)
+        self._revalidate_mempool(senders)
+        METRICS.inc("chain_reorgs_total")
+        METRICS.set("chain_last_reorg_depth", len(disconnected))
+
+    def _readmit_transactions(self, blocks):
+        """
+        Devuelve a la mempool las transacciones (salvo la recompensa) de bloques retirados de
+        la cadena; las que ya no son válidas se descartan. Retorna sus remitentes.
+        """
+        senders = set()
+        for block in blocks:
+            for tx in block.transactions[1:]:
+                senders.add(tx.sender)
+                try:
+                    self._admit_transaction(tx)
+                except BlockchainError:
+                    pass
+        return senders
+
+    def _prune_side_blocks(self):
+        """Olvida las ramas laterales que ya quedaron por debajo de la profundidad de reorganización."""
+        floor = len(self.chain) - REORG_MAX_DEPTH
+        for block_hash in [h for h, b in self.side_blocks.items() if b.index < floor]:
+            del self.side_blocks[block_hash]
+        METRICS.set("chain_side_blocks", len(self.side_blocks))
+
+    def get_tips(self):
+        """
+        Puntas conocidas del árbol de bloques: la de la cadena principal y la de cada rama
+        lateral, con la altura desde la que se separa cada una.
+        """
+        with self._lock:
+            latest = self.get_latest_block()
+            tips = [{"hash": latest.hash, "height": latest.index, "fork_height": latest.index, "canonical": True}]
+            parents = {block.previous_hash for block in self.side_blocks.values()}
+            for block in self.side_blocks.values():
+                if block.hash not in parents:
+                    try:
+                        fork_height, _ = self._get_branch(block)
+                    except OrphanBlockError:
+                        continue  # Su rama se separaba por debajo de la profundidad de reorganización
+                    tips.append({"hash": block.hash, "height": block.index, "fork_height": fork_height,
+                                 "canonical": False})
+            return tips
+
+    def _check_block_transactions(self, block):
+        """Reglas económicas de un bloque ajeno: coinbase, repeticiones y fondos."""
+        transactions = block.transactions
+        if not transactions or transactions[0].sender != COINBASE_SENDER:
+            raise InvalidBlockError(f"El bloque {block.index} no empieza con la transacción de recompensa.")
+        fees = 0
+        spent = {}
+        seen_ids = set()
+        for tx in transactions[1:]:
+            tx_id = tx.get_id()
+            if tx.sender == COINBASE_SENDER:
+                raise InvalidBlockError(f"El bloque {block.index} contiene más de una recompensa.")
+            if not _has_valid_amounts(tx):
+                raise InvalidBlockError(f"El bloque {block.index} contiene montos inválidos.")
+            if tx_id in seen_ids or self._is_confirmed(tx_id):
+                raise InvalidBlockError(f"El bloque {block.index} repite la transacción {tx_id[:10]}...")
+            seen_ids.add(tx_id)
+            spent[tx.sender] = spent.get(tx.sender, 0) + tx.amount + tx.fee
+            if spent[tx.sender] > self.get_balance(tx.sender):
+                raise InvalidBlockError(
+                    f"El bloque {block.index} gasta más fondos de los que tiene {tx.sender[:10]}..."
+                )
+            fees += tx.fee
+        reward = transactions[0]
+        if not _is_finite_number(reward.amount) or reward.amount < 0 or reward.fee != 0:
+            raise InvalidBlockError(f"La recompensa del bloque {block.index} tiene montos inválidos.")
+        if reward.amount > MINING_REWARD + fees:
+            raise InvalidBlockError(f"La recompensa del bloque {block.index} supera la permitida.")
+
+    def _revalidate_mempool(self, senders):
+        """
+        Tras aceptar un bloque ajeno, descarta las transacciones pendientes de los remitentes
+        afectados que ya no tienen fondos (se retiran primero las de menor prioridad).
+        """
+        for sender in senders:
+            pending = self.mempool.get_sender_transactions(sender)
+            while pending and self.mempool.get_pending_debit(sender) > self.get_balance(sender):
+                self.mempool.remove(pending.pop().get_id())
+
+    def _is_confirmed(self, tx_id):
+        """Indica si una transacción ya está incluida en la cadena."""
+        with self._lock:
+            self.index.sync(self.chain)
+            return self.index.contains_transaction(tx_id)
+
+    def _load_snapshot(self, snapshot):
+        """
+        Parte de una instantánea: comprueba su hash y sus cabeceras (encadenamiento, objetivo
+        de dificultad y prueba de trabajo), que pasan a ser la cadena podada.
+        """
+        verify_snapshot(snapshot)
+        if "headers" not in snapshot:
+            raise SnapshotError("La instantánea no incluye las cabeceras de la cadena.")
+        headers = [Block.from_header(header) for header in snapshot["headers"]]
+        if not headers:
+            raise SnapshotError("La instantánea no cubre ningún bloque.")
+        genesis = headers[0]
+        if genesis.index != 0 or genesis.hash != genesis.calculate_hash():
+            raise SnapshotError("La cabecera del génesis de la instantánea no es válida.")
+        for height in range(1, len(headers)):
+            if headers[height].index != height:
+                raise SnapshotError(f"Cabecera fuera de orden en la instantánea: se esperaba la altura {height}.")
+            try:
+                lookup = headers.__getitem__
+                verify_block(headers[height], headers[height - 1].hash, self.get_target_for(height, lookup),
+                             self.get_median_time_for(height, lookup))
+            except InvalidBlockError as e:
+                raise SnapshotError(f"Cabeceras de la instantánea inválidas: {e}")
+
+        self.chain = headers
+        self.pruned_height = len(headers)
+        self.ledger.set_base(snapshot["balances"], len(headers))
+        self.ledger.rebuild(self.chain)
+        self.index.pruned_tx_ids = set(snapshot["tx_ids"])
+        METRICS.set("chain_height", len(self.chain))
+
+    def _balances_at(self, height):
+        """Saldos tras los primeros `height` bloques (no antes de la última poda)."""
+        if height == len(self.chain):
+            return dict(self.ledger.balances)
+        return scan_balances(self.chain, self.ledger.base_height, height, self.ledger.base_balances)
+
+    def _check_prunable_height(self, height):
+        if not self.pruned_height <= height <= len(self.chain) or height < 1:
+            raise ValueError(
+                f"Altura fuera de rango: debe estar entre {max(self.pruned_height, 1)} y {len(self.chain)}."
+            )
+
+    def create_snapshot(self, height=None, include_headers=True):
+        """
+        Instantánea del estado tras los primeros `height` bloques (por defecto, toda la
+        cadena). Ver `snapshot.py`; su `hash` es el valor que se publica para verificarla.
+        """
+        with self._lock:
+            height = len(self.chain) if height is None else height
+            self._check_prunable_height(height)
+            self.index.sync(self.chain)
+            tx_ids = self.index.get_tx_ids(height)
+            headers = [self.chain[i].get_header() for i in range(height)] if include_headers else None
+            return build_snapshot(height, self.chain[height - 1].hash, self._balances_at(height), tx_ids, headers)
+
+    def prune(self, height):
+        """
+        Descarta las transacciones de los bloques anteriores a `height`, que se quedan
+        solo con la cabecera. Los saldos en esa altura pasan a ser el estado de partida
+        del índice de saldos y, de las transacciones, solo se guardan sus identificadores.
+        Las transacciones podadas ya no se pueden consultar ni auditar.
+        """
+        if self.store is not None:
+            raise ValueError("La poda solo aplica a cadenas en memoria: con `data_dir` los bloques se leen de disco.")
+        with self._lock:
+            self._check_prunable_height(height)
+            balances = self._balances_at(height)
+            self.index.sync(self.chain)
+            for i in range(self.pruned_height, height):
+                self.chain[i] = Block.from_header(self.chain[i].get_header())
+            self.index.prune(height)
+            self.ledger.set_base(balances, height)
+            self.pruned_height = height
 
     def get_balance(self, wallet_address):
-        """Calcula y retorna el saldo de una dirección de billetera recorriendo toda la cadena."""
-        balance = 0
-        for block in self.chain:
-            for tx in block.transactions:
+        """Retorna el saldo confirmado de una dirección usando el índice de saldos (O(1))."""
+        return self.ledger.get_balance(wallet_address)
+
+    def get_block_by_height(self, height):
+        """Retorna el bloque a la altura indicada o `None` si no existe."""
+        with self._lock:
+            if not 0 <= height < len(self.chain):
+                return None
+            return self.chain[height]
+
+    def get_blocks(self, start, end):
+        """Bloques de la cadena principal en [start, end), leídos juntos bajo el bloqueo."""
+        with self._lock:
+            return [self.chain[height] for height in range(max(start, 0), min(end, len(self.chain)))]
+
+    def get_block_by_hash(self, block_hash):
+        """Retorna el bloque con el hash indicado (de la cadena o de una rama lateral) o `None`."""
+        with self._lock:
+            self.index.sync(self.chain)
+            height = self.index.get_height(block_hash)
+            if height is None:
+                return self.side_blocks.get(block_hash)
+            return self.chain[height]
+
+    def get_transaction(self, tx_id):
+        """
+        Busca una transacción por su identificador, en la cadena o en la mempool.
+        Retorna un diccionario con la transacción y su ubicación (altura `None` si está pendiente),
+        o `None` si no se encuentra.
+        """
+        with self._lock:
+            self.index.sync(self.chain)
+            location = self.index.get_location(tx_id)
+            if location is not None:
+                height, position = location
+                block = self.chain[height]
+                return {"transaction": block.transactions[position], "height": height,
+                        "position": position, "block_hash": block.hash}
+            if tx_id in self.mempool:
+                return {"transaction": self.mempool.transactions[tx_id], "height": None,
+                        "position": None, "block_hash": None}
+            return None
+
+    def get_merkle_proof(self, tx_id):
+        """
+        Prueba de inclusión de una transacción confirmada (ver `merkle.py`) con la altura y
+        el hash del bloque que la contiene, para que un cliente ligero la compruebe contra
+        la raíz de Merkle de esa cabecera. Retorna `None` si la transacción no está en la
+        cadena (o su bloque está podado).
+        """
+        with self._lock:
+            self.index.sync(self.chain)
+            location = self.index.get_location(tx_id)
+            if location is None:
+                return None
+            height, position = location
+            block = self.chain[height]
+        return {
+            "tx_id": tx_id,
+            "height": height,
+            "block_hash": block.hash,
+            "merkle_root": block.merkle_root,
+            "position": position,
+            "proof": build_merkle_proof([tx.get_id() for tx in block.transactions], position),
+        }
+
+    def get_address_history(self, wallet_address, offset=0, limit=50, newest_first=True):
+        """
+        Historial paginado de transacciones confirmadas en las que participa una dirección.
+        Retorna el total de transacciones y la página solicitada.
+        """
+        with self._lock:
+            self.index.sync(self.chain)
+            items = []
+            for height, position in self.index.get_history(wallet_address, offset, limit, newest_first):
+                block = self.chain[height]
+                items.append({"transaction": block.transactions[position], "height": height,
+                              "position": position, "block_hash": block.hash})
+            total = self.index.count_history(wallet_address)
+        return {
+            "address": wallet_address,
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "items": items,
+        }
+
+    def calculate_balance_from_chain(self, wallet_address):
+        """
+        Calcula el saldo de una dirección recorriendo toda la cadena (sin usar el índice).
+        En una cadena podada se parte del saldo en la altura de la poda.
+        """
+        balance = self.ledger.base_balances.get(wallet_address, 0)
+        for height in range(self.ledger.base_height, len(self.chain)):
+            for tx in self.chain[height].transactions:
                 if tx.recipient == wallet_address:
                     balance += tx.amount
                 if tx.sender == wallet_address:
-                    balance -= tx.amount
+                    balance -= tx.amount + tx.fee
         return balance
 
-    def is_chain_valid(self):
+    def rebuild_ledger(self):
+        """Reconstruye el índice de saldos desde el bloque génesis."""
+        self.ledger.rebuild(self.chain)
+
+    def verify_ledger(self):
         """
-        Auditoría completa de la integridad de la cadena.
-        1. Verifica el enlace de hashes entre bloques.
-        2. Verifica la integridad del hash de cada bloque.
-        3. Verifica la validez de cada transacción dentro de cada bloque.
+        Comprueba que el índice de saldos coincide con un recorrido completo de la cadena.
+        Lanza `LedgerInconsistencyError` si no coincide (por ejemplo, tras alterar un bloque).
         """
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i-1]
+        return self.ledger.verify(self.chain)
 
-            # 1. ¿El hash del bloque es correcto?
-            if current_block.hash != current_block.calculate_hash():
-                raise InvalidBlockError(f"Hash del bloque {current_block.index} es inválido.")
+    def is_chain_valid(self, workers=1, progress=None):
+        """
+        Auditoría completa de la integridad de la cadena (ver `verify_block`), incluidos la
+        prueba de trabajo y el objetivo de dificultad de cada bloque.
+        Con `workers` > 1 (o `None` para usar todos los núcleos) los bloques se reparten
+        en tramos entre varios procesos; el error reportado es siempre el del bloque
+        de menor índice, igual que en la auditoría secuencial.
+        `progress(checked, total)` se invoca periódicamente con los bloques auditados.
+        """
+        mode = "sequential" if workers == 1 else "parallel"
+        with METRICS.time("chain_validation_seconds", profile="is_chain_valid", mode=mode):
+            try:
+                return self._audit_chain(workers, progress)
+            except InvalidBlockError:
+                METRICS.inc("chain_validation_failures_total")
+                raise
 
-            # 2. ¿El puntero al hash anterior es correcto?
-            if current_block.previous_hash != previous_block.hash:
-                raise InvalidBlockError(
-                    f"Enlace roto: El hash previo del bloque {current_block.index} "
-                    f"no coincide con el hash del bloque {previous_block.index}."
-                )
-            
-            # 3. ¿Todas las transacciones en el bloque son válidas?
-            for tx in current_block.transactions:
-                try:
-                    # Se vuelve a validar cada transacción como parte de la auditoría
-                    tx.is_valid()
-                except InvalidTransactionError as e:
-                    raise InvalidBlockError(f"Transacción inválida en bloque {current_block.index}: {e}")
+    def _audit_chain(self, workers, progress):
+        if workers != 1:
+            return audit_chain_parallel(self.chain, workers, progress, expected_target=self.get_target_for,
+                                        median_time=self.get_median_time_for)
+
+        total = len(self.chain) - 1
+        for i in range(1, len(self.chain)):
+            verify_block(self.chain[i], self.chain[i-1].hash, self.get_target_for(i), self.get_median_time_for(i))
+            if progress and (i % AUDIT_SHARD_SIZE == 0 or i == total):
+                progress(i, total)
         return True
 
-    def print_chain(self):
-        """Imprime una representación visual de toda la cadena de bloques."""
-        print("\n" + "="*30 + " CADENA DE BLOQUES " + "="*30)
-        for block in self.chain:
-            print(f"\nBloque #{block.index} | Hash: {block.hash}")
-            print(f"  Timestamp: {time.ctime(block.timestamp)}")
-            print(f"  Nonce: {block.nonce}")
-            print(f"  Hash Anterior: {block.previous_hash}")
-            print(f"  Transacciones ({len(block.transactions)}):")
+    def iter_blocks(self, start=0, end=None):
+        """
+        Genera los bloques de la cadena principal en [start, end) de uno en uno, sin
+        copiar la cadena. Con `data_dir` se decodifican desde el disco sin pasar por la
+        caché de bloques, para que un recorrido completo no desplace los bloques recientes.
+        """
+        end = len(self.chain) if end is None else min(end, len(self.chain))
+        for height in range(max(start, 0), end):
+            if self.store is not None:
+                yield Block.from_bytes(self.chain.read_bytes(height))
+            else:
+                yield self.chain[height]
+
+    def iter_chain_text(self, start=0, end=None):
+        """Genera, línea a línea, la representación visual de los bloques en [start, end)."""
+        yield "\n" + "="*30 + " CADENA DE BLOQUES " + "="*30
+        for block in self.iter_blocks(start, end):
+            yield f"\nBloque #{block.index} | Hash: {block.hash}"
+            yield f"  Timestamp: {time.ctime(block.timestamp)}"
+            yield f"  Nonce: {block.nonce}"
+            yield f"  Hash Anterior: {block.previous_hash}"
+            if block.transactions is None:
+                yield "  Transacciones: (podadas; solo se conserva la cabecera)"
+                continue
+            yield f"  Transacciones ({len(block.transactions)}):"
             if not block.transactions:
-                print("    (No hay transacciones en este bloque)")
+                yield "    (No hay transacciones en este bloque)"
             for i, tx in enumerate(block.transactions):
                 if tx.sender == COINBASE_SENDER:
-                    print(f"    {i+1}. [Recompensa] -> {tx.recipient[:15]}... | +{tx.amount}")
+                    yield f"    {i+1}. [Recompensa] -> {tx.recipient[:15]}... | +{tx.amount}"
                 else:
-                    print(f"    {i+1}. {tx.sender[:15]}... -> {tx.recipient[:15]}... | Monto: {tx.amount}")
-        print("\n" + "="*80)
\ No newline at end of file
+                    yield f"    {i+1}. {tx.sender[:15]}... -> {tx.recipient[:15]}... | Monto: {tx.amount}"
+        yield "\n" + "="*80
+
+    def print_chain(self, start=0, end=None):
+        """Imprime una representación visual de los bloques en [start, end) (por defecto, toda la cadena)."""
+        for line in self.iter_chain_text(start, end):
+            print(line)
\ No newline at end of file
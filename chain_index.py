@@ -0,0 +1,226 @@
+"""
+Índices secundarios de la cadena para consultas sin recorridos lineales:
+- hash de bloque -> altura
+- identificador de transacción -> (altura, posición en el bloque)
+- dirección -> lista de (altura, posición) de las transacciones en las que participa
+
+Los bloques podados (solo cabecera) se indexan solo por su hash; de sus transacciones
+se conservan únicamente los identificadores, para detectar repeticiones.
+
+`ChainIndex` los guarda en memoria. `DiskChainIndex` guarda los mismos índices en SQLite
+junto al almacén de bloques (ver `storage.py`), para que en cadenas con `data_dir` ni la
+memoria ni el arranque crezcan con la longitud de la cadena.
+"""
+
+import os
+import sqlite3
+from bisect import bisect_left
+
+
+class ChainIndex:
+    def __init__(self):
+        self.block_heights = {}
+        self.tx_locations = {}
+        self.address_history = {}
+        self.pruned_tx_ids = set()  # Transacciones confirmadas en bloques ya podados
+        self.height = 0  # Número de bloques indexados
+
+    def add_block(self, block):
+        """Indexa el siguiente bloque de la cadena (su índice debe ser `self.height`)."""
+        height = self.height
+        self.block_heights[block.hash] = height
+        if block.transactions is None:
+            self.height += 1
+            return
+        for position, tx in enumerate(block.transactions):
+            location = (height, position)
+            self.tx_locations[tx.get_id()] = location
+            self.address_history.setdefault(tx.sender, []).append(location)
+            if tx.recipient != tx.sender:
+                self.address_history.setdefault(tx.recipient, []).append(location)
+        self.height += 1
+
+    def remove_block(self, block):
+        """
+        Retira del índice el último bloque indexado (al deshacerlo en una reorganización).
+        Sus entradas son siempre las últimas de cada historial, así que basta con sacarlas del final.
+        """
+        self.height -= 1
+        height = self.height
+        self.block_heights.pop(block.hash, None)
+        if block.transactions is None:
+            return
+        for position in range(len(block.transactions) - 1, -1, -1):
+            tx = block.transactions[position]
+            location = (height, position)
+            self.tx_locations.pop(tx.get_id(), None)
+            for address in {tx.sender, tx.recipient}:
+                locations = self.address_history.get(address)
+                if locations and locations[-1] == location:
+                    locations.pop()
+                    if not locations:
+                        del self.address_history[address]
+
+    def sync(self, chain):
+        """Indexa los bloques de `chain` que aún no lo están."""
+        for height in range(self.height, len(chain)):
+            self.add_block(chain[height])
+
+    def prune(self, height):
+        """
+        Olvida la ubicación de las transacciones de los bloques anteriores a `height`
+        (que pasan a ser solo cabecera), conservando sus identificadores.
+        """
+        for tx_id, location in list(self.tx_locations.items()):
+            if location[0] < height:
+                self.pruned_tx_ids.add(tx_id)
+                del self.tx_locations[tx_id]
+        for address, locations in list(self.address_history.items()):
+            # Las listas están en orden de altura: basta con cortar por el principio.
+            cut = bisect_left(locations, (height, 0))
+            if cut == len(locations):
+                del self.address_history[address]
+            elif cut:
+                self.address_history[address] = locations[cut:]
+
+    def contains_transaction(self, tx_id):
+        """Indica si la transacción está confirmada, en un bloque completo o ya podado."""
+        return tx_id in self.tx_locations or tx_id in self.pruned_tx_ids
+
+    def get_tx_ids(self, height):
+        """Identificadores de las transacciones confirmadas en los bloques anteriores a `height`."""
+        tx_ids = set(self.pruned_tx_ids)
+        tx_ids.update(tx_id for tx_id, (tx_height, _) in self.tx_locations.items() if tx_height < height)
+        return tx_ids
+
+    def get_height(self, block_hash):
+        return self.block_heights.get(block_hash)
+
+    def get_location(self, tx_id):
+        return self.tx_locations.get(tx_id)
+
+    def count_history(self, address):
+        return len(self.address_history.get(address, ()))
+
+    def get_history(self, address, offset=0, limit=50, newest_first=True):
+        """
+        Página de ubicaciones de una dirección. El costo depende de `limit`, no del
+        número total de transacciones de la dirección.
+        """
+        locations = self.address_history.get(address, [])
+        if newest_first:
+            end = max(len(locations) - offset, 0)
+            return locations[max(end - limit, 0):end][::-1]
+        return locations[offset:offset + limit]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (height INTEGER PRIMARY KEY, hash BLOB NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS transactions (
+    tx_id BLOB PRIMARY KEY, height INTEGER NOT NULL, position INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transactions_by_height ON transactions (height);
+CREATE TABLE IF NOT EXISTS history (
+    address TEXT NOT NULL, height INTEGER NOT NULL, position INTEGER NOT NULL,
+    PRIMARY KEY (address, height, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS history_by_height ON history (height);
+"""
+
+
+def _hash_bytes(value):
+    """Hash o identificador hexadecimal como bytes, o `None` si no es hexadecimal."""
+    try:
+        return bytes.fromhex(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class DiskChainIndex:
+    """
+    Los índices de `ChainIndex` en una base SQLite (`chain_index.sqlite`) dentro del
+    directorio del almacén de bloques. Al reanudar solo se indexan los bloques añadidos
+    desde la última ejecución. Estas cadenas no se podan, así que no hay `prune`.
+    El acceso lo serializa el bloqueo de `Blockchain`.
+    """
+
+    def __init__(self, store):
+        self._db = sqlite3.connect(os.path.join(store.data_dir, "chain_index.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self.height = self._db.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+        # Si el almacén ya no termina en el último bloque indexado (p. ej. se interrumpió
+        # una reorganización), el índice se descarta y se rehace en la próxima consulta.
+        if self.height and (self.height > len(store)
+                            or self._hash_at(self.height - 1) != store.get_hash(self.height - 1)):
+            self._db.executescript("DELETE FROM blocks; DELETE FROM transactions; DELETE FROM history;")
+            self.height = 0
+
+    def _hash_at(self, height):
+        row = self._db.execute("SELECT hash FROM blocks WHERE height = ?", (height,)).fetchone()
+        return row[0].hex() if row else None
+
+    def _insert_block(self, block):
+        height = self.height
+        self._db.execute("INSERT INTO blocks VALUES (?, ?)", (height, bytes.fromhex(block.hash)))
+        for position, tx in enumerate(block.transactions):
+            self._db.execute("INSERT OR REPLACE INTO transactions VALUES (?, ?, ?)",
+                             (bytes.fromhex(tx.get_id()), height, position))
+            for address in {tx.sender, tx.recipient}:
+                self._db.execute("INSERT OR IGNORE INTO history VALUES (?, ?, ?)", (address, height, position))
+        self.height += 1
+
+    def add_block(self, block):
+        """Indexa el siguiente bloque de la cadena (su índice debe ser `self.height`)."""
+        with self._db:
+            self._insert_block(block)
+
+    def remove_block(self, block):
+        """Retira del índice el último bloque indexado (al deshacerlo en una reorganización)."""
+        height = self.height - 1
+        with self._db:
+            for table in ("blocks", "transactions", "history"):
+                self._db.execute(f"DELETE FROM {table} WHERE height = ?", (height,))
+        self.height = height
+
+    def sync(self, chain):
+        """Indexa los bloques de `chain` que aún no lo están, en una sola transacción."""
+        if self.height >= len(chain):
+            return
+        with self._db:
+            for height in range(self.height, len(chain)):
+                self._insert_block(chain[height])
+
+    def contains_transaction(self, tx_id):
+        return self.get_location(tx_id) is not None
+
+    def get_tx_ids(self, height):
+        rows = self._db.execute("SELECT tx_id FROM transactions WHERE height < ?", (height,))
+        return {row[0].hex() for row in rows}
+
+    def get_height(self, block_hash):
+        row = self._db.execute("SELECT height FROM blocks WHERE hash = ?", (_hash_bytes(block_hash),)).fetchone()
+        return row[0] if row else None
+
+    def get_location(self, tx_id):
+        row = self._db.execute(
+            "SELECT height, position FROM transactions WHERE tx_id = ?", (_hash_bytes(tx_id),)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def count_history(self, address):
+        return self._db.execute("SELECT COUNT(*) FROM history WHERE address = ?", (address,)).fetchone()[0]
+
+    def get_history(self, address, offset=0, limit=50, newest_first=True):
+        """Página de ubicaciones de una dirección (ver `ChainIndex.get_history`)."""
+        order = "DESC" if newest_first else "ASC"
+        rows = self._db.execute(
+            f"SELECT height, position FROM history WHERE address = ? "
+            f"ORDER BY height {order}, position {order} LIMIT ? OFFSET ?",
+            (address, limit, offset),
+        )
+        return [tuple(row) for row in rows]
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,228 @@
+"""
+Exportación e importación de la cadena en flujo, en JSON Lines o en binario.
+
+Formatos:
+- `jsonl`: un bloque por línea (`Block.to_dict`).
+- `binary`: la cabecera `BINARY_MAGIC` seguida de registros [longitud (4 bytes) | bloque]
+  con el bloque en la codificación de `encoding.py`, igual que en los segmentos de
+  `storage.BlockStore` (de una cadena en disco se copian los bytes sin decodificarlos).
+
+Ambos sentidos trabajan bloque a bloque con generadores: la exportación nunca construye
+la salida completa y la importación lee, verifica y añade los bloques en lotes de
+`CHAIN_IMPORT_BATCH`. Con `data_dir` (cadena en disco) la memoria durante la importación
+o la exportación no depende de la longitud de la cadena, salvo los índices de saldos y
+de transacciones que cualquier nodo completo mantiene.
+
+Uso:
+    python chain_io.py export --data-dir datos_cadena --output cadena.jsonl [--format binary] [--start N] [--end M]
+    python chain_io.py import --input cadena.jsonl --data-dir datos_importados [--workers N]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import struct
+import time
+
+from blockchain import Block, Blockchain
+from exceptions import ChainFileError, InvalidBlockError, InvalidTransactionError
+from storage import RECORD_HEADER, BlockStore, LazyChain
+from utils import CHAIN_IMPORT_BATCH, RETARGET_INTERVAL
+
+FORMATS = ("jsonl", "binary")
+BINARY_MAGIC = b"BLKCHN1\n"
+
+
+def export_records(blockchain, fmt="jsonl", start=0, end=None):
+    """
+    Genera, en orden, los bytes de cada bloque de [start, end) en el formato `fmt`
+    (sin la cabecera `BINARY_MAGIC`), para escribirlos en un archivo o enviarlos por red.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconocido: {fmt} (se admite {', '.join(FORMATS)}).")
+    if start < blockchain.pruned_height:
+        raise ValueError(f"Los bloques por debajo de la altura {blockchain.pruned_height} están podados.")
+    return _records(blockchain, fmt, start, end)
+
+
+def _records(blockchain, fmt, start, end):
+    chain = blockchain.chain
+    if fmt == "binary" and isinstance(chain, LazyChain):
+        end = len(chain) if end is None else min(end, len(chain))
+        for height in range(max(start, 0), end):
+            payload = chain.read_bytes(height)
+            yield RECORD_HEADER.pack(len(payload)) + payload
+        return
+    for block in blockchain.iter_blocks(start, end):
+        if fmt == "binary":
+            payload = block.to_bytes()
+            yield RECORD_HEADER.pack(len(payload)) + payload
+        else:
+            yield json.dumps(block.to_dict()).encode("utf-8") + b"\n"
+
+
+def export_chain(blockchain, path, fmt="jsonl", start=0, end=None):
+    """Escribe los bloques de [start, end) en `path` y retorna cuántos se exportaron."""
+    records = export_records(blockchain, fmt, start, end)
+    count = 0
+    with open(path + ".tmp", "wb") as f:
+        if fmt == "binary":
+            f.write(BINARY_MAGIC)
+        for record in records:
+            f.write(record)
+            count += 1
+    os.replace(path + ".tmp", path)
+    return count
+
+
+def _read_binary(f, path):
+    while True:
+        header = f.read(RECORD_HEADER.size)
+        if not header:
+            return
+        offset = f.tell() - len(header)
+        if len(header) < RECORD_HEADER.size:
+            raise ChainFileError(f"Registro truncado en '{path}' (byte {offset}).")
+        (length,) = RECORD_HEADER.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length:
+            raise ChainFileError(f"Registro truncado en '{path}' (byte {offset}).")
+        try:
+            yield Block.from_bytes(payload)
+        except (ValueError, IndexError, KeyError, struct.error, InvalidTransactionError) as e:
+            raise ChainFileError(f"Bloque mal formado en '{path}' (byte {offset}): {e}")
+
+
+def _read_jsonl(f, path):
+    for line_number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield Block.from_dict(json.loads(line))
+        except (ValueError, KeyError, TypeError, InvalidTransactionError) as e:
+            raise ChainFileError(f"Bloque mal formado en '{path}' (línea {line_number}): {e}")
+
+
+def read_blocks(path):
+    """Genera los bloques de un archivo exportado; el formato se reconoce por su cabecera."""
+    try:
+        f = open(path, "rb")
+    except OSError as e:
+        raise ChainFileError(f"No se pudo abrir '{path}': {e}")
+    with f:
+        if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+            yield from _read_binary(f, path)
+        else:
+            f.seek(0)
+            yield from _read_jsonl(f, path)
+
+
+def _stored_height(data_dir):
+    store = BlockStore(data_dir)
+    try:
+        return len(store)
+    finally:
+        store.close()
+
+
+def import_chain(path, data_dir=None, target_block_time=None, retarget_interval=RETARGET_INTERVAL,
+                 genesis_hash=None, batch_size=CHAIN_IMPORT_BATCH, workers=1, progress=None):
+    """
+    Carga en una `Blockchain` los bloques de `path`, verificándolos a medida que se leen
+    (ver `Blockchain.import_blocks`; `workers` procesos auditan cada lote).
+    Si el archivo empieza en el génesis, la cadena parte de él (y debe ser `genesis_hash`,
+    si se indica). Si `data_dir` ya tiene bloques, los del archivo que ya están se
+    comprueban por hash y se omiten, así que se puede importar un tramo posterior o
+    reanudar una importación interrumpida.
+    `progress(importados, altura)` se invoca tras cada lote. Retorna la `Blockchain`;
+    si un bloque no es válido lanza `InvalidBlockError` (con `data_dir`, los lotes
+    anteriores quedan guardados).
+    """
+    blocks = read_blocks(path)
+    first = next(blocks, None)
+    if first is None:
+        raise ChainFileError(f"'{path}' no contiene bloques.")
+    if first.index == 0:
+        if first.hash != first.calculate_hash() or first.merkle_root != first.calculate_merkle_root():
+            raise InvalidBlockError("El bloque génesis del archivo no es válido.")
+        if genesis_hash is not None and first.hash != genesis_hash:
+            raise InvalidBlockError(f"El génesis del archivo ({first.hash[:16]}...) no es el esperado.")
+    elif data_dir is None or _stored_height(data_dir) == 0:
+        raise ChainFileError(
+            f"'{path}' empieza en la altura {first.index}: se necesita un `data_dir` con los bloques anteriores."
+        )
+
+    blockchain = Blockchain(
+        data_dir=data_dir, genesis_block=first if first.index == 0 else None,
+        target_block_time=target_block_time, retarget_interval=retarget_interval,
+    )
+    try:
+        imported = 0
+        batch = []
+        for block in itertools.chain([first], blocks):
+            if block.index < len(blockchain.chain) + len(batch):
+                if block.index >= len(blockchain.chain) or blockchain.chain[block.index].hash != block.hash:
+                    raise InvalidBlockError(f"El bloque {block.index} del archivo no coincide con la cadena existente.")
+                continue
+            batch.append(block)
+            if len(batch) >= batch_size:
+                imported += blockchain.import_blocks(batch, workers)
+                batch = []
+                if progress:
+                    progress(imported, len(blockchain.chain))
+        if batch:
+            imported += blockchain.import_blocks(batch, workers)
+            if progress:
+                progress(imported, len(blockchain.chain))
+    except BaseException:
+        blockchain.close()
+        raise
+    return blockchain
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta o importa una cadena en JSON Lines o en binario.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Exporta una cadena guardada en disco.")
+    export_parser.add_argument("--data-dir", required=True, help="Directorio del almacén de bloques.")
+    export_parser.add_argument("--output", required=True, help="Archivo de salida.")
+    export_parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    export_parser.add_argument("--start", type=int, default=0, help="Primera altura exportada.")
+    export_parser.add_argument("--end", type=int, default=None, help="Altura final (excluida).")
+
+    import_parser = commands.add_parser("import", help="Importa y verifica una cadena exportada.")
+    import_parser.add_argument("--input", required=True, help="Archivo exportado (el formato se detecta solo).")
+    import_parser.add_argument("--data-dir", required=True, help="Directorio del almacén de bloques de destino.")
+    import_parser.add_argument("--workers", type=int, default=1, help="Procesos para auditar cada lote.")
+    import_parser.add_argument("--batch-size", type=int, default=CHAIN_IMPORT_BATCH)
+    import_parser.add_argument("--genesis-hash", help="Hash que debe tener el bloque génesis del archivo.")
+    import_parser.add_argument("--target-block-time", type=float, default=None,
+                               help="Segundos por bloque de la red de origen (para verificar el objetivo de dificultad).")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "export":
+        blockchain = Blockchain(data_dir=args.data_dir)
+        try:
+            count = export_chain(blockchain, args.output, args.format, args.start, args.end)
+        finally:
+            blockchain.close()
+        print(f"{count} bloques exportados a '{args.output}' en {time.perf_counter() - start:.2f} s.")
+        return
+
+    def report(imported, height):
+        print(f"  {imported} bloques importados (altura {height})", end="\r", flush=True)
+
+    blockchain = import_chain(
+        args.input, args.data_dir, target_block_time=args.target_block_time, genesis_hash=args.genesis_hash,
+        batch_size=args.batch_size, workers=args.workers, progress=report,
+    )
+    height = len(blockchain.chain)
+    blockchain.close()
+    print(f"\nCadena de {height} bloques importada en '{args.data_dir}' en {time.perf_counter() - start:.2f} s.")
+
+
+if __name__ == "__main__":
+    main()
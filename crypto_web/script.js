@@ -286,7 +286,10 @@ document.addEventListener('DOMContentLoaded', () => {
 
             this.chain.forEach((block, i) => {
                 // Validar estado visual del bloque
-                let isValidHash = block.hash.substring(0, this.difficulty) === Array(this.difficulty + 1).join("0");
+                // Los bloques del nodo Python se comparan con su objetivo numérico; su génesis no se mina
+                let isValidHash = block.fromNode
+                    ? block.index === 0 || BigInt(`0x${block.hash}`) <= BigInt(`0x${block.target}`)
+                    : block.hash.substring(0, this.difficulty) === Array(this.difficulty + 1).join("0");
                 let isLinkValid = block.previousHash === previousBlockHash;
 
                 if (i === 0) isLinkValid = true;
@@ -340,10 +343,56 @@ document.addEventListener('DOMContentLoaded', () => {
     // Inicializar Blockchain Global
     window.globalChain = new GlobalBlockchain();
 
+    // Conexión opcional con el nodo Python (node_api.py)
+    const NODE_API = window.location.protocol.startsWith('http') ? window.location.origin : 'http://127.0.0.1:8000';
+    let nodeEvents = null;
+
+    function nodeBlockToCard(block) {
+        return {
+            index: block.index,
+            timestamp: new Date(block.timestamp * 1000).toLocaleTimeString(),
+            data: `${block.transactions.length} transacciones`,
+            previousHash: block.previous_hash,
+            hash: block.hash,
+            nonce: block.nonce,
+            target: block.target,
+            fromNode: true
+        };
+    }
+
+    async function loadNodeChain() {
+        try {
+            const response = await fetch(`${NODE_API}/api/blocks?limit=20`);
+            const page = await response.json();
+            window.globalChain.chain = page.blocks.map(nodeBlockToCard);
+            window.globalChain.render();
+        } catch (e) {
+            alert(`No se pudo conectar con el nodo en ${NODE_API}. ¿Está corriendo node_api.py?`);
+            return;
+        }
+
+        // Los bloques minados en el nodo llegan por Server-Sent Events
+        if (nodeEvents) nodeEvents.close();
+        nodeEvents = new EventSource(`${NODE_API}/api/events`);
+        nodeEvents.addEventListener('block', (event) => {
+            window.globalChain.chain.push(nodeBlockToCard(JSON.parse(event.data)));
+            window.globalChain.render();
+        });
+    }
+
+    const btnLoadNode = document.getElementById('btn-load-node-chain');
+    if (btnLoadNode) {
+        btnLoadNode.addEventListener('click', loadNodeChain);
+    }
+
     // Reset Button
     const btnReset = document.getElementById('btn-reset-chain');
     if (btnReset) {
         btnReset.addEventListener('click', () => {
+            if (nodeEvents) {
+                nodeEvents.close();
+                nodeEvents = null;
+            }
             window.globalChain = new GlobalBlockchain();
         });
     }
@@ -0,0 +1,101 @@
+"""
+Objetivo numérico de la Prueba de Trabajo y su reajuste.
+
+Un bloque es válido si su hash, leído como entero de 256 bits, es menor o igual que
+el objetivo (`target`) guardado en su cabecera. Exigir N bits iniciales a cero equivale
+a un objetivo de 2^(256-N) - 1, pero el objetivo puede tomar cualquier valor intermedio,
+así que la dificultad se ajusta con granularidad de bits (o más fina) y no en saltos
+de 16x como con los dígitos hexadecimales.
+
+Cada `RETARGET_INTERVAL` bloques el objetivo se reescala según el tiempo que tardaron
+los últimos bloques frente al tiempo configurado, con el ajuste limitado a un factor
+`RETARGET_MAX_FACTOR` en cada sentido.
+
+Como el reajuste se fía de las marcas de tiempo, estas se acotan (ver `audit.check_timestamp`):
+cada bloque debe ser posterior a la mediana de los `MEDIAN_TIME_SPAN` anteriores
+(`median_time_past`) y no adelantarse más de `MAX_FUTURE_BLOCK_TIME` al reloj local. Sin
+eso, un nodo podría falsear las marcas de tiempo de una ventana para abaratar el trabajo.
+"""
+
+import math
+
+from utils import MEDIAN_TIME_SPAN, RETARGET_MAX_FACTOR
+
+MAX_TARGET = 2 ** 256 - 1
+
+
+def target_from_zero_bits(bits):
+    """Objetivo que exige `bits` bits iniciales a cero en el hash."""
+    if not 0 <= bits <= 256:
+        raise ValueError("El número de bits debe estar entre 0 y 256.")
+    return (1 << (256 - bits)) - 1
+
+
+def target_from_hex_difficulty(difficulty):
+    """Objetivo equivalente a la dificultad clásica de `difficulty` ceros hexadecimales."""
+    return target_from_zero_bits(4 * difficulty)
+
+
+def zero_bits_from_target(target):
+    """Dificultad expresada en bits a cero (puede ser fraccionaria)."""
+    return 256 - math.log2(target + 1)
+
+
+def format_target(target):
+    """Objetivo como texto hexadecimal de 64 caracteres (forma usada en `to_dict` y JSON)."""
+    return f"{target:064x}"
+
+
+def parse_target(text):
+    return int(text, 16)
+
+
+def meets_target(digest, target):
+    """Compara el hash (bytes del resumen o texto hexadecimal) con el objetivo."""
+    if isinstance(digest, str):
+        return int(digest, 16) <= target
+    return int.from_bytes(digest, "big") <= target
+
+
+def block_work(target):
+    """Número esperado de hashes para encontrar un bloque con este objetivo."""
+    return (1 << 256) // (target + 1)
+
+
+def expected_target(index, lookup, target_block_time=None, retarget_interval=None):
+    """
+    Objetivo que debe llevar el bloque de altura `index`: el del bloque anterior o, cada
+    `retarget_interval` bloques (si hay `target_block_time`), ese mismo reescalado según
+    lo que tardaron los últimos `retarget_interval` bloques. `lookup(altura)` retorna
+    el bloque (o la cabecera) de esa altura.
+    """
+    previous = lookup(index - 1)
+    if target_block_time is None or index % retarget_interval != 0:
+        return previous.target
+    first = lookup(index - retarget_interval)
+    return retarget(
+        previous.target,
+        previous.timestamp - first.timestamp,
+        target_block_time * (retarget_interval - 1),
+    )
+
+
+def median_time_past(index, lookup, span=MEDIAN_TIME_SPAN):
+    """
+    Mediana de las marcas de tiempo de los `span` bloques anteriores al de altura `index`
+    (menos cerca del génesis). `lookup(altura)` retorna el bloque (o la cabecera) de esa altura.
+    """
+    timestamps = sorted(lookup(height).timestamp for height in range(max(index - span, 0), index))
+    return timestamps[len(timestamps) // 2]
+
+
+def retarget(previous_target, actual_timespan, expected_timespan):
+    """
+    Nuevo objetivo a partir del anterior y del tiempo real frente al esperado: si los
+    bloques llegaron el doble de rápido, el objetivo se reduce a la mitad (el doble de difícil).
+    """
+    actual_timespan = min(max(actual_timespan, expected_timespan / RETARGET_MAX_FACTOR),
+                          expected_timespan * RETARGET_MAX_FACTOR)
+    # Se trabaja en milisegundos enteros para no perder precisión con objetivos de 256 bits.
+    new_target = previous_target * max(int(actual_timespan * 1000), 1) // max(int(expected_timespan * 1000), 1)
+    return min(max(new_target, 1), MAX_TARGET)
@@ -0,0 +1,201 @@
+"""
+Codificación binaria canónica y compacta de transacciones y bloques.
+
+Es la forma que se firma, se hashea y se guarda en disco. Las claves públicas,
+firmas y hashes viajan como bytes crudos (64, hasta 255 y 32 bytes) en lugar de
+texto hexadecimal, y los números llevan una etiqueta de tipo para que enteros y
+flotantes sobrevivan sin cambios a la ida y vuelta.
+
+Las funciones `encode_*` leen los atributos de los objetos; las `decode_*` retornan
+diccionarios con la misma forma que `to_dict`, para reconstruir los objetos con `from_dict`.
+"""
+
+import struct
+
+from difficulty import format_target
+from utils import COINBASE_SENDER
+
+_INT = struct.Struct(">q")
+_FLOAT = struct.Struct(">d")
+_U8 = struct.Struct(">B")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+TARGET_SIZE = 32  # El objetivo de dificultad es un entero sin signo de 256 bits
+INT_MIN, INT_MAX = -2 ** 63, 2 ** 63 - 1  # Rango de los enteros codificables (`_INT`)
+MAX_SIGNATURE_SIZE = 255  # La longitud de la firma se codifica en un byte
+MAX_TEXT_SIZE = 0xFFFF  # Bytes UTF-8 de un campo de texto libre (longitud en `_U16`)
+
+# Etiquetas de campos de texto: dirección coinbase, hexadecimal de longitud fija o texto libre.
+_TAG_COINBASE = 0
+_TAG_PUBLIC_KEY = 1
+_TAG_HASH = 2
+_TAG_TEXT = 3
+
+# Etiquetas numéricas.
+_TAG_INT = ord("i")
+_TAG_FLOAT = ord("f")
+
+
+def _encode_text(value):
+    """Codifica una dirección o hash: bytes crudos si es hexadecimal de 64 o 32 bytes."""
+    if value == COINBASE_SENDER:
+        return bytes((_TAG_COINBASE,))
+    if len(value) in (128, 64):
+        try:
+            raw = bytes.fromhex(value)
+        except ValueError:
+            pass
+        else:
+            if raw.hex() == value:  # Solo hex en minúsculas es reversible sin pérdidas
+                return bytes((_TAG_PUBLIC_KEY if len(raw) == 64 else _TAG_HASH,)) + raw
+    raw = value.encode("utf-8")
+    return bytes((_TAG_TEXT,)) + _U16.pack(len(raw)) + raw
+
+
+def _decode_text(data, offset):
+    tag = data[offset]
+    offset += 1
+    if tag == _TAG_COINBASE:
+        return COINBASE_SENDER, offset
+    if tag == _TAG_PUBLIC_KEY:
+        return data[offset:offset + 64].hex(), offset + 64
+    if tag == _TAG_HASH:
+        return data[offset:offset + 32].hex(), offset + 32
+    if tag == _TAG_TEXT:
+        (length,) = _U16.unpack_from(data, offset)
+        offset += _U16.size
+        return data[offset:offset + length].decode("utf-8"), offset + length
+    raise ValueError(f"Etiqueta de texto desconocida: {tag}")
+
+
+def _encode_number(value):
+    if isinstance(value, int):
+        return bytes((_TAG_INT,)) + _INT.pack(value)
+    return bytes((_TAG_FLOAT,)) + _FLOAT.pack(value)
+
+
+def _decode_number(data, offset):
+    tag = data[offset]
+    if tag == _TAG_INT:
+        return _INT.unpack_from(data, offset + 1)[0], offset + 1 + _INT.size
+    if tag == _TAG_FLOAT:
+        return _FLOAT.unpack_from(data, offset + 1)[0], offset + 1 + _FLOAT.size
+    raise ValueError(f"Etiqueta numérica desconocida: {tag}")
+
+
+def encode_signing_data(tx):
+    """Datos que se firman: remitente, receptor, monto, comisión y marca de tiempo."""
+    return b"".join((
+        _encode_text(tx.sender),
+        _encode_text(tx.recipient),
+        _encode_number(tx.amount),
+        _encode_number(tx.fee),
+        _FLOAT.pack(tx.timestamp),
+    ))
+
+
+def encode_transaction(tx):
+    """Transacción completa: datos firmados seguidos de la firma (longitud + bytes)."""
+    signature = bytes.fromhex(tx.signature) if tx.signature else b""
+    return encode_signing_data(tx) + _U8.pack(len(signature)) + signature
+
+
+def decode_transaction(data, offset=0):
+    """Retorna (diccionario con la forma de `Transaction.to_dict`, nuevo desplazamiento)."""
+    sender, offset = _decode_text(data, offset)
+    recipient, offset = _decode_text(data, offset)
+    amount, offset = _decode_number(data, offset)
+    fee, offset = _decode_number(data, offset)
+    (timestamp,) = _FLOAT.unpack_from(data, offset)
+    offset += _FLOAT.size
+    length = data[offset]
+    offset += 1
+    signature = data[offset:offset + length].hex() if length else None
+    return {
+        "sender": sender,
+        "recipient": recipient,
+        "amount": amount,
+        "fee": fee,
+        "timestamp": timestamp,
+        "signature": signature,
+    }, offset + length
+
+
+def encode_header_prefix(block):
+    """
+    Cabecera del bloque sin el nonce: índice, marca de tiempo, raíz de Merkle, hash previo
+    y objetivo de dificultad (entero de 256 bits).
+    """
+    return b"".join((
+        _U64.pack(block.index),
+        _FLOAT.pack(block.timestamp),
+        _encode_text(block.merkle_root),
+        _encode_text(block.previous_hash),
+        block.target.to_bytes(TARGET_SIZE, "big"),
+    ))
+
+
+def encode_nonce(nonce):
+    """El nonce cierra la cabecera; va aparte para poder reutilizar el "midstate" del prefijo."""
+    return _U64.pack(nonce)
+
+
+def encode_block(block):
+    """Bloque completo: cabecera, nonce, hash y transacciones."""
+    parts = [
+        encode_header_prefix(block),
+        encode_nonce(block.nonce),
+        _encode_text(block.hash),
+        _U32.pack(len(block.transactions)),
+    ]
+    parts.extend(encode_transaction(tx) for tx in block.transactions)
+    return b"".join(parts)
+
+
+def decode_block(data, offset=0):
+    """Retorna (diccionario con la forma de `Block.to_dict`, nuevo desplazamiento)."""
+    if not isinstance(data, bytes):
+        data = bytes(data)
+    (index,) = _U64.unpack_from(data, offset)
+    offset += _U64.size
+    (timestamp,) = _FLOAT.unpack_from(data, offset)
+    offset += _FLOAT.size
+    merkle_root, offset = _decode_text(data, offset)
+    previous_hash, offset = _decode_text(data, offset)
+    target = int.from_bytes(data[offset:offset + TARGET_SIZE], "big")
+    offset += TARGET_SIZE
+    (nonce,) = _U64.unpack_from(data, offset)
+    offset += _U64.size
+    block_hash, offset = _decode_text(data, offset)
+    (tx_count,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+    transactions = []
+    for _ in range(tx_count):
+        tx, offset = decode_transaction(data, offset)
+        transactions.append(tx)
+    return {
+        "index": index,
+        "timestamp": timestamp,
+        "previous_hash": previous_hash,
+        "merkle_root": merkle_root,
+        "target": format_target(target),
+        "nonce": nonce,
+        "hash": block_hash,
+        "transactions": transactions,
+    }, offset
+
+
+def encode_state(height, tip_hash, balances, tx_ids):
+    """
+    Forma canónica del estado de cuentas tras `height` bloques (ver `snapshot.py`):
+    altura, hash de la punta, saldos ordenados por dirección e identificadores de las
+    transacciones confirmadas, también ordenados.
+    """
+    parts = [_U64.pack(height), _encode_text(tip_hash), _U32.pack(len(balances))]
+    for address in sorted(balances):
+        parts.append(_encode_text(address))
+        parts.append(_encode_number(balances[address]))
+    parts.append(_U32.pack(len(tx_ids)))
+    parts.extend(bytes.fromhex(tx_id) for tx_id in sorted(tx_ids))
+    return b"".join(parts)
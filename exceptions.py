@@ -20,4 +20,36 @@ class InsufficientFundsError(InvalidTransactionError):
 
 class InvalidBlockError(BlockchainError):
     """Se lanza cuando un bloque es inválido (hash incorrecto, etc.)."""
-    pass
\ No newline at end of file
+    pass
+
+class LedgerInconsistencyError(BlockchainError):
+    """Se lanza cuando el índice de saldos no coincide con los saldos recalculados desde la cadena."""
+    pass
+
+class DuplicateTransactionError(InvalidTransactionError):
+    """Se lanza cuando una transacción ya está en la lista de pendientes."""
+    pass
+
+class MempoolFullError(InvalidTransactionError):
+    """Se lanza cuando la lista de pendientes está llena y la transacción no supera la menor comisión."""
+    pass
+
+class KeystoreError(BlockchainError):
+    """Se lanza cuando el almacén cifrado de billeteras no se puede leer o descifrar."""
+    pass
+
+class SnapshotError(BlockchainError):
+    """Se lanza cuando una instantánea de estado no se puede leer o no supera la verificación."""
+    pass
+
+class OrphanBlockError(InvalidBlockError):
+    """Se lanza cuando llega un bloque cuyo bloque padre no se conoce (ni en la cadena ni en una rama lateral)."""
+    pass
+
+class InvalidProofError(BlockchainError):
+    """Se lanza cuando una prueba de inclusión no demuestra que la transacción esté en la cadena de cabeceras."""
+    pass
+
+class ChainFileError(BlockchainError):
+    """Se lanza cuando un archivo de cadena exportado no se puede leer o está mal formado."""
+    pass
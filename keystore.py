@@ -0,0 +1,111 @@
+"""
+Almacén cifrado de billeteras en disco.
+
+Permite recargar miles de billeteras sin volver a generarlas: cada clave privada se
+guarda cifrada junto a su clave pública, de modo que al cargar no hace falta repetir
+ninguna operación sobre la curva (ver `Wallet.from_key_bytes`).
+
+Formato (JSON):
+    {"version": 1,
+     "kdf": {"name": "scrypt", "salt": hex, "n": N, "r": 8, "p": 1},
+     "wallets": {nombre: {"address": hex, "nonce": hex, "ciphertext": hex, "mac": hex}}}
+
+De la contraseña se derivan con scrypt (una sola vez por archivo) dos claves de 32
+bytes: una de cifrado y otra de autenticación. La clave privada se cifra con un flujo
+SHA-256 en modo contador sobre un nonce aleatorio por billetera, y un HMAC-SHA256 cubre
+nombre, dirección, nonce y texto cifrado (cifrar y luego autenticar). Solo se usa la
+biblioteca estándar.
+"""
+
+import binascii
+import hashlib
+import hmac
+import json
+import os
+
+from exceptions import KeystoreError
+from utils import KEYSTORE_SCRYPT_N
+from wallet import Wallet
+
+KEYSTORE_VERSION = 1
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_SIZE = 16
+NONCE_SIZE = 16
+
+
+def _derive_keys(password, salt, n, r, p):
+    """Retorna (clave de cifrado, clave de autenticación) derivadas de la contraseña."""
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    key = hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=64)
+    return key[:32], key[32:]
+
+
+def _keystream_xor(encryption_key, nonce, data):
+    """Cifra o descifra `data` combinándolo con SHA-256(clave | nonce | contador)."""
+    stream = bytearray()
+    counter = 0
+    while len(stream) < len(data):
+        stream += hashlib.sha256(encryption_key + nonce + counter.to_bytes(8, "big")).digest()
+        counter += 1
+    return bytes(a ^ b for a, b in zip(data, stream))
+
+
+def _mac(mac_key, name, address, nonce, ciphertext):
+    message = name.encode("utf-8") + b"\x00" + address.encode("ascii") + b"\x00" + nonce + ciphertext
+    return hmac.new(mac_key, message, hashlib.sha256).digest()
+
+
+def save_keystore(path, wallets, password, n=KEYSTORE_SCRYPT_N):
+    """Guarda `wallets` (diccionario nombre -> `Wallet`) cifradas con `password`."""
+    salt = os.urandom(SALT_SIZE)
+    encryption_key, mac_key = _derive_keys(password, salt, n, SCRYPT_R, SCRYPT_P)
+    entries = {}
+    for name, wallet in wallets.items():
+        address = wallet.get_public_key_hex()
+        nonce = os.urandom(NONCE_SIZE)
+        ciphertext = _keystream_xor(encryption_key, nonce, wallet.get_private_key_bytes())
+        entries[name] = {
+            "address": address,
+            "nonce": nonce.hex(),
+            "ciphertext": ciphertext.hex(),
+            "mac": _mac(mac_key, name, address, nonce, ciphertext).hex(),
+        }
+    document = {
+        "version": KEYSTORE_VERSION,
+        "kdf": {"name": "scrypt", "salt": salt.hex(), "n": n, "r": SCRYPT_R, "p": SCRYPT_P},
+        "wallets": entries,
+    }
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(document, f)
+    os.replace(path + ".tmp", path)
+
+
+def load_keystore(path, password):
+    """
+    Carga las billeteras de `path` como diccionario nombre -> `Wallet`.
+    Lanza `KeystoreError` si el archivo no es válido, la contraseña es incorrecta o
+    alguna entrada fue alterada.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+        if document.get("version") != KEYSTORE_VERSION:
+            raise KeystoreError(f"Versión de almacén no soportada: {document.get('version')}")
+        kdf = document["kdf"]
+        encryption_key, mac_key = _derive_keys(
+            password, bytes.fromhex(kdf["salt"]), kdf["n"], kdf["r"], kdf["p"]
+        )
+        wallets = {}
+        for name, entry in document["wallets"].items():
+            nonce = bytes.fromhex(entry["nonce"])
+            ciphertext = bytes.fromhex(entry["ciphertext"])
+            expected_mac = _mac(mac_key, name, entry["address"], nonce, ciphertext)
+            if not hmac.compare_digest(expected_mac, bytes.fromhex(entry["mac"])):
+                raise KeystoreError(f"Contraseña incorrecta o billetera '{name}' alterada.")
+            private_bytes = _keystream_xor(encryption_key, nonce, ciphertext)
+            wallets[name] = Wallet.from_key_bytes(private_bytes, binascii.unhexlify(entry["address"]))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise KeystoreError(f"No se pudo leer el almacén de billeteras '{path}': {e}")
+    return wallets
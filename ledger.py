@@ -0,0 +1,108 @@
+"""
+Índice incremental de saldos por dirección.
+
+Se actualiza cada vez que se añade un bloque a la cadena, de modo que consultar
+un saldo cuesta O(1) en lugar de recorrer todas las transacciones de la cadena.
+
+Por cada bloque aplicado se guarda un registro de deshacer con el saldo previo de las
+direcciones que tocó; así una reorganización retira bloques de la punta restaurando
+esos valores exactos, con un costo proporcional a su profundidad. Solo se conservan
+los registros de los últimos `REORG_MAX_DEPTH` bloques.
+"""
+
+from collections import deque
+
+from exceptions import LedgerInconsistencyError
+from utils import REORG_MAX_DEPTH
+
+
+def scan_balances(chain, start=0, end=None, balances=None):
+    """
+    Recalcula todos los saldos recorriendo la cadena completa (referencia de auditoría).
+    Con `start` se parte de `balances`, los saldos tras los primeros `start` bloques
+    (p. ej. los de una instantánea), y se recorre solo hasta `end`.
+    """
+    balances = dict(balances or {})
+    for height in range(start, len(chain) if end is None else end):
+        for tx in chain[height].transactions:
+            balances[tx.recipient] = balances.get(tx.recipient, 0) + tx.amount
+            balances[tx.sender] = balances.get(tx.sender, 0) - tx.amount - tx.fee
+    return balances
+
+
+class BalanceLedger:
+    def __init__(self):
+        self.balances = {}
+        self.height = 0  # Número de bloques aplicados
+        # Estado de partida: saldos tras los primeros `base_height` bloques (cuyos cuerpos
+        # pueden estar podados). Sin instantánea ni poda es el estado vacío del génesis.
+        self.base_balances = {}
+        self.base_height = 0
+        self.undo_records = deque(maxlen=REORG_MAX_DEPTH)
+
+    def get_balance(self, address):
+        """Retorna el saldo confirmado de una dirección."""
+        return self.balances.get(address, 0)
+
+    def apply_block(self, block):
+        """
+        Aplica los movimientos de un bloque recién añadido a la cadena.
+        El remitente paga monto más comisión; la comisión llega al minero dentro de la recompensa.
+        """
+        balances = self.balances
+        undo = {}
+        for tx in block.transactions:
+            for address in (tx.recipient, tx.sender):
+                if address not in undo:
+                    undo[address] = balances.get(address)
+            balances[tx.recipient] = balances.get(tx.recipient, 0) + tx.amount
+            balances[tx.sender] = balances.get(tx.sender, 0) - tx.amount - tx.fee
+        self.undo_records.append(undo)
+        self.height += 1
+
+    def revert_block(self):
+        """Deshace el último bloque aplicado con su registro de deshacer."""
+        if not self.undo_records:
+            raise LedgerInconsistencyError("No queda ningún registro para deshacer el último bloque.")
+        balances = self.balances
+        for address, previous in self.undo_records.pop().items():
+            if previous is None:
+                balances.pop(address, None)
+            else:
+                balances[address] = previous
+        self.height -= 1
+
+    def set_base(self, balances, height):
+        """Fija el estado de partida (saldos tras `height` bloques) usado por `rebuild` y `verify`."""
+        self.base_balances = dict(balances)
+        self.base_height = height
+
+    def rebuild(self, chain):
+        """Descarta el estado actual y lo reconstruye aplicando la cadena desde el estado de partida."""
+        self.balances = dict(self.base_balances)
+        self.height = self.base_height
+        self.undo_records.clear()
+        for height in range(self.base_height, len(chain)):
+            self.apply_block(chain[height])
+
+    def verify(self, chain):
+        """
+        Compara el índice con los saldos recalculados recorriendo la cadena.
+        Lanza `LedgerInconsistencyError` indicando las direcciones que no coinciden.
+        """
+        if self.height != len(chain):
+            raise LedgerInconsistencyError(
+                f"El índice de saldos cubre {self.height} bloques, pero la cadena tiene {len(chain)}."
+            )
+        expected = scan_balances(chain, self.base_height, balances=self.base_balances)
+        mismatched = [
+            address for address in expected.keys() | self.balances.keys()
+            if expected.get(address, 0) != self.balances.get(address, 0)
+        ]
+        if mismatched:
+            details = ", ".join(
+                f"{address[:10]}... (índice: {self.balances.get(address, 0)}, cadena: {expected.get(address, 0)})"
+                for address in sorted(mismatched)
+            )
+            raise LedgerInconsistencyError(f"Saldos inconsistentes: {details}")
+        return True
@@ -0,0 +1,186 @@
+"""
+Cliente ligero: guarda y valida solo las cabeceras de los bloques.
+
+De cada bloque conserva la cabecera (`Block.get_header`, unos cientos de bytes sin
+importar cuántas transacciones lleve) y comprueba lo mismo que un nodo completo sobre
+ella: altura, enlace con la anterior, hash, objetivo de dificultad esperado, prueba de
+trabajo y marca de tiempo (`audit.verify_header`). Así la memoria y el tiempo de sincronización crecen
+con el número de bloques y no con el volumen de transacciones.
+
+Para confirmar un pago pide a un nodo completo la prueba de inclusión de Merkle de la
+transacción (`get_proof` en `p2p.py`) y comprueba que lleva del identificador de la
+transacción a la `merkle_root` de una cabecera de su cadena. No puede comprobar saldos
+ni firmas: confía en que la cadena con más trabajo solo contiene bloques válidos.
+
+Uso:
+    python light_client.py --peer 127.0.0.1:9000 --genesis-file genesis.json [--tx <id> ...]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from audit import verify_header
+from blockchain import Block, Transaction
+from difficulty import block_work, expected_target, median_time_past
+from exceptions import InvalidBlockError, InvalidProofError
+from merkle import verify_merkle_proof
+from p2p import Peer, PeerError, find_fork_point, parse_peer
+from utils import RETARGET_INTERVAL, SYNC_HEADERS_BATCH
+
+
+class LightClient:
+    def __init__(self, genesis_header, target_block_time=None, retarget_interval=RETARGET_INTERVAL):
+        """
+        `genesis_header` es la cabecera (o el bloque completo en diccionario) del génesis
+        de la red, obtenida por un canal de confianza. `target_block_time` y
+        `retarget_interval` deben coincidir con los de los nodos completos.
+        """
+        genesis = Block.from_header(genesis_header)
+        if genesis.index != 0 or genesis.hash != genesis.calculate_hash():
+            raise InvalidBlockError("La cabecera del génesis no es válida.")
+        self.target_block_time = target_block_time
+        self.retarget_interval = retarget_interval
+        self.headers = [genesis]
+        self.heights = {genesis.hash: 0}  # hash -> altura en la cadena de cabeceras
+
+    def __len__(self):
+        return len(self.headers)
+
+    @property
+    def tip(self):
+        return self.headers[-1]
+
+    def get_target_for(self, index, lookup=None):
+        """Objetivo que debe llevar la cabecera `index` (ver `Blockchain.get_target_for`)."""
+        return expected_target(
+            index, lookup or self.headers.__getitem__, self.target_block_time, self.retarget_interval
+        )
+
+    def get_median_time_for(self, index, lookup=None):
+        """Mediana de tiempo que debe superar la cabecera `index` (ver `Blockchain.get_median_time_for`)."""
+        return median_time_past(index, lookup or self.headers.__getitem__)
+
+    def add_headers(self, start, headers):
+        """
+        Verifica las cabeceras consecutivas `headers` (diccionarios) a partir de la altura
+        `start` y las añade. Si `start` queda por debajo de la punta, las cabeceras desde
+        `start` solo se sustituyen si la rama nueva acumula más trabajo que la actual.
+        Retorna cuántas cabeceras se añadieron; lanza `InvalidBlockError` si alguna no es válida.
+        """
+        if not 1 <= start <= len(self.headers):
+            raise InvalidBlockError(f"Las cabeceras desde la altura {start} no enlazan con la cadena local.")
+        branch = []
+
+        def lookup(h):
+            return branch[h - start] if h >= start else self.headers[h]
+
+        previous_hash = self.headers[start - 1].hash
+        for height, header_data in enumerate(headers, start):
+            header = Block.from_header(header_data)
+            verify_header(header, height, previous_hash, self.get_target_for(height, lookup),
+                          self.get_median_time_for(height, lookup))
+            branch.append(header)
+            previous_hash = header.hash
+
+        replaced = self.headers[start:]
+        if replaced and sum(block_work(h.target) for h in branch) <= sum(block_work(h.target) for h in replaced):
+            return 0
+        for header in replaced:
+            del self.heights[header.hash]
+        del self.headers[start:]
+        for header in branch:
+            self.headers.append(header)
+            self.heights[header.hash] = header.index
+        return len(branch)
+
+    def verify_transaction(self, transaction, proof, min_confirmations=1):
+        """
+        Comprueba con `proof` (ver `Blockchain.get_merkle_proof`) que `transaction` (una
+        `Transaction` o su identificador) está en un bloque de la cadena de cabeceras.
+        Retorna el número de confirmaciones (1 si está en la punta); lanza
+        `InvalidProofError` si la prueba no lo demuestra o no alcanza `min_confirmations`.
+        """
+        tx_id = transaction.get_id() if isinstance(transaction, Transaction) else transaction
+        if proof.get("tx_id") != tx_id:
+            raise InvalidProofError("La prueba corresponde a otra transacción.")
+        height = self.heights.get(proof.get("block_hash"))
+        if height is None:
+            raise InvalidProofError("La prueba apunta a un bloque que no está en la cadena de cabeceras.")
+        if not verify_merkle_proof(tx_id, proof.get("proof", []), self.headers[height].merkle_root):
+            raise InvalidProofError(f"La prueba no lleva a la raíz de Merkle del bloque {height}.")
+        confirmations = len(self.headers) - height
+        if confirmations < min_confirmations:
+            raise InvalidProofError(
+                f"La transacción tiene {confirmations} confirmaciones; se requieren {min_confirmations}."
+            )
+        return confirmations
+
+    async def sync(self, peer):
+        """
+        Descarga de `peer` las cabeceras que faltan (desde el punto de bifurcación si su
+        cadena se separa de la local) y las añade. Retorna cuántas se añadieron.
+        """
+        status = await peer.request("status")
+        local_height = len(self.headers)
+        start = await find_fork_point(peer, local_height, lambda h: self.headers[h].hash)
+        if status["height"] <= start and start == local_height:
+            return 0
+        headers = []
+        height = start
+        while height < status["height"]:
+            response = await peer.request("get_headers", start=height, count=SYNC_HEADERS_BATCH)
+            if not response["headers"]:
+                break
+            headers.extend(response["headers"])
+            height += len(response["headers"])
+        return self.add_headers(start, headers)
+
+    async def fetch_transaction(self, peer, tx_id, min_confirmations=1):
+        """
+        Pide a `peer` la transacción `tx_id` con su prueba de inclusión y la verifica.
+        Retorna (`Transaction`, confirmaciones).
+        """
+        response = await peer.request("get_proof", tx_id=tx_id)
+        transaction = Transaction.from_dict(response["transaction"])
+        if transaction.get_id() != tx_id:
+            raise InvalidProofError("El nodo devolvió una transacción distinta de la pedida.")
+        return transaction, self.verify_transaction(transaction, response["proof"], min_confirmations)
+
+
+async def run(client, peer, tx_ids, min_confirmations):
+    try:
+        start = time.perf_counter()
+        added = await client.sync(peer)
+        elapsed = time.perf_counter() - start
+        print(f"Cabeceras: {len(client)} (+{added} en {elapsed:.3f} s). Punta: {client.tip.hash[:16]}...")
+        for tx_id in tx_ids:
+            try:
+                tx, confirmations = await client.fetch_transaction(peer, tx_id, min_confirmations)
+            except (PeerError, InvalidProofError) as e:
+                print(f"{tx_id[:16]}... NO confirmada: {e}")
+            else:
+                print(f"{tx_id[:16]}... confirmada ({confirmations} confirmaciones): "
+                      f"{tx.sender[:16]}... -> {tx.recipient[:16]}... {tx.amount}")
+    finally:
+        peer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cliente ligero: sincroniza cabeceras y verifica pruebas de inclusión.")
+    parser.add_argument("--peer", required=True, help="Nodo completo como host:puerto.")
+    parser.add_argument("--genesis-file", required=True, help="Bloque génesis de la red (JSON de `Block.to_dict`).")
+    parser.add_argument("--target-block-time", type=float, default=None,
+                        help="Segundos por bloque de la red (igual que en los nodos completos).")
+    parser.add_argument("--tx", nargs="*", default=[], help="Identificadores de transacciones a confirmar.")
+    parser.add_argument("--min-confirmations", type=int, default=1)
+    args = parser.parse_args()
+
+    with open(args.genesis_file, encoding="utf-8") as f:
+        client = LightClient(json.load(f), target_block_time=args.target_block_time)
+    asyncio.run(run(client, Peer(*parse_peer(args.peer)), args.tx, args.min_confirmations))
+
+
+if __name__ == "__main__":
+    main()
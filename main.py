@@ -1,11 +1,21 @@
+import argparse
+import getpass
+import json
 import time
 import os
 
 # Importaciones locales
 from blockchain import Blockchain, Transaction
+from miner import BackgroundMiner
 from wallet import Wallet
+from keystore import load_keystore, save_keystore
 from utils import INITIAL_FUNDS
-from exceptions import InsufficientFundsError, InvalidTransactionError, InvalidBlockError, InvalidSignatureError
+from metrics import METRICS
+from workload import WorkloadGenerator, format_report
+from exceptions import (
+    InsufficientFundsError, InvalidTransactionError, InvalidBlockError, InvalidSignatureError,
+    LedgerInconsistencyError,
+)
 
 def clear_screen():
     """Limpia la pantalla de la consola."""
@@ -15,21 +25,47 @@ def wait_for_enter():
     """Espera a que el usuario presione Enter para continuar."""
     input("\nPresiona Enter para volver al menú...")
 
+def read_keystore_password():
+    """Contraseña del almacén: la variable de entorno `BLOCKCHAIN_KEYSTORE_PASSWORD` o se pide por consola."""
+    return os.environ.get("BLOCKCHAIN_KEYSTORE_PASSWORD") or getpass.getpass("Contraseña del almacén de billeteras: ")
+
+def load_or_create_wallets(keystore_path):
+    """
+    Sin almacén crea billeteras nuevas en cada ejecución. Con `keystore_path` las carga
+    si el archivo existe y, si no, las crea y las guarda cifradas para la próxima vez
+    (necesario para seguir usando los fondos de una cadena reanudada con `--data-dir`).
+    """
+    if keystore_path and os.path.exists(keystore_path):
+        wallets = load_keystore(keystore_path, read_keystore_password())
+        print(f"Billeteras cargadas desde '{keystore_path}'.")
+        return wallets
+    wallets = {
+        "alice": Wallet(),
+        "bob": Wallet(),
+        "miner": Wallet(),
+    }
+    if keystore_path:
+        save_keystore(keystore_path, wallets, read_keystore_password())
+        print(f"Billeteras guardadas cifradas en '{keystore_path}'.")
+    return wallets
+
 class App:
-    def __init__(self):
-        self.wallets = {
-            "alice": Wallet(),
-            "bob": Wallet(),
-            "miner": Wallet(),
-        }
+    def __init__(self, data_dir=None, keystore=None):
+        self.wallets = load_or_create_wallets(keystore)
         self.blockchain = Blockchain(
             difficulty=4,
             initial_beneficiary=self.wallets["alice"].get_public_key_hex(),
-            initial_funds=INITIAL_FUNDS
+            initial_funds=INITIAL_FUNDS,
+            data_dir=data_dir
         )
+        self.miner = None  # BackgroundMiner, creado al minar por primera vez
+        self.notices = []  # Avisos del minero en segundo plano, mostrados al volver al menú
         print("Simulador de Blockchain inicializado.")
-        print(f"Se han creado 3 billeteras: Alice, Bob, y Miner.")
-        print(f"Alice ha recibido {INITIAL_FUNDS} monedas en el bloque génesis como fondos iniciales.")
+        print(f"Billeteras disponibles: {', '.join(name.capitalize() for name in self.wallets)}.")
+        if self.blockchain.loaded_from_disk:
+            print(f"Cadena cargada desde '{data_dir}' con {len(self.blockchain.chain)} bloques.")
+        else:
+            print(f"Alice ha recibido {INITIAL_FUNDS} monedas en el bloque génesis como fondos iniciales.")
 
     def print_balances(self):
         print("\n--- Balances Actuales ---")
@@ -47,6 +83,8 @@ class App:
             recipient_name = input("Receptor (ej. bob, miner): ").lower()
             amount_str = input("Monto a enviar: ")
             amount = float(amount_str)
+            fee_str = input("Comisión para el minero (Enter = 0): ").strip()
+            fee = float(fee_str) if fee_str else 0
 
             sender_wallet = self.wallets.get(sender_name)
             recipient_wallet = self.wallets.get(recipient_name)
@@ -58,7 +96,8 @@ class App:
             tx = Transaction(
                 sender_wallet.get_public_key_hex(),
                 recipient_wallet.get_public_key_hex(),
-                amount
+                amount,
+                fee=fee
             )
             tx.sign(sender_wallet)
 
@@ -66,7 +105,7 @@ class App:
             print(f"\nÉxito: Transacción de {amount} de {sender_name} a {recipient_name} añadida a transacciones pendientes.")
 
         except (ValueError, TypeError):
-            print("\nError: Monto inválido. Debe ser un número.")
+            print("\nError: Monto o comisión inválidos. Deben ser números.")
         except (InsufficientFundsError, InvalidTransactionError) as e:
             print(f"\nError al añadir transacción: {e}")
         except Exception as e:
@@ -82,9 +121,58 @@ class App:
             print("\nError: Nombre de minero no válido.")
             return
 
-        mined_block = self.blockchain.mine_pending_transactions(miner_wallet.get_public_key_hex())
-        if not mined_block:
-            print("\nEl bloque no fue minado (puede que no hubiera transacciones pendientes).")
+        workers_str = input(f"Procesos de minería (1 a {os.cpu_count() or 1}, Enter = 1): ").strip()
+        try:
+            workers = int(workers_str) if workers_str else 1
+        except ValueError:
+            print("\nError: Número de procesos no válido.")
+            return
+
+        if self.miner is None:
+            self.miner = BackgroundMiner(self.blockchain, miner_wallet.get_public_key_hex(), workers=workers)
+        # Si ya hay una minería en curso, la próxima plantilla usará el minero y los procesos nuevos.
+        self.miner.miner_address = miner_wallet.get_public_key_hex()
+        self.miner.workers = workers
+        if self.miner.running:
+            print("\nYa hay una minería en curso; se actualizaron el minero y los procesos.")
+            return
+
+        future = self.miner.submit()
+        future.add_done_callback(self._mining_finished)
+        if self.blockchain.pending_transactions:
+            print(f"\n--- Minería iniciada en segundo plano con {len(self.blockchain.mempool)} transacciones pendientes ---")
+        else:
+            print("\n--- Minería iniciada: el minero espera a que lleguen transacciones ---")
+        print("Las transacciones que añadas mientras tanto se incorporarán al bloque.")
+
+    def _mining_finished(self, future):
+        """Se llama desde el hilo del minero al resolverse la minería pedida en `mine_block`."""
+        if future.cancelled():
+            self.notices.append("La minería se canceló.")
+            return
+        if future.exception() is not None:
+            self.notices.append(f"La minería falló: {future.exception()}")
+            return
+        mined_block = future.result()
+        stats = self.blockchain.last_mining_stats
+        self.notices.append(
+            f"Bloque #{mined_block.index} minado con éxito con {len(mined_block.transactions)} transacciones. "
+            f"Hash: {mined_block.hash[:20]}...\n"
+            f"  Tiempo de cómputo: {stats.elapsed:.4f} segundos. "
+            f"Procesos: {stats.workers} | Hashes: {stats.hashes} | Tasa: {stats.hash_rate:,.0f} H/s"
+        )
+
+    def cancel_mining(self):
+        if self.miner is None or not self.miner.running:
+            print("\nNo hay ninguna minería en curso.")
+            return
+        self.miner.cancel()
+        print("\nMinería cancelada. Las transacciones siguen pendientes en la mempool.")
+
+    def close(self):
+        if self.miner is not None:
+            self.miner.stop()
+        self.blockchain.close()
 
     def show_blockchain(self):
         clear_screen()
@@ -102,6 +190,14 @@ class App:
             print("\nResultado: ¡LA CADENA ES CORRUPTA!")
             print(f"  Razón: {e}")
 
+        # El índice de saldos se contrasta con un recorrido completo de la cadena.
+        try:
+            self.blockchain.verify_ledger()
+            print("El índice de saldos coincide con la cadena.")
+        except LedgerInconsistencyError as e:
+            print("\nAdvertencia: el índice de saldos no coincide con la cadena.")
+            print(f"  Detalle: {e}")
+
     def run_immutability_attack(self):
         clear_screen()
         print("--- Escenario 4: Ataque a la Inmutabilidad (Post-Minado) ---")
@@ -216,13 +312,18 @@ def main_menu(app):
         "5": "Simular: Ataque de Inmutabilidad (Post-Minado)",
         "6": "Simular: Ataque de Firma Inválida (Pre-Minado)",
         "7": "Simular: Ataque de Doble Gasto",
-        "8": "Salir"
+        "8": "Cancelar minería",
+        "9": "Salir"
     }
 
     while True:
         clear_screen()
         print("======= Simulador de Blockchain Académico ======")
         app.print_balances()
+        while app.notices:
+            print(f"\n[Minería] {app.notices.pop(0)}")
+        if app.miner is not None and app.miner.running:
+            print(f"\n[Minería] En curso en segundo plano ({len(app.blockchain.mempool)} pendientes).")
         print("\nMenú de Opciones:")
         for key, value in menu_options.items():
             print(f"  {key}. {value}")
@@ -251,16 +352,100 @@ def main_menu(app):
             app.run_double_spend_attack()
             wait_for_enter()
         elif choice == "8":
+            app.cancel_mining()
+            wait_for_enter()
+        elif choice == "9":
+            app.close()
             print("Saliendo del simulador.")
             break
         else:
             print("Opción no válida. Inténtalo de nuevo.")
             time.sleep(1)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Simulador de Blockchain Académico")
+    parser.add_argument(
+        "--data-dir",
+        help="Directorio donde se guarda la cadena; si ya contiene bloques, se reanuda desde ellos."
+    )
+    parser.add_argument(
+        "--keystore",
+        help="Archivo cifrado con las billeteras: se cargan si existe y se crea si no."
+    )
+    parser.add_argument(
+        "--metrics-out",
+        help="Activa las métricas y las guarda al salir (JSON si termina en .json, formato Prometheus si no)."
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["mine", "add_transaction", "is_valid", "is_chain_valid"],
+        help="Perfila con cProfile la operación indicada y muestra el resumen al salir."
+    )
+
+    headless = parser.add_argument_group("modo sin interfaz (generador de carga)")
+    headless.add_argument("--headless", action="store_true", help="Genera carga sin el menú y muestra un informe al terminar.")
+    headless.add_argument("--wallets", type=int, default=100, help="Billeteras que envían transacciones.")
+    headless.add_argument("--tx-rate", type=float, default=200, help="Transacciones por segundo a enviar.")
+    headless.add_argument("--transactions", type=int, default=2000, help="Total de transacciones a enviar.")
+    headless.add_argument("--mine-interval", type=float, default=2.0,
+                          help="Segundos entre bloques (0 = solo por tamaño).")
+    headless.add_argument("--mine-threshold", type=int, default=500,
+                          help="Transacciones pendientes que disparan un bloque (0 = solo por tiempo).")
+    headless.add_argument("--mining-workers", type=int, default=1, help="Procesos de minería.")
+    headless.add_argument("--difficulty", type=int, default=3, help="Ceros hexadecimales iniciales del objetivo.")
+    headless.add_argument("--attack-rate", type=float, default=0.0,
+                          help="Probabilidad por transacción de intercalar un escenario de ataque.")
+    headless.add_argument("--seed", type=int, default=1, help="Semilla para reproducir la carga.")
+    headless.add_argument("--report-json", help="Guarda también el informe en este archivo JSON.")
+    args = parser.parse_args()
+    if args.headless and not (args.mine_interval or args.mine_threshold):
+        parser.error("--mine-interval y --mine-threshold no pueden ser ambos 0.")
+    return args
+
+def run_headless(args):
+    generator = WorkloadGenerator(
+        wallets=args.wallets,
+        tx_rate=args.tx_rate,
+        transactions=args.transactions,
+        mine_interval=args.mine_interval or None,
+        mine_threshold=args.mine_threshold,
+        attack_rate=args.attack_rate,
+        seed=args.seed,
+        difficulty=args.difficulty,
+        mining_workers=args.mining_workers,
+    )
+    print(f"Generando carga: {args.transactions} transacciones a {args.tx_rate} tx/s con {args.wallets} billeteras...")
+    report = generator.run()
+    print(format_report(report))
+    if args.report_json:
+        with open(args.report_json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Informe guardado en '{args.report_json}'.")
+
+def setup_instrumentation(args):
+    if args.metrics_out:
+        METRICS.enable()
+    if args.profile:
+        METRICS.enable_profiling(args.profile)
+
+def finish_instrumentation(args):
+    if args.metrics_out:
+        METRICS.write(args.metrics_out)
+        print(f"Métricas guardadas en '{args.metrics_out}'.")
+    if args.profile:
+        print(METRICS.profile_report(args.profile) or f"No se ejecutó ninguna operación '{args.profile}'.")
+
 if __name__ == "__main__":
+    args = parse_args()
+    setup_instrumentation(args)
     try:
-        app_instance = App()
-        main_menu(app_instance)
+        if args.headless:
+            run_headless(args)
+        else:
+            app_instance = App(data_dir=args.data_dir, keystore=args.keystore)
+            main_menu(app_instance)
     except Exception as e:
         print(f"\nHa ocurrido un error fatal en la aplicación: {e}")
         print("Por favor, reinicia el simulador.")
+    finally:
+        finish_instrumentation(args)
@@ -0,0 +1,111 @@
+"""
+Mempool: transacciones validadas a la espera de ser incluidas en un bloque.
+
+- Índice por identificador de transacción para rechazar duplicados.
+- Débitos pendientes por remitente para detectar el doble gasto en O(1).
+- Orden por comisión (mayor primero; a igual comisión, la más antigua primero).
+- Tamaño máximo: al llenarse se expulsan las transacciones de menor comisión.
+"""
+
+import bisect
+
+from exceptions import DuplicateTransactionError, MempoolFullError
+from utils import COINBASE_SENDER, MEMPOOL_MAX_SIZE
+
+
+class Mempool:
+    def __init__(self, max_size=MEMPOOL_MAX_SIZE):
+        self.max_size = max_size
+        self.transactions = {}     # tx_id -> Transaction
+        self.pending_debits = {}   # remitente -> monto + comisión comprometidos
+        self._by_sender = {}       # remitente -> identificadores de sus transacciones pendientes
+        self._order = []           # Claves (-comisión, secuencia, tx_id) ordenadas por prioridad
+        self._keys = {}            # tx_id -> clave en self._order
+        self._sequence = 0
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def __contains__(self, tx_id):
+        return tx_id in self.transactions
+
+    def __iter__(self):
+        """Recorre las transacciones en orden de prioridad."""
+        return (self.transactions[key[2]] for key in self._order)
+
+    def get_pending_debit(self, address):
+        """Total que una dirección ya tiene comprometido en transacciones pendientes."""
+        return self.pending_debits.get(address, 0)
+
+    def add(self, transaction, tx_id=None):
+        """
+        Añade una transacción ya validada. Si la mempool está llena, expulsa la de menor
+        comisión siempre que la nueva pague más; si no, lanza `MempoolFullError`.
+        Retorna la lista de transacciones expulsadas.
+        """
+        tx_id = tx_id or transaction.get_id()
+        if tx_id in self.transactions:
+            raise DuplicateTransactionError(f"La transacción {tx_id[:10]}... ya está pendiente.")
+
+        evicted = []
+        if len(self.transactions) >= self.max_size:
+            lowest_key = self._order[-1]
+            if -lowest_key[0] >= transaction.fee:
+                raise MempoolFullError(
+                    f"Mempool llena ({self.max_size} transacciones). "
+                    f"La comisión debe superar {-lowest_key[0]}."
+                )
+            evicted.append(self.remove(lowest_key[2]))
+
+        key = (-transaction.fee, self._sequence, tx_id)
+        self._sequence += 1
+        bisect.insort(self._order, key)
+        self._keys[tx_id] = key
+        self.transactions[tx_id] = transaction
+        sender = transaction.sender
+        if sender != COINBASE_SENDER:
+            self.pending_debits[sender] = self.pending_debits.get(sender, 0) + transaction.amount + transaction.fee
+            self._by_sender.setdefault(sender, set()).add(tx_id)
+        return evicted
+
+    def remove(self, tx_id):
+        """Retira una transacción por su identificador y libera su débito pendiente."""
+        transaction = self.transactions.pop(tx_id)
+        key = self._keys.pop(tx_id)
+        del self._order[bisect.bisect_left(self._order, key)]
+        sender = transaction.sender
+        if sender != COINBASE_SENDER:
+            sender_ids = self._by_sender[sender]
+            sender_ids.discard(tx_id)
+            if sender_ids:
+                self.pending_debits[sender] -= transaction.amount + transaction.fee
+            else:
+                # Se elimina la entrada para no arrastrar residuos de redondeo.
+                del self._by_sender[sender]
+                del self.pending_debits[sender]
+        return transaction
+
+    def remove_transactions(self, transactions):
+        """Retira las transacciones que ya fueron incluidas en un bloque."""
+        for tx in transactions:
+            tx_id = tx.get_id()
+            if tx_id in self.transactions:
+                self.remove(tx_id)
+
+    def get_sender_transactions(self, address):
+        """Transacciones pendientes de un remitente, en orden de prioridad."""
+        keys = sorted(self._keys[tx_id] for tx_id in self._by_sender.get(address, ()))
+        return [self.transactions[key[2]] for key in keys]
+
+    def get_block_template(self, max_transactions=None):
+        """Retorna hasta `max_transactions` transacciones de mayor prioridad, sin retirarlas."""
+        keys = self._order if max_transactions is None else self._order[:max_transactions]
+        return [self.transactions[key[2]] for key in keys]
+
+    def clear(self):
+        """Vacía la mempool."""
+        self.transactions.clear()
+        self.pending_debits.clear()
+        self._by_sender.clear()
+        self._order.clear()
+        self._keys.clear()
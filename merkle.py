@@ -0,0 +1,64 @@
+"""
+Cálculo de la raíz de Merkle sobre los identificadores de las transacciones de un bloque,
+y pruebas de inclusión para clientes ligeros.
+
+Una prueba de inclusión es la lista de hermanos del camino desde la hoja hasta la raíz,
+cada uno como `[hash, lado]` con lado `"left"` o `"right"` (dónde va el hermano al
+combinar). Su tamaño es logarítmico en el número de transacciones del bloque.
+"""
+
+import hashlib
+
+# Raíz usada por los bloques sin transacciones.
+EMPTY_MERKLE_ROOT = "0" * 64
+
+
+def hash_pair(left, right):
+    """Combina dos nodos del árbol (hex) en su nodo padre (hex)."""
+    return hashlib.sha256((left + right).encode('utf-8')).hexdigest()
+
+
+def compute_merkle_root(tx_ids):
+    """
+    Calcula la raíz de Merkle de una lista de identificadores en hexadecimal.
+    Como en Bitcoin, si un nivel tiene un número impar de nodos se duplica el último.
+    """
+    level = list(tx_ids)
+    if not level:
+        return EMPTY_MERKLE_ROOT
+    while len(level) > 1:
+        if len(level) % 2 == 1:
+            level.append(level[-1])
+        level = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+    return level[0]
+
+
+def build_merkle_proof(tx_ids, position):
+    """Prueba de inclusión del identificador en `position` dentro de `tx_ids`."""
+    if not 0 <= position < len(tx_ids):
+        raise IndexError(f"No hay ninguna transacción en la posición {position}.")
+    level = list(tx_ids)
+    proof = []
+    while len(level) > 1:
+        if len(level) % 2 == 1:
+            level.append(level[-1])
+        if position % 2 == 0:
+            proof.append([level[position + 1], "right"])
+        else:
+            proof.append([level[position - 1], "left"])
+        level = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+        position //= 2
+    return proof
+
+
+def verify_merkle_proof(tx_id, proof, merkle_root):
+    """Indica si `proof` lleva de `tx_id` a `merkle_root`."""
+    node = tx_id
+    for sibling, side in proof:
+        if side == "left":
+            node = hash_pair(sibling, node)
+        elif side == "right":
+            node = hash_pair(node, sibling)
+        else:
+            return False
+    return node == merkle_root
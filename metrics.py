@@ -0,0 +1,284 @@
+"""
+Instrumentación del motor: contadores, medidores e histogramas de latencia, con
+exportación en formato de texto de Prometheus o como instantánea JSON, y un gancho
+opcional de `cProfile` para una operación concreta.
+
+Las métricas están desactivadas por defecto. Mientras lo estén, cada punto de
+instrumentación se reduce a comprobar un atributo y retornar, y `METRICS.time(...)`
+devuelve un contexto vacío compartido, así que el costo es despreciable.
+
+Uso:
+    from metrics import METRICS
+    METRICS.enable()
+    ...
+    METRICS.write("metricas.prom")   # o "metricas.json"
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+
+# Límites superiores (segundos) de los cubos de los histogramas de latencia
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _labels_key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        return [(self.name, key, value) for key, value in self.values.items()]
+
+    def snapshot(self):
+        return {_format_labels(key) or "": value for key, value in self.values.items()}
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self.values[_labels_key(labels)] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, description, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.series = {}  # etiquetas -> [conteos por cubo..., suma, total]
+
+    def observe(self, value, **labels):
+        key = _labels_key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self):
+        result = []
+        for key, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                result.append((f"{self.name}_bucket", key + (("le", repr(bound)),), cumulative))
+            result.append((f"{self.name}_bucket", key + (("le", "+Inf"),), series[-1]))
+            result.append((f"{self.name}_sum", key, series[-2]))
+            result.append((f"{self.name}_count", key, series[-1]))
+        return result
+
+    def snapshot(self):
+        result = {}
+        for key, series in self.series.items():
+            count, total = series[-1], series[-2]
+            result[_format_labels(key) or ""] = {
+                "count": count,
+                "sum": total,
+                "mean": total / count if count else 0,
+                "buckets": dict(zip((repr(bound) for bound in self.buckets), series)),
+            }
+        return result
+
+
+class _Timer:
+    """Contexto que observa la duración del bloque en un histograma y, si corresponde, lo perfila."""
+
+    __slots__ = ("registry", "name", "labels", "profiler", "start")
+
+    def __init__(self, registry, name, labels, profiler):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.profiler = profiler
+
+    def __enter__(self):
+        if self.profiler is not None:
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.registry._profile_lock.release()
+        if self.registry.enabled:
+            self.registry.observe(self.name, elapsed, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = False
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._profiles = {}  # operación -> cProfile.Profile
+        self._profile_lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name):
+        return self._metrics[name]
+
+    # --- Puntos de instrumentación (no hacen nada si las métricas están desactivadas) ---
+
+    def inc(self, name, amount=1, **labels):
+        if self.enabled:
+            with self._lock:
+                self._metrics[name].inc(amount, **labels)
+
+    def set(self, name, value, **labels):
+        if self.enabled:
+            with self._lock:
+                self._metrics[name].set(value, **labels)
+
+    def observe(self, name, value, **labels):
+        if self.enabled:
+            with self._lock:
+                self._metrics[name].observe(value, **labels)
+
+    def time(self, name, profile=None, **labels):
+        """
+        Contexto que mide la duración del bloque en el histograma `name`. Si se activó
+        el perfilado de la operación `profile` (ver `enable_profiling`), también la perfila.
+        """
+        profiler = self._profiles.get(profile) if profile else None
+        # cProfile no admite dos perfiladores activos a la vez: las llamadas concurrentes solo se miden.
+        if profiler is not None and not self._profile_lock.acquire(blocking=False):
+            profiler = None
+        if profiler is None and not self.enabled:
+            return _NULL_CONTEXT
+        return _Timer(self, name, labels, profiler)
+
+    # --- Perfilado ---
+
+    def enable_profiling(self, operation):
+        """Perfila con `cProfile` cada ejecución de `operation` (p. ej. "mine", "add_transaction")."""
+        self._profiles[operation] = cProfile.Profile()
+
+    def disable_profiling(self, operation):
+        self._profiles.pop(operation, None)
+
+    def profile_report(self, operation, limit=25, sort="cumulative"):
+        """Resumen en texto de las funciones más costosas de `operation`."""
+        profiler = self._profiles.get(operation)
+        if profiler is None:
+            return ""
+        output = io.StringIO()
+        try:
+            pstats.Stats(profiler, stream=output).sort_stats(sort).print_stats(limit)
+        except TypeError:  # Aún no hay datos perfilados
+            return ""
+        return output.getvalue()
+
+    def dump_profile(self, operation, path):
+        """Guarda los datos de `cProfile` de `operation` (se pueden abrir con `pstats` o snakeviz)."""
+        self._profiles[operation].dump_stats(path)
+
+    # --- Exportación ---
+
+    def to_prometheus(self):
+        """Todas las métricas en el formato de texto de Prometheus."""
+        lines = []
+        with self._lock:
+            for metric in self._metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.description}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                for name, key, value in metric.samples():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Instantánea de todas las métricas como diccionario serializable a JSON."""
+        with self._lock:
+            return {
+                "time": time.time(),
+                "metrics": {
+                    metric.name: {"type": metric.kind, "help": metric.description, "values": metric.snapshot()}
+                    for metric in self._metrics.values()
+                },
+            }
+
+    def write(self, path):
+        """Escribe las métricas en `path`: JSON si termina en `.json`, formato Prometheus si no."""
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                json.dump(self.snapshot(), f, indent=2)
+            else:
+                f.write(self.to_prometheus())
+
+    def reset(self):
+        """Vacía los valores de todas las métricas (las definiciones se conservan)."""
+        with self._lock:
+            for metric in self._metrics.values():
+                if isinstance(metric, Histogram):
+                    metric.series.clear()
+                else:
+                    metric.values.clear()
+
+
+METRICS = MetricsRegistry()
+
+# Minería
+METRICS.register(Counter("mining_blocks_total", "Bloques minados y añadidos a la cadena."))
+METRICS.register(Counter("mining_discarded_total", "Bloques minados descartados porque la punta cambió."))
+METRICS.register(Counter("mining_hashes_total", "Hashes calculados al minar."))
+METRICS.register(Gauge("mining_hash_rate", "Hashes por segundo de la última minería."))
+METRICS.register(Histogram("mining_block_seconds", "Tiempo de búsqueda del nonce por bloque."))
+METRICS.register(Counter("mining_template_refreshes_total",
+                         "Plantillas del minero en segundo plano rehechas antes de encontrar el nonce."))
+# Validación y admisión de transacciones
+METRICS.register(Histogram("transaction_verify_seconds", "Verificación ECDSA de una firma (fallos de caché)."))
+METRICS.register(Counter("signature_cache_hits_total", "Firmas aceptadas desde la caché sin verificar."))
+METRICS.register(Histogram("add_transaction_seconds", "Duración de Blockchain.add_transaction."))
+METRICS.register(Histogram("add_transactions_seconds", "Duración de Blockchain.add_transactions (un lote)."))
+METRICS.register(Counter("transactions_accepted_total", "Transacciones admitidas en la mempool."))
+METRICS.register(Counter("transactions_rejected_total", "Transacciones rechazadas, por tipo de error."))
+METRICS.register(Gauge("mempool_size", "Transacciones pendientes en la mempool."))
+# Cadena
+METRICS.register(Gauge("chain_height", "Número de bloques de la cadena."))
+METRICS.register(Counter("chain_reorgs_total", "Reorganizaciones hacia una rama con más trabajo acumulado."))
+METRICS.register(Gauge("chain_last_reorg_depth", "Bloques retirados de la punta en la última reorganización."))
+METRICS.register(Gauge("chain_side_blocks", "Bloques guardados en ramas laterales del árbol de bloques."))
+METRICS.register(Histogram("chain_validation_seconds", "Duración de Blockchain.is_chain_valid."))
+METRICS.register(Counter("chain_validation_failures_total", "Auditorías que encontraron la cadena corrupta."))
@@ -0,0 +1,193 @@
+"""
+Minero en segundo plano con plantilla de bloque renovable y cancelación.
+
+`BackgroundMiner` mina en un hilo propio, así que quien lo usa (el menú de `main.py`,
+la API de `node_api.py`) sigue atendiendo mientras se busca el nonce; la búsqueda en sí
+ocurre en procesos aparte (`mining.mine_parallel`), también con un solo proceso, para
+no competir con el hilo principal por el GIL.
+
+El hilo toma una plantilla de las pendientes de mayor comisión
+(`Blockchain.build_block_template`) y la mina. La búsqueda se interrumpe y la
+plantilla se rehace cuando:
+- llega un bloque nuevo a la cadena (la plantilla ya no enlaza con la punta), o
+- se admiten `refresh_threshold` transacciones nuevas y la plantilla aún no está llena.
+
+Como la prueba de trabajo no tiene memoria, rehacer la plantilla no pierde progreso
+esperado: solo cuesta arrancar de nuevo los procesos. Si no hay pendientes, el hilo
+espera a que llegue alguna.
+
+Los bloques encontrados se entregan con `concurrent.futures.Future` (`submit`) o con
+el callback `on_block` (minería continua con `start`).
+
+Uso:
+    miner = BackgroundMiner(blockchain, miner_address, workers=2)
+    future = miner.submit()          # Resuelve con el siguiente bloque minado
+    ...
+    miner.cancel()                   # Cancela la minería y los futuros pendientes
+"""
+
+import threading
+from concurrent.futures import Future, InvalidStateError
+
+from metrics import METRICS
+from mining import MiningStats, mine_parallel
+from utils import MAX_BLOCK_TRANSACTIONS, MINER_REFRESH_THRESHOLD
+
+
+class BackgroundMiner:
+    def __init__(self, blockchain, miner_address, workers=1, refresh_threshold=MINER_REFRESH_THRESHOLD,
+                 max_transactions=MAX_BLOCK_TRANSACTIONS, on_block=None):
+        """
+        `miner_address`, `workers`, `refresh_threshold` y `max_transactions` se leen al
+        construir cada plantilla, así que pueden cambiarse con la minería en curso.
+        `on_block(block)` se llama desde el hilo del minero con cada bloque añadido.
+        """
+        self.blockchain = blockchain
+        self.miner_address = miner_address
+        self.workers = workers
+        self.refresh_threshold = refresh_threshold
+        self.max_transactions = max_transactions
+        self.on_block = on_block
+        self.blocks_mined = 0
+        self.template_refreshes = 0
+        self.last_error = None  # Excepción que detuvo el hilo del minero, si la hubo
+
+        self._lock = threading.Lock()
+        self._futures = []  # Futuros que se resuelven con el siguiente bloque minado
+        self._continuous = False
+        self._thread = None
+        self._cancel = threading.Event()
+        self._wakeup = threading.Event()  # Llegó una transacción o un bloque, o se canceló
+        self._tip_changed = False
+        self._new_transactions = 0
+        self._template_size = 0
+        blockchain.add_block_listener(self._on_block_added)
+        blockchain.add_transaction_listener(self._on_transaction_added)
+
+    @property
+    def running(self):
+        """`True` mientras el hilo del minero tiene trabajo (minando o esperando pendientes)."""
+        with self._lock:
+            return self._thread is not None
+
+    def submit(self):
+        """
+        Pide el siguiente bloque y retorna un `Future` que se resuelve con él (el
+        `Block` ya añadido a la cadena). Si ya hay una minería en curso, el futuro se
+        resuelve con el mismo bloque que los demás.
+        """
+        future = Future()
+        with self._lock:
+            self._futures.append(future)
+            self._ensure_thread()
+        return future
+
+    def start(self):
+        """Mina bloques sin parar (cada uno se entrega a `on_block`) hasta `cancel`."""
+        with self._lock:
+            self._continuous = True
+            self._ensure_thread()
+
+    def cancel(self):
+        """Detiene la minería en curso y cancela los futuros pendientes."""
+        with self._lock:
+            self._continuous = False
+            futures, self._futures = self._futures, []
+            if self._thread is not None:
+                self._cancel.set()
+                self._wakeup.set()
+        for future in futures:
+            future.cancel()
+
+    def stop(self, timeout=None):
+        """Como `cancel`, y además espera a que termine el hilo del minero."""
+        with self._lock:
+            thread = self._thread
+        self.cancel()
+        if thread is not None:
+            thread.join(timeout)
+
+    def _ensure_thread(self):
+        # Se llama con `self._lock` tomado.
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="background-miner", daemon=True)
+            self._thread.start()
+
+    def _on_block_added(self, block):
+        self._tip_changed = True
+        self._wakeup.set()
+
+    def _on_transaction_added(self, transaction):
+        self._new_transactions += 1
+        self._wakeup.set()
+
+    def _has_work(self):
+        # Se llama con `self._lock` tomado.
+        self._futures = [future for future in self._futures if not future.done()]
+        return self._continuous or bool(self._futures)
+
+    def _should_restart(self):
+        """Consultada por `mine_parallel` mientras busca: ¿hay que abandonar la plantilla actual?"""
+        if self._cancel.is_set() or self._tip_changed:
+            return True
+        if self._new_transactions >= self.refresh_threshold and self._template_size < self.max_transactions:
+            return True
+        with self._lock:
+            return not self._has_work()
+
+    def _run(self):
+        hashes = elapsed = 0  # Acumulados entre plantillas hasta encontrar un bloque
+        try:
+            while True:
+                with self._lock:
+                    self._cancel.clear()
+                    if not self._has_work():
+                        self._thread = None
+                        return
+                    self._wakeup.clear()
+                    self._tip_changed = False
+                    self._new_transactions = 0
+
+                block = self.blockchain.build_block_template(self.miner_address, self.max_transactions)
+                if block is None:
+                    self._wakeup.wait()
+                    continue
+                self._template_size = len(block.transactions) - 1
+
+                stats = mine_parallel(block, self.workers, should_stop=self._should_restart)
+                hashes += stats.hashes
+                elapsed += stats.elapsed
+                if self._cancel.is_set():
+                    hashes = elapsed = 0  # Cancelada (aunque el nonce llegara a la vez): no se añade
+                    continue
+                if not stats.found:
+                    self.template_refreshes += 1
+                    METRICS.inc("mining_template_refreshes_total")
+                    continue
+
+                METRICS.observe("mining_block_seconds", elapsed)
+                mined = self.blockchain.submit_mined_block(block, MiningStats(hashes, elapsed, stats.workers))
+                hashes = elapsed = 0
+                if mined is None:
+                    continue  # La punta cambió justo al encontrarlo: se mina sobre la nueva
+                self.blocks_mined += 1
+                with self._lock:
+                    futures, self._futures = self._futures, []
+                for future in futures:
+                    try:
+                        future.set_result(mined)
+                    except InvalidStateError:
+                        pass  # Cancelado por quien lo pidió
+                if self.on_block is not None:
+                    self.on_block(mined)
+        except Exception as e:
+            self.last_error = e
+            with self._lock:
+                futures, self._futures = self._futures, []
+                self._continuous = False
+                self._thread = None
+            for future in futures:
+                try:
+                    future.set_exception(e)
+                except InvalidStateError:
+                    pass
@@ -0,0 +1,137 @@
+"""
+Minería de Prueba de Trabajo (PoW) repartida entre varios procesos.
+
+El espacio de nonces se reparte de forma intercalada: el proceso `i` de `N`
+prueba los nonces i, i+N, i+2N, ... El primero que encuentra un hash válido
+avisa al resto mediante un evento compartido y todos terminan. La búsqueda también
+puede detenerse desde fuera (ver `should_stop` en `mine_parallel`).
+"""
+
+import hashlib
+import multiprocessing
+import os
+import queue
+import time
+
+from encoding import encode_nonce
+
+# Número de intentos entre consultas al evento de parada.
+STOP_CHECK_INTERVAL = 20000
+# Segundos entre consultas a `should_stop` mientras los procesos buscan.
+STOP_POLL_INTERVAL = 0.05
+
+
+class MiningStats:
+    """Resultado de una sesión de minería: intentos realizados y tiempo empleado."""
+
+    def __init__(self, hashes, elapsed, workers, found=True):
+        self.hashes = hashes
+        self.elapsed = elapsed
+        self.workers = workers
+        self.found = found  # False si la búsqueda se detuvo antes de encontrar un nonce
+
+    @property
+    def hash_rate(self):
+        """Hashes por segundo agregados entre todos los procesos."""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.hashes / self.elapsed
+
+    def __repr__(self):
+        return (
+            f"MiningStats(hashes={self.hashes}, elapsed={self.elapsed:.4f}, "
+            f"workers={self.workers}, hash_rate={self.hash_rate:.0f} H/s)"
+        )
+
+
+def resolve_workers(workers):
+    """Normaliza el número de procesos: `None` o valores < 1 usan todos los núcleos."""
+    if workers is None or workers < 1:
+        return os.cpu_count() or 1
+    return workers
+
+
+def _search_nonces(header_prefix, target, start, step, stop_event, result_queue):
+    """
+    Proceso trabajador. Prueba los nonces start, start+step, ... hasta encontrar
+    uno cuyo hash no supere `target` o hasta que otro proceso active `stop_event`.
+    Siempre envía a la cola una tupla (nonce o None, hashes probados).
+    """
+    from_bytes = int.from_bytes
+    # "Midstate": el prefijo de la cabecera se procesa una sola vez.
+    base = hashlib.sha256(header_prefix)
+    nonce = start
+    hashes = 0
+    found = None
+    while found is None and not stop_event.is_set():
+        for _ in range(STOP_CHECK_INTERVAL):
+            attempt = base.copy()
+            attempt.update(encode_nonce(nonce))
+            hashes += 1
+            if from_bytes(attempt.digest(), "big") <= target:
+                found = nonce
+                stop_event.set()
+                break
+            nonce += step
+    result_queue.put((found, hashes))
+
+
+def mine_parallel(block, workers=None, should_stop=None):
+    """
+    Mina `block` (con el objetivo de dificultad de su cabecera) repartiendo el
+    espacio de nonces entre `workers` procesos.
+    Al terminar, el bloque queda con el nonce y el hash encontrados, exactamente
+    igual que si se hubiera usado `Block.mine_block`.
+    `should_stop()` se consulta cada `STOP_POLL_INTERVAL` segundos; si retorna `True`
+    los procesos se detienen y el bloque queda sin cambios (`found` es `False`).
+    Retorna un `MiningStats` con los hashes agregados de todos los procesos.
+    """
+    workers = resolve_workers(workers)
+    header_prefix = block.get_header_prefix()
+    first_nonce = block.nonce
+
+    ctx = multiprocessing.get_context()
+    stop_event = ctx.Event()
+    result_queue = ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=_search_nonces,
+            args=(header_prefix, block.target, first_nonce + i, workers, stop_event, result_queue),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+
+    start_t = time.time()
+    for process in processes:
+        process.start()
+
+    found_nonces = []
+    total_hashes = 0
+    try:
+        # Cada proceso envía exactamente un resultado antes de terminar.
+        received = 0
+        while received < workers:
+            try:
+                nonce, hashes = result_queue.get(timeout=STOP_POLL_INTERVAL if should_stop else None)
+            except queue.Empty:
+                if should_stop():
+                    stop_event.set()
+                continue
+            received += 1
+            total_hashes += hashes
+            if nonce is not None:
+                found_nonces.append(nonce)
+                stop_event.set()
+    finally:
+        stop_event.set()
+        for process in processes:
+            process.join()
+    elapsed = time.time() - start_t
+
+    if not found_nonces:
+        return MiningStats(total_hashes, elapsed, workers, found=False)
+    # Si dos procesos aciertan a la vez, se conserva el primero recibido.
+    block.nonce = found_nonces[0]
+    block.hash = block.calculate_hash()
+    return MiningStats(total_hashes, elapsed, workers)
@@ -0,0 +1,460 @@
+"""
+API HTTP local del nodo, basada en asyncio (sin dependencias externas).
+
+Expone la `Blockchain` al front end de `crypto_web` y a otros clientes:
+
+    GET  /api/status                          Altura, punta, dificultad y pendientes
+    GET  /api/balance/<dirección>             Saldo confirmado y comprometido
+    GET  /api/blocks?start=&limit=            Bloques por altura (por defecto, los últimos)
+    GET  /api/blocks/<altura o hash>          Un bloque
+    GET  /api/transactions/<id>               Una transacción (confirmada o pendiente)
+    GET  /api/transactions/<id>/proof         Prueba de inclusión de Merkle (para clientes ligeros)
+    GET  /api/headers?start=&limit=           Cabeceras por altura (para clientes ligeros)
+    GET  /api/addresses/<dirección>/history   Historial paginado (?offset=&limit=)
+    POST /api/transactions                    Envía una transacción firmada (JSON de `to_dict`)
+    POST /api/transactions/batch              Envía una lista de transacciones; resultado por transacción
+    POST /api/mine                            Mina un bloque ({"miner_address": ..., "workers": ...})
+    POST /api/mine/cancel                     Cancela la minería en curso
+    GET  /api/events                          Server-Sent Events con cada bloque nuevo
+    GET  /api/metrics                         Métricas en formato Prometheus (?format=json para JSON)
+    GET  /                                    Archivos estáticos de `crypto_web`
+
+La validación de firmas y la minería se ejecutan fuera del bucle de eventos (hilos y,
+para la minería, procesos), así que las lecturas siguen respondiendo durante la minería.
+La minería usa un `miner.BackgroundMiner`: las transacciones que llegan mientras se mina
+entran en el bloque y, si la punta cambia, se mina sobre la nueva en lugar de fallar.
+
+Uso:
+    python node_api.py --port 8000 --genesis-address <clave pública hex>
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from blockchain import Blockchain, Transaction
+from difficulty import format_target, zero_bits_from_target
+from exceptions import BlockchainError, InvalidTransactionError
+from metrics import METRICS
+from miner import BackgroundMiner
+from utils import INITIAL_FUNDS
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crypto_web")
+CONTENT_TYPES = {".html": "text/html; charset=utf-8", ".js": "text/javascript", ".css": "text/css"}
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 500: "Internal Server Error"}
+SSE_HEARTBEAT_SECONDS = 15
+MAX_PAGE_SIZE = 100
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _reject_constant(name):
+    raise ValueError(f"Valor no admitido en JSON: {name}")
+
+
+def _parse_json(body):
+    """`json.loads` que rechaza `NaN`, `Infinity` y `-Infinity` (no son JSON estándar)."""
+    return json.loads(body, parse_constant=_reject_constant)
+
+
+def _int_param(query, name, default):
+    try:
+        return int(query.get(name, [default])[0])
+    except ValueError:
+        raise HTTPError(400, f"El parámetro '{name}' debe ser un entero.")
+
+
+class NodeAPI:
+    def __init__(self, blockchain, mining_workers=None, static_dir=STATIC_DIR):
+        """
+        `mining_workers` son los procesos de minería por defecto (`None` = todos los
+        núcleos); la minería siempre ocurre en procesos aparte y no compite con el bucle
+        de eventos.
+        """
+        self.blockchain = blockchain
+        self.mining_workers = mining_workers
+        self.static_dir = static_dir
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        self._miner = BackgroundMiner(blockchain, None, workers=mining_workers)
+        self._mining_lock = asyncio.Lock()
+        self._subscribers = set()
+        self._loop = None
+        self._server = None
+
+    async def start(self, host="127.0.0.1", port=8000):
+        self._loop = asyncio.get_running_loop()
+        self.blockchain.add_block_listener(self._on_block)
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for queue in list(self._subscribers):
+            queue.put_nowait(None)
+        self._miner.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _on_block(self, block):
+        """Se llama desde el hilo que añadió el bloque; reenvía el evento al bucle."""
+        self._loop.call_soon_threadsafe(self._broadcast, block.to_dict())
+
+    def _broadcast(self, block_data):
+        for queue in self._subscribers:
+            queue.put_nowait(block_data)
+
+    async def _run_blocking(self, function, *args):
+        return await self._loop.run_in_executor(self._executor, function, *args)
+
+    # --- HTTP ---
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = b""
+                if "content-length" in headers:
+                    body = await reader.readexactly(int(headers["content-length"]))
+
+                url = urlsplit(target)
+                if method == "GET" and url.path == "/api/events":
+                    await self._stream_events(writer)
+                    break
+
+                try:
+                    status, payload = await self._dispatch(method, url, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except BlockchainError as e:
+                    status, payload = 400, {"error": str(e), "type": type(e).__name__}
+                except Exception as e:
+                    status, payload = 500, {"error": f"Error inesperado: {e}"}
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _write_response(self, writer, status, payload, keep_alive):
+        content_type = "application/json"
+        if isinstance(payload, tuple):
+            content_type, body = payload
+        elif payload is None:
+            body = b""
+        else:
+            body = json.dumps(payload).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            "Access-Control-Allow-Origin: *",
+            "Access-Control-Allow-Headers: Content-Type",
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _dispatch(self, method, url, body):
+        if method == "OPTIONS":
+            return 204, None
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = parse_qs(url.query)
+
+        if not parts or parts[0] != "api":
+            if method != "GET":
+                raise HTTPError(405, "Método no permitido.")
+            return 200, self._static_file(parts)
+
+        route = parts[1:]
+        if method == "GET":
+            if route == ["status"]:
+                return 200, self._status()
+            if len(route) == 2 and route[0] == "balance":
+                return 200, self._balance(route[1])
+            if route == ["blocks"]:
+                return 200, self._blocks(query)
+            if len(route) == 2 and route[0] == "blocks":
+                return 200, self._block(route[1])
+            if len(route) == 2 and route[0] == "transactions":
+                return 200, self._transaction(route[1])
+            if len(route) == 3 and route[0] == "transactions" and route[2] == "proof":
+                return 200, self._proof(route[1])
+            if route == ["headers"]:
+                return 200, self._headers(query)
+            if len(route) == 3 and route[0] == "addresses" and route[2] == "history":
+                return 200, self._history(route[1], query)
+            if route == ["metrics"]:
+                return 200, self._metrics(query)
+        elif method == "POST":
+            if route == ["transactions"]:
+                return 201, await self._submit_transaction(body)
+            if route == ["transactions", "batch"]:
+                return 200, await self._submit_transactions(body)
+            if route == ["mine"]:
+                return 200, await self._mine(body)
+            if route == ["mine", "cancel"]:
+                return 200, self._cancel_mining()
+        else:
+            raise HTTPError(405, "Método no permitido.")
+        raise HTTPError(404, "Ruta no encontrada.")
+
+    def _static_file(self, parts):
+        name = "/".join(parts) or "index.html"
+        path = os.path.realpath(os.path.join(self.static_dir, name))
+        if not path.startswith(os.path.realpath(self.static_dir) + os.sep) or not os.path.isfile(path):
+            raise HTTPError(404, "Archivo no encontrado.")
+        with open(path, "rb") as f:
+            content = f.read()
+        return CONTENT_TYPES.get(os.path.splitext(path)[1], "application/octet-stream"), content
+
+    # --- Endpoints ---
+
+    def _status(self):
+        latest = self.blockchain.get_latest_block()
+        next_target = self.blockchain.get_next_target()
+        return {
+            "height": len(self.blockchain.chain),
+            "latest_hash": latest.hash,
+            "difficulty": self.blockchain.difficulty,
+            "next_target": format_target(next_target),
+            "difficulty_bits": round(zero_bits_from_target(next_target), 2),
+            "pending_transactions": len(self.blockchain.mempool),
+            "mining": self._mining_lock.locked(),
+        }
+
+    def _balance(self, address):
+        return {
+            "address": address,
+            "balance": self.blockchain.get_balance(address),
+            "pending_debit": self.blockchain.mempool.get_pending_debit(address),
+        }
+
+    def _blocks(self, query):
+        height = len(self.blockchain.chain)
+        limit = min(_int_param(query, "limit", 10), MAX_PAGE_SIZE)
+        start = _int_param(query, "start", max(height - limit, 0))
+        end = min(start + limit, height)
+        return {
+            "height": height,
+            "start": start,
+            "blocks": [block.to_dict() for block in self.blockchain.get_blocks(start, end)],
+        }
+
+    def _block(self, key):
+        if len(key) == 64:
+            block = self.blockchain.get_block_by_hash(key)
+        elif key.isdigit():
+            block = self.blockchain.get_block_by_height(int(key))
+        else:
+            raise HTTPError(400, "Se esperaba una altura o un hash de bloque.")
+        if block is None:
+            raise HTTPError(404, "Bloque no encontrado.")
+        return block.to_dict()
+
+    def _transaction(self, tx_id):
+        found = self.blockchain.get_transaction(tx_id)
+        if found is None:
+            raise HTTPError(404, "Transacción no encontrada.")
+        return dict(found, transaction=found["transaction"].to_dict())
+
+    def _proof(self, tx_id):
+        proof = self.blockchain.get_merkle_proof(tx_id)
+        if proof is None:
+            raise HTTPError(404, "Transacción no confirmada en un bloque completo.")
+        return proof
+
+    def _headers(self, query):
+        height = len(self.blockchain.chain)
+        start = max(_int_param(query, "start", 0), 0)
+        end = min(start + min(_int_param(query, "limit", MAX_PAGE_SIZE), MAX_PAGE_SIZE), height)
+        return {
+            "height": height,
+            "start": start,
+            "headers": [block.get_header() for block in self.blockchain.get_blocks(start, end)],
+        }
+
+    def _history(self, address, query):
+        history = self.blockchain.get_address_history(
+            address,
+            offset=_int_param(query, "offset", 0),
+            limit=min(_int_param(query, "limit", 50), MAX_PAGE_SIZE),
+        )
+        history["items"] = [dict(item, transaction=item["transaction"].to_dict()) for item in history["items"]]
+        return history
+
+    def _metrics(self, query):
+        if not METRICS.enabled:
+            raise HTTPError(404, "Las métricas están desactivadas (arranca el nodo con --metrics).")
+        if query.get("format", [""])[0] == "json":
+            return METRICS.snapshot()
+        return "text/plain; version=0.0.4", METRICS.to_prometheus().encode("utf-8")
+
+    async def _submit_transaction(self, body):
+        try:
+            transaction = Transaction.from_dict(_parse_json(body))
+        except (ValueError, KeyError, TypeError) as e:
+            raise HTTPError(400, f"Transacción mal formada: {e}")
+        await self._run_blocking(self.blockchain.add_transaction, transaction)
+        return {"accepted": True, "id": transaction.get_id()}
+
+    async def _submit_transactions(self, body):
+        try:
+            items = _parse_json(body)
+        except ValueError as e:
+            raise HTTPError(400, f"Lote de transacciones mal formado: {e}")
+        if not isinstance(items, list):
+            raise HTTPError(400, "Se esperaba una lista de transacciones.")
+        # Cada elemento se reconstruye por separado: uno mal formado no invalida el resto del lote.
+        transactions = [None] * len(items)
+        errors = [None] * len(items)
+        for position, data in enumerate(items):
+            try:
+                transactions[position] = Transaction.from_dict(data)
+            except BlockchainError as e:
+                errors[position] = e
+            except (ValueError, KeyError, TypeError) as e:
+                errors[position] = InvalidTransactionError(f"Transacción mal formada: {e}")
+        parsed = [position for position, tx in enumerate(transactions) if tx is not None]
+        results = await self._run_blocking(self.blockchain.add_transactions, [transactions[p] for p in parsed])
+        for position, error in zip(parsed, results):
+            errors[position] = error
+        return {
+            "accepted": sum(error is None for error in errors),
+            "results": [
+                {"id": tx.get_id(), "accepted": True}
+                if error is None else
+                {"id": tx.get_id() if tx is not None else None, "accepted": False, "error": str(error),
+                 "type": type(error).__name__}
+                for tx, error in zip(transactions, errors)
+            ],
+        }
+
+    async def _mine(self, body):
+        try:
+            params = _parse_json(body or b"{}")
+            miner_address = params["miner_address"]
+        except (ValueError, KeyError, TypeError):
+            raise HTTPError(400, "Se requiere 'miner_address'.")
+        if self._mining_lock.locked():
+            raise HTTPError(409, "Ya hay una minería en curso.")
+        if not self.blockchain.pending_transactions:
+            raise HTTPError(409, "No se minó ningún bloque: no hay transacciones pendientes.")
+        async with self._mining_lock:
+            self._miner.miner_address = miner_address
+            self._miner.workers = params.get("workers", self.mining_workers)
+            future = self._miner.submit()
+            try:
+                # `asyncio.wait` no propaga la cancelación del futuro como si fuera la de esta tarea.
+                await asyncio.wait([asyncio.wrap_future(future)])
+            except asyncio.CancelledError:
+                future.cancel()  # El cliente se desconectó o el servidor se está deteniendo
+                raise
+        if future.cancelled():
+            raise HTTPError(409, "La minería se canceló.")
+        block = future.result()
+        stats = self.blockchain.last_mining_stats
+        return {"block": block.to_dict(), "hashes": stats.hashes, "elapsed": stats.elapsed,
+                "hash_rate": stats.hash_rate}
+
+    def _cancel_mining(self):
+        running = self._miner.running
+        self._miner.cancel()
+        return {"cancelled": running}
+
+    async def _stream_events(self, writer):
+        """Mantiene abierta la conexión y envía cada bloque nuevo como evento SSE."""
+        writer.write((
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: text/event-stream\r\n"
+            "Cache-Control: no-cache\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("latin-1"))
+        await writer.drain()
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            while True:
+                try:
+                    block_data = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    writer.write(b": heartbeat\n\n")
+                else:
+                    if block_data is None:
+                        break
+                    writer.write(f"event: block\ndata: {json.dumps(block_data)}\n\n".encode("utf-8"))
+                await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
+
+
+async def serve(blockchain, host, port, mining_workers=None):
+    """Arranca la API y atiende peticiones hasta que se cancele."""
+    api = NodeAPI(blockchain, mining_workers=mining_workers)
+    server = await api.start(host, port)
+    print(f"Nodo escuchando en http://{host}:{port} (altura {len(blockchain.chain)})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await api.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP local del nodo de la blockchain.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--difficulty", type=int, default=4)
+    parser.add_argument("--data-dir", help="Directorio del almacén de bloques (ver `storage.py`).")
+    parser.add_argument("--genesis-address", help="Clave pública hex que recibe los fondos iniciales.")
+    parser.add_argument("--genesis-funds", type=float, default=INITIAL_FUNDS)
+    parser.add_argument("--mining-workers", type=int, default=None,
+                        help="Procesos de minería (por defecto, todos los núcleos).")
+    parser.add_argument("--target-block-time", type=float, default=None,
+                        help="Segundos por bloque hacia los que se reajusta la dificultad (sin reajuste si se omite).")
+    parser.add_argument("--metrics", action="store_true", help="Activa las métricas en /api/metrics.")
+    args = parser.parse_args()
+    if args.metrics:
+        METRICS.enable()
+
+    blockchain = Blockchain(
+        difficulty=args.difficulty,
+        initial_beneficiary=args.genesis_address,
+        initial_funds=args.genesis_funds,
+        data_dir=args.data_dir,
+        target_block_time=args.target_block_time,
+    )
+    try:
+        asyncio.run(serve(blockchain, args.host, args.port, args.mining_workers))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        blockchain.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,526 @@
+"""
+Red de nodos sobre TCP local, basada en asyncio (sin dependencias externas).
+
+Cada nodo envuelve una `Blockchain` y se comunica con sus pares mediante mensajes JSON,
+uno por línea. Los mensajes con respuesta son:
+
+    hello        {"port"}             Presentación; el receptor conecta de vuelta al emisor
+    status       {}                   Altura, punta y datos de la última sincronización
+    get_headers  {"start", "count"}   Cabeceras (`Block.get_header`) desde una altura
+    get_blocks   {"start", "end"}     Bloques completos en [start, end)
+    get_proof    {"tx_id"}            Prueba de inclusión de Merkle de una transacción confirmada
+    submit_tx    {"transaction"}      Envía una transacción firmada y la difunde
+    mine         {"miner_address"}    Mina un bloque con las transacciones pendientes
+
+y los de difusión, sin respuesta:
+
+    tx           {"transaction"}      Transacción nueva
+    block        {"block"}            Bloque nuevo
+
+`subscribe` convierte la conexión en un flujo de eventos (`tx_accepted`, `block_accepted`,
+`synced`), cada uno con la hora local del nodo, para medir tiempos de propagación.
+
+Un nodo rezagado se pone al día descargando primero las cabeceras del par más alto,
+comprobando su encadenamiento, su objetivo de dificultad y su prueba de trabajo, y
+después los cuerpos de los bloques en tramos pedidos en paralelo a todos los pares
+que los tienen. Si la cadena del par se separa de la local, las cabeceras se piden
+desde el punto de bifurcación y `Blockchain.add_block` decide por trabajo acumulado
+si reorganiza. Un bloque difundido cuyo padre no se conoce también dispara la
+sincronización.
+
+Un nodo podado (`--prune-depth`) o arrancado desde una instantánea (`--snapshot`) tiene
+todas las cabeceras pero no los cuerpos antiguos: rechaza `get_blocks` por debajo de su
+`pruned_height` (que anuncia en `status`) y el que sincroniza los pide a otro par.
+
+Uso:
+    python p2p.py --port 9001 --peers 127.0.0.1:9000 --genesis-file genesis.json
+    python p2p.py --port 9002 --peers 127.0.0.1:9000 --snapshot instantanea.json --snapshot-hash <hash>
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from audit import verify_header
+from blockchain import Block, Blockchain, Transaction
+from exceptions import BlockchainError, InvalidBlockError, OrphanBlockError
+from sigcache import LRUCache
+from snapshot import load_snapshot
+from utils import P2P_SEEN_CACHE_SIZE, SYNC_HEADERS_BATCH, SYNC_BLOCKS_BATCH
+
+STREAM_LIMIT = 64 * 1024 * 1024  # Tamaño máximo de una línea (un tramo de bloques completos)
+
+
+class PeerError(Exception):
+    """Un par no respondió o respondió con un error."""
+    pass
+
+
+def _encode(message):
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+
+class Peer:
+    """Conexión saliente y persistente con otro nodo. Las peticiones se atienden de una en una."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    def __repr__(self):
+        return f"Peer({self.host}:{self.port})"
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port, limit=STREAM_LIMIT)
+
+    async def request(self, message_type, **params):
+        """Envía un mensaje y espera su respuesta. Lanza `PeerError` si falla."""
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await self.connect()
+                self._writer.write(_encode(dict(params, type=message_type)))
+                await self._writer.drain()
+                line = await self._reader.readline()
+            except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError) as e:
+                self._disconnect()
+                raise PeerError(f"{self!r}: {e}")
+        if not line:
+            self._disconnect()
+            raise PeerError(f"{self!r}: conexión cerrada.")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise PeerError(f"{self!r}: {response.get('error')}")
+        return response
+
+    def send(self, message_type, **params):
+        """Difunde un mensaje sin esperar respuesta; se descarta si no hay conexión."""
+        if self._writer is None or self._writer.is_closing():
+            return
+        self._writer.write(_encode(dict(params, type=message_type)))
+
+    def _disconnect(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    def close(self):
+        self._disconnect()
+
+
+async def find_fork_point(peer, height, local_hash):
+    """
+    Primera altura en la que la cadena de `peer` puede diferir de la local, de `height`
+    bloques (`local_hash(altura)` da el hash local): se compara el hash de la cabecera del
+    par con el local retrocediendo en pasos que se duplican, así que una bifurcación a
+    profundidad d cuesta O(log d) peticiones.
+    """
+    step = 1
+    probe = height - 1
+    while probe > 0:
+        response = await peer.request("get_headers", start=probe, count=1)
+        if response["headers"] and response["headers"][0]["hash"] == local_hash(probe):
+            return probe + 1
+        probe = max(probe - step, 0)
+        step *= 2
+    return 1
+
+
+class Node:
+    def __init__(self, blockchain, port, host="127.0.0.1", mining_workers=1):
+        self.blockchain = blockchain
+        self.host = host
+        self.port = port
+        self.mining_workers = mining_workers
+        self.peers = {}  # (host, puerto) -> Peer
+        self.last_sync = None
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        self._seen_transactions = LRUCache(P2P_SEEN_CACHE_SIZE)
+        self._seen_blocks = LRUCache(P2P_SEEN_CACHE_SIZE)
+        self._subscribers = set()
+        self._syncing = False
+        self._sync_task = None
+        self._sync_again = False
+        self._loop = None
+        self._server = None
+
+    async def start(self, peer_addresses=()):
+        """Abre el puerto del nodo, conecta con los pares dados y se sincroniza con ellos."""
+        self._loop = asyncio.get_running_loop()
+        self.blockchain.add_block_listener(self._on_block)
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=STREAM_LIMIT
+        )
+        for host, port in peer_addresses:
+            await self.add_peer(host, port, announce=True)
+        self._schedule_sync()
+        return self._server
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for peer in self.peers.values():
+            peer.close()
+        for queue in list(self._subscribers):
+            queue.put_nowait(None)
+        self._executor.shutdown(wait=False)
+
+    async def add_peer(self, host, port, announce=False):
+        """Conecta con un par; con `announce` le pide que conecte de vuelta."""
+        key = (host, port)
+        if key in self.peers or key == (self.host, self.port):
+            return self.peers.get(key)
+        peer = Peer(host, port)
+        try:
+            await peer.connect()
+            if announce:
+                await peer.request("hello", port=self.port)
+        except (OSError, PeerError):
+            peer.close()
+            return None
+        self.peers[key] = peer
+        return peer
+
+    async def _run_blocking(self, function, *args):
+        return await self._loop.run_in_executor(self._executor, function, *args)
+
+    # --- Eventos y difusión ---
+
+    def _on_block(self, block):
+        """Se llama desde el hilo que añadió el bloque; reenvía el evento al bucle."""
+        self._loop.call_soon_threadsafe(self._block_appended, block, time.time())
+
+    def _block_appended(self, block, accepted_at):
+        self._seen_blocks.put(block.hash, True)
+        self._emit("block_accepted", accepted_at, hash=block.hash, index=block.index)
+        if not self._syncing:
+            self._gossip("block", block=block.to_dict())
+
+    def _gossip(self, message_type, **params):
+        for peer in self.peers.values():
+            peer.send(message_type, **params)
+
+    def _emit(self, event, at=None, **data):
+        message = dict(data, event=event, time=at or time.time(), port=self.port)
+        for queue in self._subscribers:
+            queue.put_nowait(message)
+
+    # --- Conexiones entrantes ---
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                message_type = message.get("type")
+                if message_type == "subscribe":
+                    await self._stream_events(writer)
+                    break
+                if message_type == "tx":
+                    await self._receive_transaction(message["transaction"])
+                    continue
+                if message_type == "block":
+                    await self._receive_block(message["block"])
+                    continue
+
+                try:
+                    response = await self._dispatch(message_type, message)
+                    response["ok"] = True
+                except BlockchainError as e:
+                    response = {"ok": False, "error": str(e), "error_type": type(e).__name__}
+                except (KeyError, TypeError, ValueError) as e:
+                    response = {"ok": False, "error": f"Mensaje mal formado: {e}"}
+                writer.write(_encode(response))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, message_type, message):
+        if message_type == "hello":
+            await self.add_peer(self.host, int(message["port"]))
+            return self._status()
+        if message_type == "status":
+            return self._status()
+        if message_type == "get_headers":
+            start, count = int(message["start"]), min(int(message["count"]), SYNC_HEADERS_BATCH)
+            blocks = await self._run_blocking(self._block_range, start, start + count)
+            return {"headers": [block.get_header() for block in blocks]}
+        if message_type == "get_blocks":
+            start, end = int(message["start"]), int(message["end"])
+            if start < self.blockchain.pruned_height:
+                raise BlockchainError(f"Los bloques anteriores a {self.blockchain.pruned_height} están podados.")
+            blocks = await self._run_blocking(self._block_range, start, min(end, start + SYNC_BLOCKS_BATCH))
+            return {"blocks": [block.to_dict() for block in blocks]}
+        if message_type == "get_proof":
+            return await self._run_blocking(self._transaction_proof, message["tx_id"])
+        if message_type == "submit_tx":
+            tx_id = await self._accept_transaction(message["transaction"])
+            return {"id": tx_id}
+        if message_type == "mine":
+            block = await self._run_blocking(
+                lambda: self.blockchain.mine_pending_transactions(
+                    message["miner_address"], workers=self.mining_workers
+                )
+            )
+            return {"block": block.get_header() if block else None}
+        raise ValueError(f"tipo desconocido '{message_type}'")
+
+    def _status(self):
+        latest = self.blockchain.get_latest_block()
+        return {
+            "height": len(self.blockchain.chain),
+            "tip": latest.hash,
+            "pending": len(self.blockchain.mempool),
+            "peers": len(self.peers),
+            "pruned_height": self.blockchain.pruned_height,
+            "last_sync": self.last_sync,
+        }
+
+    def _transaction_proof(self, tx_id):
+        proof = self.blockchain.get_merkle_proof(tx_id)
+        if proof is None:
+            raise BlockchainError("La transacción no está confirmada en un bloque completo de este nodo.")
+        transaction = self.blockchain.get_transaction(tx_id)["transaction"]
+        return {"proof": proof, "transaction": transaction.to_dict()}
+
+    def _block_range(self, start, end):
+        return self.blockchain.get_blocks(start, end)
+
+    async def _stream_events(self, writer):
+        """Mantiene abierta la conexión y envía cada evento del nodo como una línea JSON."""
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        writer.write(_encode({"ok": True}))
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                writer.write(_encode(event))
+                await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
+
+    # --- Transacciones y bloques recibidos ---
+
+    async def _accept_transaction(self, tx_data):
+        """Valida y añade una transacción a la mempool, y la difunde. Retorna su id."""
+        transaction = Transaction.from_dict(tx_data)
+        tx_id = transaction.get_id()
+        self._seen_transactions.put(tx_id, True)
+        await self._run_blocking(self.blockchain.add_transaction, transaction)
+        self._emit("tx_accepted", id=tx_id)
+        self._gossip("tx", transaction=tx_data)
+        return tx_id
+
+    async def _receive_transaction(self, tx_data):
+        try:
+            transaction = Transaction.from_dict(tx_data)
+            if self._seen_transactions.get(transaction.get_id()):
+                return
+            await self._accept_transaction(tx_data)
+        except (BlockchainError, KeyError, TypeError, ValueError):
+            pass
+
+    async def _receive_block(self, block_data):
+        """
+        Un bloque que cuelga de uno conocido se valida y se añade a la cadena o a una rama
+        lateral (y el listener difunde los que pasan a la cadena); uno cuyo padre no se
+        conoce indica que el nodo va rezagado o en otra rama y dispara una sincronización.
+        """
+        if self._seen_blocks.get(block_data.get("hash")):
+            return
+        try:
+            await self._run_blocking(self.blockchain.add_block, Block.from_dict(block_data))
+        except OrphanBlockError:
+            self._schedule_sync()
+        except (BlockchainError, KeyError, TypeError, ValueError):
+            pass
+
+    # --- Sincronización ---
+
+    def _schedule_sync(self):
+        if self._sync_task is not None and not self._sync_task.done():
+            self._sync_again = True
+            return
+        self._sync_task = asyncio.ensure_future(self._sync_loop())
+
+    async def _sync_loop(self):
+        while True:
+            self._sync_again = False
+            try:
+                await self.sync()
+            except (BlockchainError, PeerError):
+                pass
+            if not self._sync_again:
+                break
+
+    async def sync(self):
+        """
+        Se pone al día con el par más alto: cabeceras primero y cuerpos después, en
+        paralelo desde todos los pares que los tienen. Retorna el número de bloques añadidos.
+        """
+        start_time = time.perf_counter()
+        statuses = await asyncio.gather(
+            *(peer.request("status") for peer in self.peers.values()), return_exceptions=True
+        )
+        heights = {
+            peer: status["height"]
+            for peer, status in zip(self.peers.values(), statuses)
+            if not isinstance(status, Exception)
+        }
+        local_height = len(self.blockchain.chain)
+        if not heights or max(heights.values()) <= local_height:
+            return 0
+        best_peer = max(heights, key=heights.get)
+
+        self._syncing = True
+        try:
+            start = await find_fork_point(best_peer, local_height, lambda h: self.blockchain.chain[h].hash)
+            headers = await self._download_headers(best_peer, start, heights[best_peer])
+            applied = await self._download_blocks(headers, heights)
+        finally:
+            self._syncing = False
+
+        elapsed = time.perf_counter() - start_time
+        self.last_sync = {"blocks": applied, "elapsed": elapsed, "height": len(self.blockchain.chain),
+                          "peers": len(heights)}
+        self._emit("synced", **self.last_sync)
+        return applied
+
+    async def _download_headers(self, peer, start, target_height):
+        """Descarga y verifica las cabeceras [start, target_height) de `peer`."""
+        previous_hash = self.blockchain.chain[start - 1].hash
+        headers = []
+        chain = self.blockchain.chain
+
+        def lookup(h):
+            return headers[h - start] if h >= start else chain[h]
+
+        height = start
+        while height < target_height:
+            response = await peer.request("get_headers", start=height, count=SYNC_HEADERS_BATCH)
+            if not response["headers"]:
+                break
+            for header_data in response["headers"]:
+                header = Block.from_header(header_data)
+                verify_header(header, height, previous_hash, self.blockchain.get_target_for(height, lookup),
+                              self.blockchain.get_median_time_for(height, lookup))
+                headers.append(header)
+                previous_hash = header.hash
+                height += 1
+        return headers
+
+    async def _download_blocks(self, headers, heights):
+        """
+        Pide los cuerpos en tramos de `SYNC_BLOCKS_BATCH`, repartidos entre los pares que
+        llegan a esa altura, y los aplica en orden a medida que llegan.
+        """
+        if not headers:
+            return 0
+        first = headers[0].index
+        chunks = [(start, min(start + SYNC_BLOCKS_BATCH, first + len(headers)))
+                  for start in range(first, first + len(headers), SYNC_BLOCKS_BATCH)]
+        window = max(2, 2 * len(heights))
+        pending = deque()
+        applied = 0
+        for number, (start, end) in enumerate(chunks):
+            candidates = [peer for peer, height in heights.items() if height >= end]
+            rotated = candidates[number % len(candidates):] + candidates[:number % len(candidates)]
+            pending.append(asyncio.ensure_future(self._fetch_chunk(rotated, start, end)))
+            if len(pending) >= window:
+                applied += await self._apply_chunk(await pending.popleft(), headers, first)
+        while pending:
+            applied += await self._apply_chunk(await pending.popleft(), headers, first)
+        return applied
+
+    async def _fetch_chunk(self, peers, start, end):
+        """Pide un tramo al primer par de la lista y, si falla, a los siguientes."""
+        error = None
+        for peer in peers:
+            try:
+                response = await peer.request("get_blocks", start=start, end=end)
+                blocks = [Block.from_dict(data) for data in response["blocks"]]
+                if len(blocks) == end - start:
+                    return blocks
+            except PeerError as e:
+                error = e
+        raise PeerError(f"Ningún par entregó los bloques {start}-{end - 1}: {error}")
+
+    async def _apply_chunk(self, blocks, headers, first):
+        applied = 0
+        for block in blocks:
+            if block.hash != headers[block.index - first].hash:
+                raise InvalidBlockError(f"El bloque {block.index} no coincide con su cabecera.")
+            # `add_block` retorna `None` para los bloques que ya se conocían.
+            if await self._run_blocking(self.blockchain.add_block, block) is not None:
+                applied += 1
+        return applied
+
+
+async def serve(blockchain, host, port, peer_addresses=(), mining_workers=1):
+    """Arranca el nodo y atiende a sus pares hasta que se cancele."""
+    node = Node(blockchain, port, host=host, mining_workers=mining_workers)
+    server = await node.start(peer_addresses)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await node.stop()
+
+
+def parse_peer(address):
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nodo de la red local de la blockchain.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--peers", nargs="*", default=[], help="Pares iniciales como host:puerto.")
+    parser.add_argument("--genesis-file", help="Bloque génesis compartido (JSON de `Block.to_dict`).")
+    parser.add_argument("--difficulty", type=int, default=4)
+    parser.add_argument("--data-dir", help="Directorio del almacén de bloques (ver `storage.py`).")
+    parser.add_argument("--mining-workers", type=int, default=1)
+    parser.add_argument("--target-block-time", type=float, default=None,
+                        help="Segundos por bloque hacia los que se reajusta la dificultad (igual en todos los nodos).")
+    parser.add_argument("--snapshot", help="Arranca desde esta instantánea (ver `snapshot.py`) y descarga solo los bloques posteriores.")
+    parser.add_argument("--snapshot-hash", help="Hash publicado que debe tener la instantánea.")
+    parser.add_argument("--prune-depth", type=int, default=None,
+                        help="Conserva completos solo los últimos bloques (solo sin --data-dir).")
+    args = parser.parse_args()
+    if args.snapshot and not args.snapshot_hash:
+        parser.error("--snapshot requiere --snapshot-hash para verificar la instantánea.")
+
+    genesis_block = None
+    if args.genesis_file:
+        with open(args.genesis_file, encoding="utf-8") as f:
+            genesis_block = Block.from_dict(json.load(f))
+    snapshot = load_snapshot(args.snapshot, args.snapshot_hash) if args.snapshot else None
+    blockchain = Blockchain(
+        difficulty=args.difficulty, data_dir=args.data_dir, genesis_block=genesis_block,
+        target_block_time=args.target_block_time, snapshot=snapshot, prune_depth=args.prune_depth,
+    )
+    peers = [parse_peer(address) for address in args.peers]
+    try:
+        asyncio.run(serve(blockchain, args.host, args.port, peers, args.mining_workers))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        blockchain.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Cachés para la verificación de firmas.
+
+- `VERIFYING_KEY_CACHE`: claves públicas ya parseadas (`ecdsa.VerifyingKey`), por su hex.
+  Cuando una clave se usa `VERIFYING_KEY_PRECOMPUTE_USES` veces se sustituye por una
+  versión con tablas precalculadas de sus múltiplos, que verifica en torno al doble de
+  rápido. Construir las tablas cuesta unas pocas verificaciones, así que solo compensa
+  para remitentes que firman a menudo.
+- `SIGNATURE_CACHE`: pares (SHA-256 de los datos firmados, firma) que ya superaron la
+  verificación. Si el contenido de la transacción cambia, cambia el resumen y la firma
+  se vuelve a verificar.
+
+Solo se aceptan firmas canónicas (ver `is_canonical_signature`).
+
+Ambas son LRU acotadas y cuentan aciertos y fallos para poder dimensionarlas.
+
+`verify_signatures` verifica un lote de firmas, repartido entre varios procesos si es
+grande (ver `Blockchain.add_transactions`).
+"""
+
+import binascii
+import hashlib
+import multiprocessing
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import ecdsa
+
+from mining import resolve_workers
+from utils import (
+    VERIFYING_KEY_CACHE_SIZE, SIGNATURE_CACHE_SIZE, VERIFYING_KEY_PRECOMPUTE_USES, PARALLEL_VERIFY_MIN_BATCH,
+)
+
+
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Retorna el valor asociado a `key` o `None`, actualizando los contadores."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Guarda un valor; si se supera el tamaño máximo se descarta el menos usado."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        """Retira una entrada si existe."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Tamaño, aciertos, fallos y tasa de aciertos."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+VERIFYING_KEY_CACHE = LRUCache(VERIFYING_KEY_CACHE_SIZE)
+SIGNATURE_CACHE = LRUCache(SIGNATURE_CACHE_SIZE)
+
+_HALF_ORDER = ecdsa.SECP256k1.order // 2
+
+
+def is_canonical_signature(signature):
+    """
+    Indica si una firma cruda (r || s, 64 bytes) tiene `s` en la mitad inferior del orden
+    de la curva. Si (r, s) es válida también lo es (r, n - s): sin esta regla cualquiera
+    podría cambiar la firma, y con ella el identificador, de una transacción ya confirmada
+    y volver a enviarla.
+    """
+    return len(signature) == 64 and int.from_bytes(signature[32:], "big") <= _HALF_ORDER
+
+
+def get_verifying_key(public_key_hex, uses=1):
+    """
+    Retorna el `ecdsa.VerifyingKey` de una clave pública en hex, parseándola una sola vez.
+    `uses` es cuántas verificaciones se harán con la clave devuelta: quien verifica un
+    lote lo indica de una vez para que las tablas se precalculen antes de la primera.
+    """
+    entry = VERIFYING_KEY_CACHE.get(public_key_hex)
+    if entry is None:
+        public_key_bytes = binascii.unhexlify(public_key_hex)
+        # La entrada guarda la clave y cuántas veces se ha pedido.
+        entry = [ecdsa.VerifyingKey.from_string(public_key_bytes, curve=ecdsa.SECP256k1), 0]
+        VERIFYING_KEY_CACHE.put(public_key_hex, entry)
+    entry[1] += uses
+    if entry[1] - uses < VERIFYING_KEY_PRECOMPUTE_USES <= entry[1]:
+        # Se reemplaza por un objeto nuevo en lugar de modificar el que otro hilo puede estar usando.
+        entry[0] = precompute_verifying_key(entry[0])
+    return entry[0]
+
+
+def precompute_verifying_key(verifying_key):
+    """
+    Copia de `verifying_key` con las tablas de múltiplos de su punto ya calculadas.
+    `VerifyingKey.from_string` crea un punto sin orden conocido y `ecdsa` no precalcula
+    sobre él, así que se reconstruye el punto indicando el orden de la curva.
+    """
+    curve = ecdsa.SECP256k1
+    point = verifying_key.pubkey.point
+    precomputed = ecdsa.ellipticcurve.PointJacobi(
+        curve.curve, point.x(), point.y(), 1, curve.order, generator=True
+    )
+    # Las tablas se construyen de forma perezosa en la primera multiplicación.
+    precomputed * 2
+    return ecdsa.VerifyingKey.from_public_point(precomputed, curve=curve)
+
+
+def signature_cache_key(signing_data, signature):
+    """Clave de `SIGNATURE_CACHE` para una firma sobre `signing_data`."""
+    return (hashlib.sha256(signing_data).digest(), signature)
+
+
+def _verify_chunk(items):
+    """
+    Verifica en este proceso una lista de `(clave pública hex, firma hex, datos firmados)`.
+    Retorna, por firma, `True`, `False` (firma inválida) o el mensaje de un error inesperado.
+    """
+    uses = Counter(public_key_hex for public_key_hex, _, _ in items)
+    keys = {}
+    results = []
+    for public_key_hex, signature_hex, signing_data in items:
+        try:
+            verifying_key = keys.get(public_key_hex)
+            if verifying_key is None:
+                verifying_key = keys[public_key_hex] = get_verifying_key(public_key_hex, uses[public_key_hex])
+            signature = binascii.unhexlify(signature_hex)
+            if not is_canonical_signature(signature):
+                results.append(False)
+                continue
+            results.append(verifying_key.verify(signature, signing_data, hashfunc=hashlib.sha256))
+        except (binascii.Error, ecdsa.BadSignatureError):
+            results.append(False)
+        except Exception as e:
+            results.append(str(e))
+    return results
+
+
+def _pool_context():
+    """
+    Contexto de los procesos de verificación. Los lotes llegan desde hilos (la API HTTP, el
+    minero en segundo plano): un `fork` copiaría los bloqueos de las cachés tal como los
+    tuviera otro hilo en ese instante y el hijo podría quedarse esperando para siempre.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def verify_signatures(items, workers=1, min_parallel=PARALLEL_VERIFY_MIN_BATCH):
+    """
+    Verifica un lote de `(clave pública hex, firma hex, datos firmados)` con el mismo
+    resultado por firma que `_verify_chunk`. Con `workers` > 1 (o `None` para usar todos
+    los núcleos) y al menos `min_parallel` firmas, el lote se ordena por clave y se
+    reparte en tramos entre procesos (sin `fork`, ver `_pool_context`), de modo que las
+    firmas de un mismo remitente caen en el mismo proceso y aprovechan sus tablas precalculadas.
+    """
+    workers = resolve_workers(workers)
+    if workers == 1 or len(items) < min_parallel:
+        return _verify_chunk(items)
+    order = sorted(range(len(items)), key=lambda i: items[i][0])
+    size = -(-len(items) // workers)
+    results = [None] * len(items)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as executor:
+        futures = [
+            (start, executor.submit(_verify_chunk, [items[i] for i in order[start:start + size]]))
+            for start in range(0, len(items), size)
+        ]
+        for start, future in futures:
+            for position, result in zip(order[start:start + size], future.result()):
+                results[position] = result
+    return results
+
+
+def get_cache_stats():
+    """Contadores de ambas cachés, para ajustar `VERIFYING_KEY_CACHE_SIZE` y `SIGNATURE_CACHE_SIZE`."""
+    return {
+        "verifying_keys": VERIFYING_KEY_CACHE.stats(),
+        "signatures": SIGNATURE_CACHE.stats(),
+    }
+
+
+def clear_caches():
+    """Vacía ambas cachés (útil en pruebas de rendimiento)."""
+    VERIFYING_KEY_CACHE.clear()
+    SIGNATURE_CACHE.clear()
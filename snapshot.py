@@ -0,0 +1,115 @@
+"""
+Instantáneas del estado de cuentas a una altura dada.
+
+Una instantánea resume los primeros `height` bloques de la cadena:
+- `balances`: saldo de cada dirección tras aplicar esos bloques,
+- `tx_ids`: identificadores de sus transacciones, para seguir rechazando repeticiones
+  sin conservar las transacciones,
+- `tip_hash`: hash del último bloque cubierto,
+- `hash`: SHA-256 de la forma canónica de todo lo anterior (`encoding.encode_state`),
+- `headers` (opcional): las cabeceras de esos bloques.
+
+El `hash` es el valor que se publica por un canal de confianza. Un nodo nuevo comprueba
+que la instantánea lo reproduce, que las cabeceras encadenan, cumplen su prueba de trabajo
+y terminan en `tip_hash`, y después solo descarga los bloques posteriores (ver
+`Blockchain(snapshot=...)` y `p2p.py --snapshot`).
+
+Crear una instantánea de una cadena guardada en disco:
+    python snapshot.py --data-dir datos_cadena --output instantanea.json [--height N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+from encoding import encode_state
+from exceptions import SnapshotError
+
+SNAPSHOT_VERSION = 1
+
+
+def compute_state_hash(height, tip_hash, balances, tx_ids):
+    return hashlib.sha256(encode_state(height, tip_hash, balances, tx_ids)).hexdigest()
+
+
+def build_snapshot(height, tip_hash, balances, tx_ids, headers=None):
+    """Instantánea (diccionario serializable) con su hash de compromiso."""
+    tx_ids = sorted(tx_ids)
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "height": height,
+        "tip_hash": tip_hash,
+        "balances": dict(balances),
+        "tx_ids": tx_ids,
+        "hash": compute_state_hash(height, tip_hash, balances, tx_ids),
+    }
+    if headers is not None:
+        snapshot["headers"] = headers
+    return snapshot
+
+
+def verify_snapshot(snapshot, expected_hash=None):
+    """
+    Comprueba que el contenido reproduce el hash de la instantánea y, si se indica,
+    que ese hash es `expected_hash`. Si trae cabeceras, comprueba que sean `height` y que
+    la última sea `tip_hash` (su encadenamiento lo verifica `Blockchain` al cargarlas).
+    Lanza `SnapshotError` ante cualquier discrepancia.
+    """
+    try:
+        if snapshot["version"] != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Versión de instantánea no soportada: {snapshot['version']}")
+        actual = compute_state_hash(snapshot["height"], snapshot["tip_hash"], snapshot["balances"], snapshot["tx_ids"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise SnapshotError(f"Instantánea mal formada: {e}")
+    if actual != snapshot["hash"]:
+        raise SnapshotError("El contenido de la instantánea no corresponde con su hash.")
+    if expected_hash is not None and actual != expected_hash:
+        raise SnapshotError(f"La instantánea {actual[:16]}... no es la esperada ({expected_hash[:16]}...).")
+    headers = snapshot.get("headers")
+    if headers is not None:
+        if len(headers) != snapshot["height"]:
+            raise SnapshotError(f"La instantánea trae {len(headers)} cabeceras para la altura {snapshot['height']}.")
+        if headers and headers[-1]["hash"] != snapshot["tip_hash"]:
+            raise SnapshotError("La última cabecera no es la punta de la instantánea.")
+    return True
+
+
+def save_snapshot(path, snapshot):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+    os.replace(path + ".tmp", path)
+
+
+def load_snapshot(path, expected_hash=None):
+    """Lee y verifica una instantánea (ver `verify_snapshot`)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"No se pudo leer la instantánea '{path}': {e}")
+    verify_snapshot(snapshot, expected_hash)
+    return snapshot
+
+
+def main():
+    from blockchain import Blockchain
+
+    parser = argparse.ArgumentParser(description="Crea una instantánea del estado de una cadena guardada en disco.")
+    parser.add_argument("--data-dir", required=True, help="Directorio del almacén de bloques.")
+    parser.add_argument("--output", required=True, help="Archivo JSON de la instantánea.")
+    parser.add_argument("--height", type=int, default=None, help="Bloques que cubre (por defecto, toda la cadena).")
+    args = parser.parse_args()
+
+    blockchain = Blockchain(data_dir=args.data_dir)
+    try:
+        snapshot = blockchain.create_snapshot(args.height)
+    finally:
+        blockchain.close()
+    save_snapshot(args.output, snapshot)
+    print(f"Instantánea de {snapshot['height']} bloques guardada en '{args.output}'.")
+    print(f"Hash: {snapshot['hash']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Almacén persistente de bloques, solo de anexado.
+
+Estructura del directorio de datos:
+- `blk00000.dat`, `blk00001.dat`, ...: segmentos con registros [longitud (4 bytes) | bloque],
+  con el bloque en la codificación binaria de `encoding.py`.
+  Cuando un segmento supera `BLOCK_STORE_SEGMENT_SIZE` se abre el siguiente.
+- `index.dat`: un registro de tamaño fijo por altura con (segmento, desplazamiento,
+  longitud, hash del bloque). La altura N está en la posición N * INDEX_RECORD.size,
+  así que localizar un bloque no requiere cargar el índice en memoria.
+- `chain_index.sqlite`: índices de consulta por hash, transacción y dirección (ver
+  `chain_index.DiskChainIndex`).
+- `ledger.json`: punto de control del índice de saldos (y de sus registros de deshacer) para no
+  recorrer la cadena al arrancar.
+
+Los bloques se leen bajo demanda mediante `mmap`, por lo que ni el tiempo de arranque
+ni la memoria residente crecen con la longitud de la cadena.
+
+El almacén es de solo anexado salvo por la punta: `truncate` descarta los últimos
+bloques cuando una reorganización los retira de la cadena.
+"""
+
+import json
+import mmap
+import os
+import struct
+
+from sigcache import LRUCache
+from utils import BLOCK_STORE_SEGMENT_SIZE, BLOCK_CACHE_SIZE
+
+RECORD_HEADER = struct.Struct(">I")
+INDEX_RECORD = struct.Struct(">IQI32s")  # segmento, desplazamiento, longitud, hash
+
+
+class _MappedFile:
+    """Archivo de solo anexado que se lee a través de un `mmap` que se rehace al crecer."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a+b")
+        self._file.seek(0, os.SEEK_END)
+        self.size = self._file.tell()
+        self._map = None
+
+    def append(self, data):
+        """Escribe `data` al final del archivo y retorna su desplazamiento."""
+        offset = self.size
+        self._file.write(data)
+        self._file.flush()
+        self.size += len(data)
+        return offset
+
+    def read(self, offset, length):
+        if self._map is None or offset + length > len(self._map):
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map[offset:offset + length]
+
+    def truncate(self, size):
+        """Recorta el archivo a `size` bytes (el `mmap` se cierra antes para no leer fuera del archivo)."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.truncate(size)
+        self._file.flush()
+        self.size = size
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+class BlockStore:
+    def __init__(self, data_dir, segment_size=BLOCK_STORE_SEGMENT_SIZE):
+        self.data_dir = data_dir
+        self.segment_size = segment_size
+        os.makedirs(data_dir, exist_ok=True)
+        self._index = _MappedFile(os.path.join(data_dir, "index.dat"))
+        self._segments = {}
+        self._current_segment = 0
+        if len(self):
+            self._current_segment = self._read_index(len(self) - 1)[0]
+
+    def __len__(self):
+        return self._index.size // INDEX_RECORD.size
+
+    def _segment_path(self, number):
+        return os.path.join(self.data_dir, f"blk{number:05d}.dat")
+
+    def _segment(self, number):
+        segment = self._segments.get(number)
+        if segment is None:
+            segment = _MappedFile(self._segment_path(number))
+            self._segments[number] = segment
+        return segment
+
+    def _read_index(self, height):
+        return INDEX_RECORD.unpack(self._index.read(height * INDEX_RECORD.size, INDEX_RECORD.size))
+
+    def append(self, payload, block_hash):
+        """Guarda un bloque serializado al final del almacén y retorna su altura."""
+        segment = self._segment(self._current_segment)
+        if segment.size and segment.size + RECORD_HEADER.size + len(payload) > self.segment_size:
+            self._current_segment += 1
+            segment = self._segment(self._current_segment)
+        offset = segment.append(RECORD_HEADER.pack(len(payload)) + payload)
+
+        height = len(self)
+        self._index.append(INDEX_RECORD.pack(
+            self._current_segment, offset + RECORD_HEADER.size, len(payload), bytes.fromhex(block_hash)
+        ))
+        return height
+
+    def read(self, height):
+        """Retorna los bytes del bloque a la altura indicada."""
+        if not 0 <= height < len(self):
+            raise IndexError(f"No hay ningún bloque en la altura {height}.")
+        segment_number, offset, length, _ = self._read_index(height)
+        return self._segment(segment_number).read(offset, length)
+
+    def get_hash(self, height):
+        """Retorna el hash del bloque a la altura indicada leyendo solo el índice."""
+        return self._read_index(height)[3].hex()
+
+    def truncate(self, height):
+        """Descarta los bloques a partir de la altura `height` (los segmentos posteriores se borran)."""
+        if height >= len(self):
+            return
+        segment_number, offset, _, _ = self._read_index(height)
+        for number in range(segment_number + 1, self._current_segment + 1):
+            segment = self._segments.pop(number, None)
+            if segment is not None:
+                segment.close()
+            if os.path.exists(self._segment_path(number)):
+                os.remove(self._segment_path(number))
+        self._segment(segment_number).truncate(offset - RECORD_HEADER.size)
+        self._current_segment = segment_number
+        self._index.truncate(height * INDEX_RECORD.size)
+
+    def save_ledger_checkpoint(self, balances, height, tip_hash, undo_records=()):
+        """
+        Guarda los saldos válidos tras `height` bloques, cuyo último bloque es `tip_hash`,
+        junto con los registros de deshacer de los últimos bloques (ver `ledger.py`), para
+        poder reorganizar al reanudar sin recorrer la cadena.
+        """
+        path = os.path.join(self.data_dir, "ledger.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"height": height, "tip_hash": tip_hash, "balances": balances,
+                       "undo_records": list(undo_records)}, f)
+        os.replace(path + ".tmp", path)
+
+    def load_ledger_checkpoint(self):
+        """Retorna el último punto de control de saldos o `None` si no existe."""
+        path = os.path.join(self.data_dir, "ledger.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def close(self):
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
+        self._index.close()
+
+
+class LazyChain:
+    """
+    Secuencia de bloques respaldada por un `BlockStore`: se comporta como la lista
+    `Blockchain.chain`, pero solo decodifica los bloques que se consultan y mantiene
+    en memoria los `BLOCK_CACHE_SIZE` más recientes.
+    """
+
+    def __init__(self, store, block_cls, cache_size=BLOCK_CACHE_SIZE):
+        self.store = store
+        self.block_cls = block_cls
+        self._cache = LRUCache(cache_size)
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        block = self._cache.get(position)
+        if block is None:
+            block = self.block_cls.from_bytes(self.store.read(position))
+            self._cache.put(position, block)
+        return block
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def read_bytes(self, position):
+        """Bytes del bloque tal como están en disco (`Block.to_bytes`), sin decodificarlo."""
+        return self.store.read(position)
+
+    def append(self, block):
+        height = self.store.append(block.to_bytes(), block.hash)
+        self._cache.put(height, block)
+
+    def pop(self):
+        """Retira y retorna el último bloque (ver `BlockStore.truncate`)."""
+        height = len(self) - 1
+        block = self[height]
+        self.store.truncate(height)
+        self._cache.discard(height)
+        return block
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# Los módulos del proyecto viven en la raíz del repositorio, sin paquete.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blockchain import Blockchain, Transaction  # noqa: E402
+from wallet import Wallet  # noqa: E402
+
+
+@pytest.fixture
+def alice():
+    return Wallet()
+
+
+@pytest.fixture
+def bob():
+    return Wallet()
+
+
+@pytest.fixture
+def chain(alice):
+    return Blockchain(difficulty=1, initial_beneficiary=alice.get_public_key_hex(), initial_funds=500)
+
+
+def make_transaction(sender, recipient, amount, fee=0):
+    tx = Transaction(sender.get_public_key_hex(), recipient.get_public_key_hex(), amount, fee=fee)
+    tx.sign(sender)
+    return tx
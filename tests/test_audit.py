@@ -0,0 +1,32 @@
+import pytest
+
+from audit import audit_chain_parallel
+from conftest import make_transaction
+from exceptions import InvalidBlockError
+
+
+def _mine_blocks(chain, sender, recipient, count):
+    for _ in range(count):
+        chain.add_transaction(make_transaction(sender, recipient, 1))
+        chain.mine_pending_transactions(recipient.get_public_key_hex())
+
+
+def test_parallel_audit_accepts_valid_chain(chain, alice, bob):
+    _mine_blocks(chain, alice, bob, 6)
+    progress = []
+    assert audit_chain_parallel(chain.chain, workers=2, shard_size=2,
+                                progress=lambda checked, total: progress.append((checked, total)))
+    assert progress[-1] == (6, 6)
+    assert chain.is_chain_valid(workers=2)
+
+
+@pytest.mark.parametrize("tampered", [(1,), (3, 6), (2, 5, 6)])
+def test_parallel_audit_reports_lowest_failing_block(chain, alice, bob, tampered):
+    _mine_blocks(chain, alice, bob, 7)
+    for index in tampered:
+        chain.chain[index].transactions[1].amount = 2
+    lowest = min(tampered)
+    with pytest.raises(InvalidBlockError, match=f"bloque {lowest} "):
+        audit_chain_parallel(chain.chain, workers=3, shard_size=2)
+    with pytest.raises(InvalidBlockError, match=f"bloque {lowest} "):
+        chain.is_chain_valid(workers=3)
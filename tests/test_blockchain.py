@@ -0,0 +1,195 @@
+import time
+
+import ecdsa
+import pytest
+
+from blockchain import Block, Blockchain, Transaction
+from conftest import make_transaction
+from exceptions import DuplicateTransactionError, InvalidBlockError, InvalidSignatureError, InvalidTransactionError
+from light_client import LightClient
+from utils import COINBASE_SENDER, MAX_FUTURE_BLOCK_TIME, MINING_REWARD
+from wallet import Wallet
+
+
+def _flip_signature(tx):
+    """Misma transacción con la firma equivalente (r, n - s)."""
+    raw = bytes.fromhex(tx.signature)
+    s = int.from_bytes(raw[32:], "big")
+    flipped = Transaction.from_dict(tx.to_dict())
+    flipped.signature = (raw[:32] + (ecdsa.SECP256k1.order - s).to_bytes(32, "big")).hex()
+    return flipped
+
+
+def test_replay_with_malleated_signature_is_rejected(chain, alice, bob):
+    tx = make_transaction(alice, bob, 100)
+    chain.add_transaction(tx)
+    chain.mine_pending_transactions(bob.get_public_key_hex())
+    assert chain.get_balance(alice.get_public_key_hex()) == 400
+
+    replay = _flip_signature(tx)
+    assert replay.get_id() != tx.get_id()
+    with pytest.raises(InvalidSignatureError):
+        chain.add_transaction(replay)
+    assert chain.get_balance(alice.get_public_key_hex()) == 400
+
+
+def test_block_with_malleated_signature_is_rejected(chain, alice, bob):
+    tx = make_transaction(alice, bob, 100)
+    chain.add_transaction(tx)
+    chain.mine_pending_transactions(bob.get_public_key_hex())
+
+    latest = chain.get_latest_block()
+    reward = Transaction(COINBASE_SENDER, bob.get_public_key_hex(), MINING_REWARD)
+    block = Block(latest.index + 1, [reward, _flip_signature(tx)], latest.hash, target=chain.get_next_target())
+    block.mine_block()
+    with pytest.raises(InvalidBlockError):
+        chain.add_block(block)
+    assert chain.get_balance(alice.get_public_key_hex()) == 400
+
+
+@pytest.mark.parametrize("amount, fee", [(float("nan"), 0), (30000, float("nan")), (float("inf"), 0), (10, -1)])
+def test_non_finite_or_negative_amounts_are_rejected(chain, alice, bob, amount, fee):
+    tx = make_transaction(alice, bob, amount, fee)
+    with pytest.raises(InvalidTransactionError):
+        chain.add_transaction(tx)
+    assert len(chain.mempool) == 0
+    assert chain.add_transactions([tx]) != [None]
+
+
+def _mine_blocks(chain, sender, recipient, count):
+    for _ in range(count):
+        chain.add_transaction(make_transaction(sender, recipient, 1))
+        chain.mine_pending_transactions(recipient.get_public_key_hex())
+
+
+def test_reorg_after_reload_from_disk(tmp_path, alice, bob):
+    data_dir = str(tmp_path / "datos")
+    node = Blockchain(difficulty=1, initial_beneficiary=alice.get_public_key_hex(), initial_funds=500,
+                      data_dir=data_dir)
+    genesis = node.chain[0]
+    rival = Blockchain(difficulty=1, genesis_block=Block.from_dict(genesis.to_dict()))
+    _mine_blocks(node, alice, bob, 2)
+    node.close()
+
+    node = Blockchain(difficulty=1, data_dir=data_dir)
+    assert node.loaded_from_disk and len(node.chain) == 3
+    _mine_blocks(rival, alice, bob, 3)
+    for height in range(1, 4):
+        node.add_block(rival.chain[height])
+
+    assert len(node.chain) == 4
+    assert node.get_latest_block().hash == rival.get_latest_block().hash
+    assert node.get_balance(alice.get_public_key_hex()) == rival.get_balance(alice.get_public_key_hex())
+    node.verify_ledger()
+    node.close()
+
+
+def test_batch_reports_malformed_transaction_in_place(chain, alice, bob):
+    good = make_transaction(alice, bob, 10)
+    malformed = make_transaction(alice, bob, 20)
+    malformed.signature = "no es hexadecimal"
+    results = chain.add_transactions([malformed, good])
+    assert isinstance(results[0], InvalidTransactionError)
+    assert results[1] is None
+
+
+def test_disk_index_persists_across_reloads(tmp_path, alice, bob):
+    data_dir = str(tmp_path / "datos")
+    node = Blockchain(difficulty=1, initial_beneficiary=alice.get_public_key_hex(), initial_funds=500,
+                      data_dir=data_dir)
+    tx = make_transaction(alice, bob, 25)
+    node.add_transaction(tx)
+    block = node.mine_pending_transactions(bob.get_public_key_hex())
+    assert node.get_transaction(tx.get_id())["height"] == 1
+    node.close()
+
+    node = Blockchain(difficulty=1, data_dir=data_dir)
+    assert node.index.height == 2  # Nada que reindexar al reanudar
+    assert node.get_block_by_hash(block.hash).hash == block.hash
+    assert node.get_transaction(tx.get_id())["block_hash"] == block.hash
+    history = node.get_address_history(alice.get_public_key_hex())
+    assert history["total"] == 2 and history["items"][0]["transaction"].get_id() == tx.get_id()
+    with pytest.raises(DuplicateTransactionError):
+        node.add_transaction(tx)
+    node.close()
+
+
+def _block_at(chain, timestamp, miner):
+    latest = chain.get_latest_block()
+    reward = Transaction(COINBASE_SENDER, miner.get_public_key_hex(), MINING_REWARD)
+    block = Block(latest.index + 1, [reward], latest.hash, target=chain.get_next_target())
+    block.timestamp = timestamp
+    block.mine_block()
+    return block
+
+
+@pytest.mark.parametrize("offset", [-3600, 0, MAX_FUTURE_BLOCK_TIME + 60])
+def test_block_timestamps_are_bounded(chain, alice, bob, offset):
+    _mine_blocks(chain, alice, bob, 3)
+    if offset > 0:
+        timestamp = time.time() + offset
+    else:
+        timestamp = chain.get_median_time_for(len(chain.chain)) + offset
+    with pytest.raises(InvalidBlockError, match="marca de tiempo"):
+        chain.add_block(_block_at(chain, timestamp, bob))
+    assert len(chain.chain) == 4
+
+
+def test_light_client_rejects_backdated_header(chain, alice, bob):
+    _mine_blocks(chain, alice, bob, 2)
+    client = LightClient(chain.chain[0].get_header())
+    client.add_headers(1, [block.get_header() for block in chain.chain[1:]])
+    backdated = _block_at(chain, chain.chain[0].timestamp - 1, bob)
+    with pytest.raises(InvalidBlockError, match="marca de tiempo"):
+        client.add_headers(len(client), [backdated.get_header()])
+    assert len(client) == 3
+
+
+@pytest.mark.parametrize("amount, fee", [(float("nan"), 0), (-50, 0), (float("inf"), 0), (10, 1)])
+def test_peer_block_with_invalid_coinbase_is_rejected(chain, alice, bob, amount, fee):
+    latest = chain.get_latest_block()
+    reward = Transaction(COINBASE_SENDER, bob.get_public_key_hex(), amount, fee=fee)
+    block = Block(latest.index + 1, [reward], latest.hash, target=chain.get_next_target())
+    block.mine_block()
+    with pytest.raises(InvalidBlockError, match="recompensa"):
+        chain.add_block(block)
+    assert len(chain.chain) == 1
+    assert chain.get_balance(bob.get_public_key_hex()) == 0
+    chain.verify_ledger()
+
+
+def test_coinbase_transactions_are_not_admitted(chain, bob):
+    forged = Transaction(COINBASE_SENDER, bob.get_public_key_hex(), 10 ** 6)
+    with pytest.raises(InvalidTransactionError):
+        chain.add_transaction(forged)
+    assert isinstance(chain.add_transactions([forged])[0], InvalidTransactionError)
+    assert len(chain.mempool) == 0
+    assert chain.mine_pending_transactions(bob.get_public_key_hex()) is None
+    assert chain.get_balance(bob.get_public_key_hex()) == 0
+
+
+def test_failed_reorg_restores_mempool(chain, alice, bob):
+    carol = Wallet()
+    rival = Blockchain(difficulty=1, genesis_block=Block.from_dict(chain.chain[0].to_dict()))
+    _mine_blocks(chain, alice, bob, 1)
+    main_tip = chain.get_latest_block().hash
+
+    pending = make_transaction(alice, bob, 5)
+    chain.add_transaction(pending)
+    rival.add_transaction(Transaction.from_dict(pending.to_dict()))
+    rival.mine_pending_transactions(bob.get_public_key_hex())
+
+    # Segundo bloque de la rama: bien firmado y minado, pero carol gasta fondos que no tiene.
+    overspend = make_transaction(carol, bob, 50)
+    latest = rival.get_latest_block()
+    reward = Transaction(COINBASE_SENDER, bob.get_public_key_hex(), MINING_REWARD)
+    invalid = Block(latest.index + 1, [reward, overspend], latest.hash, target=rival.get_next_target())
+    invalid.mine_block()
+
+    chain.add_block(rival.chain[1])  # Mismo trabajo que la cadena principal: no reorganiza
+    with pytest.raises(InvalidBlockError, match="fondos"):
+        chain.add_block(invalid)
+
+    assert chain.get_latest_block().hash == main_tip
+    assert pending.get_id() in chain.mempool
+    chain.verify_ledger()
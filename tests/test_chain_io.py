@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from chain_io import export_chain, import_chain, read_blocks
+from conftest import make_transaction
+from exceptions import ChainFileError
+
+
+def test_malformed_transaction_line_reports_file_and_line(tmp_path, chain, alice, bob):
+    chain.add_transaction(make_transaction(alice, bob, 10))
+    chain.mine_pending_transactions(bob.get_public_key_hex())
+    path = str(tmp_path / "cadena.jsonl")
+    export_chain(chain, path)
+
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    block = json.loads(lines[1])
+    block["transactions"][1]["signature"] = "no es hexadecimal"
+    lines[1] = json.dumps(block) + "\n"
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+
+    with pytest.raises(ChainFileError, match="línea 2"):
+        list(read_blocks(path))
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "binary"])
+def test_export_import_round_trip(tmp_path, chain, alice, bob, fmt):
+    for amount in (10, 20, 30):
+        chain.add_transaction(make_transaction(alice, bob, amount, fee=0.5))
+        chain.mine_pending_transactions(bob.get_public_key_hex())
+    path = str(tmp_path / f"cadena.{fmt}")
+    assert export_chain(chain, path, fmt=fmt) == 4
+
+    assert [block.to_dict() for block in read_blocks(path)] == [block.to_dict() for block in chain.chain]
+    imported = import_chain(path, genesis_hash=chain.chain[0].hash)
+    assert [block.hash for block in imported.chain] == [block.hash for block in chain.chain]
+    for wallet in (alice, bob):
+        assert imported.get_balance(wallet.get_public_key_hex()) == chain.get_balance(wallet.get_public_key_hex())
+    assert imported.is_chain_valid()
+    imported.verify_ledger()
+
+
+def test_import_resumes_into_existing_data_dir(tmp_path, chain, alice, bob):
+    for amount in (10, 20):
+        chain.add_transaction(make_transaction(alice, bob, amount))
+        chain.mine_pending_transactions(bob.get_public_key_hex())
+    head, tail = str(tmp_path / "inicio.bin"), str(tmp_path / "resto.bin")
+    export_chain(chain, head, fmt="binary", end=2)
+    export_chain(chain, tail, fmt="binary", start=1)
+    data_dir = str(tmp_path / "datos")
+
+    import_chain(head, data_dir=data_dir).close()
+    imported = import_chain(tail, data_dir=data_dir)
+    assert imported.get_latest_block().hash == chain.get_latest_block().hash
+    assert imported.get_balance(bob.get_public_key_hex()) == chain.get_balance(bob.get_public_key_hex())
+    imported.close()
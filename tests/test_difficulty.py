@@ -0,0 +1,40 @@
+import pytest
+
+from difficulty import MAX_TARGET, expected_target, retarget, target_from_zero_bits
+from utils import RETARGET_MAX_FACTOR
+
+TARGET = target_from_zero_bits(20)
+
+
+@pytest.mark.parametrize("actual, expected", [(600, TARGET), (300, TARGET // 2), (1200, TARGET * 2)])
+def test_retarget_scales_with_timespan(actual, expected):
+    assert retarget(TARGET, actual, 600) == expected
+
+
+@pytest.mark.parametrize("actual", [0, -100, 1])
+def test_retarget_is_clamped_when_blocks_are_too_fast(actual):
+    assert retarget(TARGET, actual, 600) == TARGET // RETARGET_MAX_FACTOR
+
+
+def test_retarget_is_clamped_when_blocks_are_too_slow():
+    assert retarget(TARGET, 600 * 100, 600) == TARGET * RETARGET_MAX_FACTOR
+
+
+def test_retarget_stays_within_target_range():
+    assert retarget(MAX_TARGET, 600 * 100, 600) == MAX_TARGET
+    assert retarget(1, 0, 600) == 1
+
+
+class _Header:
+    def __init__(self, timestamp, target):
+        self.timestamp = timestamp
+        self.target = target
+
+
+def test_expected_target_only_changes_on_interval():
+    headers = [_Header(i * 5.0, TARGET) for i in range(10)]
+    lookup = headers.__getitem__
+    assert expected_target(9, lookup, target_block_time=10, retarget_interval=10) == TARGET
+    # Nueve intervalos de 5 s frente a 10 s esperados: el objetivo se reduce a la mitad.
+    assert expected_target(10, lookup, target_block_time=10, retarget_interval=10) == TARGET // 2
+    assert expected_target(10, lookup) == TARGET
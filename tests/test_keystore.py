@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from exceptions import KeystoreError
+from keystore import load_keystore, save_keystore
+
+# Coste de scrypt reducido para que las pruebas sean rápidas.
+TEST_SCRYPT_N = 2 ** 4
+
+
+@pytest.fixture
+def keystore_path(tmp_path, alice, bob):
+    path = str(tmp_path / "wallets.json")
+    save_keystore(path, {"alice": alice, "bob": bob}, "secreto", n=TEST_SCRYPT_N)
+    return path
+
+
+def _tamper(path, field):
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    entry = document["wallets"]["alice"]
+    entry[field] = ("0" if entry[field][0] != "0" else "1") + entry[field][1:]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f)
+
+
+def test_round_trip(keystore_path, alice, bob):
+    wallets = load_keystore(keystore_path, "secreto")
+    assert wallets["alice"].get_private_key_bytes() == alice.get_private_key_bytes()
+    assert wallets["bob"].get_public_key_hex() == bob.get_public_key_hex()
+
+
+def test_wrong_password_is_rejected(keystore_path):
+    with pytest.raises(KeystoreError, match="Contraseña incorrecta"):
+        load_keystore(keystore_path, "otra")
+
+
+@pytest.mark.parametrize("field", ["ciphertext", "mac", "nonce", "address"])
+def test_tampered_entry_is_rejected(keystore_path, field):
+    _tamper(keystore_path, field)
+    with pytest.raises(KeystoreError):
+        load_keystore(keystore_path, "secreto")
+
+
+def test_unreadable_file_is_rejected(tmp_path):
+    path = tmp_path / "wallets.json"
+    path.write_text("{", encoding="utf-8")
+    with pytest.raises(KeystoreError):
+        load_keystore(str(path), "secreto")
@@ -0,0 +1,33 @@
+import pytest
+
+from conftest import make_transaction
+from exceptions import MempoolFullError
+from mempool import Mempool
+
+
+def test_iterates_by_fee_then_arrival(alice, bob):
+    mempool = Mempool()
+    low = make_transaction(alice, bob, 1, fee=0.1)
+    high = make_transaction(alice, bob, 2, fee=0.5)
+    low_later = make_transaction(alice, bob, 3, fee=0.1)
+    for tx in (low, high, low_later):
+        mempool.add(tx)
+    assert list(mempool) == [high, low, low_later]
+    assert mempool.get_pending_debit(alice.get_public_key_hex()) == pytest.approx(6.7)
+
+
+def test_full_mempool_evicts_lowest_fee(alice, bob):
+    mempool = Mempool(max_size=2)
+    cheap = make_transaction(alice, bob, 1, fee=0.1)
+    medium = make_transaction(alice, bob, 2, fee=0.2)
+    mempool.add(cheap)
+    mempool.add(medium)
+
+    with pytest.raises(MempoolFullError):
+        mempool.add(make_transaction(alice, bob, 3, fee=0.1))
+
+    expensive = make_transaction(alice, bob, 4, fee=0.3)
+    assert mempool.add(expensive) == [cheap]
+    assert list(mempool) == [expensive, medium]
+    assert cheap.get_id() not in mempool
+    assert mempool.get_pending_debit(alice.get_public_key_hex()) == pytest.approx(6.5)
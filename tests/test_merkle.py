@@ -0,0 +1,75 @@
+import hashlib
+
+import pytest
+
+from blockchain import Block
+from conftest import make_transaction
+from exceptions import InvalidBlockError, InvalidProofError
+from light_client import LightClient
+from merkle import EMPTY_MERKLE_ROOT, build_merkle_proof, compute_merkle_root, hash_pair, verify_merkle_proof
+
+
+def _ids(count):
+    return [hashlib.sha256(str(i).encode()).hexdigest() for i in range(count)]
+
+
+def test_merkle_root_duplicates_last_node_on_odd_levels():
+    a, b, c = _ids(3)
+    assert compute_merkle_root([]) == EMPTY_MERKLE_ROOT
+    assert compute_merkle_root([a]) == a
+    assert compute_merkle_root([a, b, c]) == hash_pair(hash_pair(a, b), hash_pair(c, c))
+
+
+def test_tampered_transaction_breaks_merkle_root(chain, alice, bob):
+    chain.add_transaction(make_transaction(alice, bob, 100))
+    chain.mine_pending_transactions(bob.get_public_key_hex())
+    block = chain.chain[1]
+    assert block.merkle_root == block.calculate_merkle_root()
+
+    tampered = Block.from_dict(block.to_dict())
+    tampered.transactions[1].amount = 1
+    assert tampered.calculate_merkle_root() != tampered.merkle_root
+    chain.chain[1] = tampered
+    with pytest.raises(InvalidBlockError):
+        chain.is_chain_valid()
+
+
+@pytest.mark.parametrize("count", [1, 2, 5, 8])
+def test_merkle_proof_round_trip(count):
+    tx_ids = _ids(count)
+    root = compute_merkle_root(tx_ids)
+    for position, tx_id in enumerate(tx_ids):
+        proof = build_merkle_proof(tx_ids, position)
+        assert verify_merkle_proof(tx_id, proof, root)
+        assert not verify_merkle_proof(_ids(count + 1)[count], proof, root)
+
+
+def test_tampered_proof_is_rejected():
+    tx_ids = _ids(5)
+    root = compute_merkle_root(tx_ids)
+    proof = build_merkle_proof(tx_ids, 2)
+    wrong_sibling = [[_ids(6)[5], proof[0][1]]] + proof[1:]
+    wrong_side = [[proof[0][0], "left" if proof[0][1] == "right" else "right"]] + proof[1:]
+    bad_side = [[proof[0][0], "up"]] + proof[1:]
+    for tampered in (wrong_sibling, wrong_side, bad_side, proof[:-1]):
+        assert not verify_merkle_proof(tx_ids[2], tampered, root)
+
+
+def test_light_client_verifies_chain_proof(chain, alice, bob):
+    tx = make_transaction(alice, bob, 100)
+    chain.add_transaction(tx)
+    chain.add_transaction(make_transaction(alice, bob, 50))
+    chain.mine_pending_transactions(bob.get_public_key_hex())
+    client = LightClient(chain.chain[0].get_header())
+    client.add_headers(1, [block.get_header() for block in chain.chain[1:]])
+
+    proof = chain.get_merkle_proof(tx.get_id())
+    assert client.verify_transaction(tx, proof) == 1
+    with pytest.raises(InvalidProofError):
+        client.verify_transaction(tx, proof, min_confirmations=2)
+
+    tampered = dict(proof, proof=[[sibling[::-1], side] for sibling, side in proof["proof"]])
+    with pytest.raises(InvalidProofError, match="raíz de Merkle"):
+        client.verify_transaction(tx, tampered)
+    with pytest.raises(InvalidProofError):
+        client.verify_transaction(make_transaction(alice, bob, 1), proof)
@@ -0,0 +1,55 @@
+import time
+
+from blockchain import Blockchain
+from conftest import make_transaction
+from miner import BackgroundMiner
+
+
+def _wait_for(condition, timeout=30):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "tiempo de espera agotado"
+        time.sleep(0.05)
+
+
+def test_submit_mines_pending_transactions(chain, alice, bob):
+    tx = make_transaction(alice, bob, 10)
+    chain.add_transaction(tx)
+    miner = BackgroundMiner(chain, bob.get_public_key_hex())
+    block = miner.submit().result(timeout=60)
+    assert chain.get_latest_block() is block
+    assert tx.get_id() in [t.get_id() for t in block.transactions]
+    assert len(chain.mempool) == 0
+    _wait_for(lambda: not miner.running)
+
+
+def test_cancel_stops_mining_without_adding_a_block(alice, bob):
+    # Objetivo inalcanzable en la duración de la prueba: la minería solo termina al cancelarla.
+    chain = Blockchain(difficulty=16, initial_beneficiary=alice.get_public_key_hex(), initial_funds=500)
+    chain.add_transaction(make_transaction(alice, bob, 10))
+    miner = BackgroundMiner(chain, bob.get_public_key_hex())
+    future = miner.submit()
+    _wait_for(lambda: miner.running)
+
+    miner.cancel()
+    assert future.cancelled()
+    _wait_for(lambda: not miner.running)
+    assert len(chain.chain) == 1
+    assert len(chain.mempool) == 1
+    assert miner.blocks_mined == 0 and miner.last_error is None
+
+
+def test_new_transactions_refresh_the_template(alice, bob):
+    chain = Blockchain(difficulty=16, initial_beneficiary=alice.get_public_key_hex(), initial_funds=500)
+    chain.add_transaction(make_transaction(alice, bob, 10))
+    miner = BackgroundMiner(chain, bob.get_public_key_hex(), refresh_threshold=2)
+    miner.submit()
+    _wait_for(lambda: miner._template_size == 1)
+
+    chain.add_transaction(make_transaction(alice, bob, 20))
+    time.sleep(0.5)
+    assert miner.template_refreshes == 0  # Por debajo del umbral se sigue con la misma plantilla
+    chain.add_transaction(make_transaction(alice, bob, 30))
+    _wait_for(lambda: miner.template_refreshes >= 1 and miner._template_size == 3)
+    miner.stop(timeout=30)
+    assert not miner.running
@@ -0,0 +1,31 @@
+import asyncio
+import json
+
+from conftest import make_transaction
+from node_api import NodeAPI
+
+
+def _submit_batch(chain, items):
+    async def run():
+        api = NodeAPI(chain)
+        api._loop = asyncio.get_running_loop()
+        try:
+            return await api._submit_transactions(json.dumps(items).encode("utf-8"))
+        finally:
+            await api.stop()
+    return asyncio.run(run())
+
+
+def test_batch_reports_malformed_items_in_place(chain, alice, bob):
+    good = make_transaction(alice, bob, 10)
+    bad_amount = dict(make_transaction(alice, bob, 20).to_dict(), amount="veinte")
+    missing_key = {"sender": alice.get_public_key_hex()}
+
+    response = _submit_batch(chain, [bad_amount, good.to_dict(), missing_key])
+
+    assert response["accepted"] == 1
+    results = response["results"]
+    assert [item["accepted"] for item in results] == [False, True, False]
+    assert results[0]["type"] == results[2]["type"] == "InvalidTransactionError"
+    assert results[1]["id"] == good.get_id()
+    assert good.get_id() in chain.mempool
@@ -0,0 +1,55 @@
+import pytest
+
+from blockchain import Blockchain
+from conftest import make_transaction
+from exceptions import DuplicateTransactionError, SnapshotError
+
+
+def _mine_blocks(chain, sender, recipient, count):
+    for _ in range(count):
+        chain.add_transaction(make_transaction(sender, recipient, 1))
+        chain.mine_pending_transactions(recipient.get_public_key_hex())
+
+
+def test_bootstrap_from_snapshot_then_follow_chain(chain, alice, bob):
+    _mine_blocks(chain, alice, bob, 3)
+    snapshot = chain.create_snapshot(height=2)
+    node = Blockchain(difficulty=1, snapshot=snapshot)
+    assert len(node.chain) == 2
+
+    for block in chain.chain[2:]:
+        node.add_block(block)
+    assert node.get_latest_block().hash == chain.get_latest_block().hash
+    assert node.get_balance(alice.get_public_key_hex()) == chain.get_balance(alice.get_public_key_hex())
+    assert node.get_balance(bob.get_public_key_hex()) == chain.get_balance(bob.get_public_key_hex())
+    assert node.is_chain_valid()
+    node.verify_ledger()
+
+
+def test_tampered_snapshot_is_rejected(chain, alice, bob):
+    _mine_blocks(chain, alice, bob, 2)
+    snapshot = chain.create_snapshot()
+    snapshot["balances"][bob.get_public_key_hex()] += 1000
+    with pytest.raises(SnapshotError, match="hash"):
+        Blockchain(difficulty=1, snapshot=snapshot)
+
+
+def test_prune_keeps_balances_and_validity(chain, alice, bob):
+    _mine_blocks(chain, alice, bob, 2)
+    spent = make_transaction(alice, bob, 5)
+    chain.add_transaction(spent)
+    chain.mine_pending_transactions(bob.get_public_key_hex())
+    _mine_blocks(chain, alice, bob, 1)
+    balances = {address: chain.get_balance(address) for address in (alice.get_public_key_hex(),
+                                                                     bob.get_public_key_hex())}
+    snapshot_hash = chain.create_snapshot(height=4)["hash"]
+
+    chain.prune(4)
+    assert chain.chain[3].transactions is None
+    assert chain.chain[4].transactions is not None
+    assert chain.is_chain_valid()
+    chain.verify_ledger()
+    assert {address: chain.get_balance(address) for address in balances} == balances
+    assert chain.create_snapshot(height=4)["hash"] == snapshot_hash
+    with pytest.raises(DuplicateTransactionError):
+        chain.add_transaction(spent)
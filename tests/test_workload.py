@@ -0,0 +1,25 @@
+from exceptions import InvalidTransactionError
+from workload import WorkloadGenerator
+
+
+def _generator():
+    generator = WorkloadGenerator(wallets=2, transactions=0, difficulty=1, attack_rate=1.0)
+    generator.fund_wallets()
+    return generator
+
+
+def test_double_spend_is_detected_when_second_payment_is_rejected():
+    generator = _generator()
+    generator.run_attack("double_spend")
+    assert generator.attacks["double_spend"] == {"attempted": 1, "detected": 1, "skipped": 0, "failed_setup": 0}
+
+
+def test_double_spend_with_rejected_first_payment_is_a_failed_setup(monkeypatch):
+    generator = _generator()
+
+    def reject(transaction):
+        raise InvalidTransactionError("rechazada")
+
+    monkeypatch.setattr(generator.blockchain, "add_transaction", reject)
+    generator.run_attack("double_spend")
+    assert generator.attacks["double_spend"] == {"attempted": 0, "detected": 0, "skipped": 0, "failed_setup": 1}
@@ -5,3 +5,23 @@ Contiene constantes y valores de configuración para la simulación de la blockc
 COINBASE_SENDER = "Sistema_Recompensa"
 MINING_REWARD = 100
 INITIAL_FUNDS = 500  # Fondos iniciales para Alice en el bloque génesis
+MEMPOOL_MAX_SIZE = 5000  # Máximo de transacciones pendientes en memoria
+MAX_BLOCK_TRANSACTIONS = 1000  # Máximo de transacciones (sin contar la recompensa) por bloque
+VERIFYING_KEY_CACHE_SIZE = 1024  # Claves públicas ya parseadas (ecdsa.VerifyingKey)
+VERIFYING_KEY_PRECOMPUTE_USES = 8  # Usos de una clave pública antes de precalcular sus tablas de verificación
+SIGNATURE_CACHE_SIZE = 100000  # Pares (resumen de datos firmados, firma) ya verificados
+PARALLEL_VERIFY_MIN_BATCH = 64  # Firmas pendientes a partir de las cuales un lote se verifica en varios procesos
+AUDIT_SHARD_SIZE = 64  # Bloques por tramo en la auditoría paralela de la cadena
+BLOCK_STORE_SEGMENT_SIZE = 16 * 1024 * 1024  # Tamaño máximo (bytes) de cada segmento del almacén de bloques
+BLOCK_CACHE_SIZE = 256  # Bloques decodificados que se mantienen en memoria al leer desde disco
+P2P_SEEN_CACHE_SIZE = 10000  # Identificadores de transacciones y bloques ya difundidos por un nodo
+SYNC_HEADERS_BATCH = 2000  # Cabeceras por petición durante la sincronización
+SYNC_BLOCKS_BATCH = 50  # Bloques completos por petición durante la sincronización
+MINER_REFRESH_THRESHOLD = 100  # Transacciones nuevas que hacen rehacer la plantilla al minero en segundo plano
+CHAIN_IMPORT_BATCH = 200  # Bloques que se verifican y añaden juntos al importar una cadena (ver `chain_io.py`)
+RETARGET_INTERVAL = 10  # Bloques entre reajustes del objetivo de dificultad
+RETARGET_MAX_FACTOR = 4  # Máximo factor de cambio del objetivo en cada reajuste
+MEDIAN_TIME_SPAN = 11  # Bloques anteriores cuya mediana de marcas de tiempo debe superar un bloque nuevo
+MAX_FUTURE_BLOCK_TIME = 2 * 60 * 60  # Segundos que la marca de tiempo de un bloque puede adelantarse al reloj local
+REORG_MAX_DEPTH = 100  # Bloques que una reorganización puede deshacer (registros de deshacer que se guardan)
+KEYSTORE_SCRYPT_N = 2 ** 14  # Coste de scrypt al derivar la clave de cifrado del almacén de billeteras
@@ -1,24 +1,108 @@
 import ecdsa
 import binascii
 import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from mining import resolve_workers
 
 class Wallet:
-    def __init__(self):
-        # Generación de clave privada usando la curva SECP256k1, estándar en Bitcoin/Ethereum
-        # [21, 56] - La aleatoriedad aquí es crítica para la seguridad.
-        self.private_key = ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1)
+    def __init__(self, private_key=None):
+        """
+        Sin argumentos genera un par de claves nuevo. Con `private_key` (bytes crudos de la
+        clave privada) reconstruye una billetera existente.
+        """
+        if private_key is None:
+            # Generación de clave privada usando la curva SECP256k1, estándar en Bitcoin/Ethereum
+            # [21, 56] - La aleatoriedad aquí es crítica para la seguridad.
+            self._private_key = ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1)
+        else:
+            self._private_key = ecdsa.SigningKey.from_string(private_key, curve=ecdsa.SECP256k1)
         # Derivación de la clave pública verificadora
-        self.public_key = self.private_key.get_verifying_key()
-    
+        self._public_key = self._private_key.get_verifying_key()
+        self._private_bytes = None
+        self._public_bytes = None
+
+    @classmethod
+    def from_key_bytes(cls, private_bytes, public_bytes):
+        """
+        Reconstruye una billetera a partir de sus claves ya calculadas, sin repetir la
+        multiplicación de puntos que deriva la clave pública. Los objetos `ecdsa` se crean
+        solo cuando hacen falta (al firmar), así que cargar miles de billeteras es inmediato.
+        """
+        wallet = cls.__new__(cls)
+        wallet._private_key = None
+        wallet._public_key = None
+        wallet._private_bytes = private_bytes
+        wallet._public_bytes = public_bytes
+        return wallet
+
+    @property
+    def private_key(self):
+        if self._private_key is None:
+            self._private_key = ecdsa.SigningKey.from_string(self._private_bytes, curve=ecdsa.SECP256k1)
+        return self._private_key
+
+    @property
+    def public_key(self):
+        if self._public_key is None:
+            self._public_key = ecdsa.VerifyingKey.from_string(self._public_bytes, curve=ecdsa.SECP256k1)
+        return self._public_key
+
+    def get_private_key_bytes(self):
+        if self._private_bytes is None:
+            self._private_bytes = self.private_key.to_string()
+        return self._private_bytes
+
+    def get_public_key_bytes(self):
+        if self._public_bytes is None:
+            self._public_bytes = self.public_key.to_string()
+        return self._public_bytes
+
     def get_public_key_hex(self):
         # Exportamos la clave pública a formato hexadecimal para usarla como dirección
-        return binascii.hexlify(self.public_key.to_string()).decode('utf-8')
+        return binascii.hexlify(self.get_public_key_bytes()).decode('utf-8')
 
-    def sign_transaction(self, message_data):
+    def sign_transaction(self, message_data, deterministic=True):
         """
-        Firma criptográfica de un mensaje arbitrario.
-        Utiliza ECDSA con SHA256 como función de resumen interna.
+        Firma criptográfica de un mensaje arbitrario (texto o bytes).
+        Utiliza ECDSA con SHA256 como función de resumen interna. Por defecto el nonce de
+        la firma se deriva de la clave y el mensaje (RFC 6979): no depende del generador
+        aleatorio y el mismo mensaje produce siempre la misma firma.
+        La firma se emite en forma canónica (`s` bajo, ver `sigcache.is_canonical_signature`).
         """
         # [22, 58] - El mensaje se codifica a bytes antes de firmar
-        signature = self.private_key.sign(message_data.encode('utf-8'), hashfunc=hashlib.sha256)
-        return binascii.hexlify(signature).decode('utf-8')
\ No newline at end of file
+        if isinstance(message_data, str):
+            message_data = message_data.encode('utf-8')
+        if deterministic:
+            signature = self.private_key.sign_deterministic(
+                message_data, hashfunc=hashlib.sha256, sigencode=ecdsa.util.sigencode_string_canonize
+            )
+        else:
+            signature = self.private_key.sign(
+                message_data, hashfunc=hashlib.sha256, sigencode=ecdsa.util.sigencode_string_canonize
+            )
+        return binascii.hexlify(signature).decode('utf-8')
+
+def _generate_key_bytes(count):
+    """Proceso trabajador: genera `count` pares de claves y retorna sus bytes crudos."""
+    keys = []
+    for _ in range(count):
+        private_key = ecdsa.SigningKey.generate(curve=ecdsa.SECP256k1)
+        keys.append((private_key.to_string(), private_key.get_verifying_key().to_string()))
+    return keys
+
+def generate_wallets(count, workers=None, chunk_size=64):
+    """
+    Genera `count` billeteras repartiendo la generación de claves entre `workers` procesos
+    (`None` usa todos los núcleos; con 1 no se crean procesos).
+    """
+    workers = resolve_workers(workers)
+    if workers == 1 or count <= chunk_size:
+        return [Wallet() for _ in range(count)]
+    chunks = [min(chunk_size, count - start) for start in range(0, count, chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [
+            Wallet.from_key_bytes(private_bytes, public_bytes)
+            for keys in executor.map(_generate_key_bytes, chunks)
+            for private_bytes, public_bytes in keys
+        ]
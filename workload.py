@@ -0,0 +1,272 @@
+"""
+Generador de carga sin interfaz para `Blockchain`.
+
+Crea N billeteras, las financia desde el bloque génesis y después envía transacciones
+firmadas a un ritmo objetivo a través de `Blockchain.add_transaction`, minando cada
+`mine_interval` segundos o cuando la mempool alcanza `mine_threshold` transacciones.
+Opcionalmente intercala los escenarios de ataque del simulador (firma inválida, doble
+gasto e inmutabilidad) y comprueba que la defensa los detecta.
+
+El ritmo es de lazo abierto: la transacción i se programa en `inicio + i / tx_rate`
+y su latencia se mide desde ese instante, así que el tiempo que el envío queda
+bloqueado por la minería cuenta como latencia en lugar de ocultarse.
+
+Con la misma semilla se repiten las mismas billeteras, remitentes, montos, comisiones
+y ataques. Los bloques solo se repiten exactamente si se mina por tamaño
+(`mine_interval=None`), porque la minería por tiempo depende del reloj.
+"""
+
+import random
+import time
+
+import ecdsa
+
+from audit import verify_block
+from blockchain import Block, Blockchain, Transaction
+from exceptions import BlockchainError, InsufficientFundsError, InvalidBlockError, InvalidSignatureError
+from utils import MAX_BLOCK_TRANSACTIONS
+from wallet import Wallet
+
+# Fondos que recibe cada billetera de carga antes de empezar a medir.
+FUNDS_PER_WALLET = 1000
+
+ATTACKS = ("invalid_signature", "double_spend", "immutability")
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def seeded_wallets(count, rng):
+    """Billeteras cuyas claves privadas salen de `rng`, para que la semilla las reproduzca."""
+    order = ecdsa.SECP256k1.order
+    return [Wallet(rng.randrange(1, order).to_bytes(32, "big")) for _ in range(count)]
+
+
+class WorkloadGenerator:
+    def __init__(self, wallets=100, tx_rate=200, transactions=2000, mine_interval=2.0, mine_threshold=500,
+                 attack_rate=0.0, seed=1, difficulty=3, mining_workers=1, max_amount=10, max_fee=0.5):
+        self.tx_rate = tx_rate
+        self.transactions = transactions
+        self.mine_interval = mine_interval
+        self.mine_threshold = mine_threshold
+        self.attack_rate = attack_rate
+        self.mining_workers = mining_workers
+        self.max_amount = max_amount
+        self.max_fee = max_fee
+        self.rng = random.Random(seed)
+        self.seed = seed
+
+        self.funder, self.miner = seeded_wallets(2, self.rng)
+        self.wallets = seeded_wallets(wallets, self.rng)
+        self.blockchain = Blockchain(
+            difficulty=difficulty,
+            initial_beneficiary=self.funder.get_public_key_hex(),
+            initial_funds=FUNDS_PER_WALLET * wallets,
+        )
+
+        self.submitted_at = {}  # tx_id -> instante programado de envío
+        self.admission_latencies = []
+        self.confirmation_latencies = []
+        self.rejections = {}
+        self.accepted = 0
+        self.blocks = []
+        self.mining_seconds = 0.0
+        # `failed_setup`: el escenario no llegó a ejecutarse como ataque (p. ej. se rechazó el paso legítimo).
+        self.attacks = {name: {"attempted": 0, "detected": 0, "skipped": 0, "failed_setup": 0} for name in ATTACKS}
+
+    def fund_wallets(self):
+        """Reparte `FUNDS_PER_WALLET` a cada billetera, minando un bloque por cada lote."""
+        funder_address = self.funder.get_public_key_hex()
+        for start in range(0, len(self.wallets), MAX_BLOCK_TRANSACTIONS):
+            for wallet in self.wallets[start:start + MAX_BLOCK_TRANSACTIONS]:
+                tx = Transaction(funder_address, wallet.get_public_key_hex(), FUNDS_PER_WALLET)
+                tx.sign(self.funder)
+                self.blockchain.add_transaction(tx)
+            self.blockchain.mine_pending_transactions(self.miner.get_public_key_hex(), workers=self.mining_workers)
+
+    def mine(self):
+        """Mina un bloque con lo pendiente y registra la latencia de confirmación de sus transacciones."""
+        start = time.perf_counter()
+        block = self.blockchain.mine_pending_transactions(self.miner.get_public_key_hex(), workers=self.mining_workers)
+        now = time.perf_counter()
+        self.mining_seconds += now - start
+        if block is None:
+            return None
+        self.blocks.append(len(block.transactions) - 1)
+        for tx in block.transactions[1:]:
+            submitted = self.submitted_at.pop(tx.get_id(), None)
+            if submitted is not None:
+                self.confirmation_latencies.append(now - submitted)
+        return block
+
+    def next_transaction(self):
+        sender, recipient = self.rng.sample(self.wallets, 2)
+        amount = round(self.rng.uniform(1, self.max_amount), 2)
+        fee = round(self.rng.uniform(0, self.max_fee), 2)
+        tx = Transaction(sender.get_public_key_hex(), recipient.get_public_key_hex(), amount, fee=fee)
+        tx.sign(sender)
+        return tx
+
+    def submit(self, tx, scheduled):
+        try:
+            self.blockchain.add_transaction(tx)
+        except BlockchainError as e:
+            reason = type(e).__name__
+            self.rejections[reason] = self.rejections.get(reason, 0) + 1
+        else:
+            self.accepted += 1
+            self.submitted_at[tx.get_id()] = scheduled
+        self.admission_latencies.append(time.perf_counter() - scheduled)
+
+    def run_attack(self, name):
+        """Ejecuta un escenario de ataque; se cuenta como detectado si la defensa lo rechaza."""
+        stats = self.attacks[name]
+        wallet, other = self.rng.sample(self.wallets, 2)
+        if name == "invalid_signature":
+            # Se copia la firma de una transacción legítima en otra con el monto alterado.
+            legit = Transaction(wallet.get_public_key_hex(), other.get_public_key_hex(), 1)
+            legit.sign(wallet)
+            forged = Transaction(wallet.get_public_key_hex(), self.miner.get_public_key_hex(), 1000)
+            forged.signature = legit.signature
+            stats["attempted"] += 1
+            try:
+                self.blockchain.add_transaction(forged)
+            except InvalidSignatureError:
+                stats["detected"] += 1
+        elif name == "double_spend":
+            address = wallet.get_public_key_hex()
+            available = self.blockchain.get_balance(address) - self.blockchain.mempool.get_pending_debit(address)
+            amount = round(available * 0.75, 2)
+            if amount <= 0:
+                stats["skipped"] += 1
+                return
+            first = Transaction(address, other.get_public_key_hex(), amount)
+            first.sign(wallet)
+            second = Transaction(address, self.miner.get_public_key_hex(), amount)
+            second.sign(wallet)
+            # Solo es un doble gasto si el primer pago se acepta; entonces el segundo debe rechazarse.
+            try:
+                self.blockchain.add_transaction(first)
+            except BlockchainError:
+                stats["failed_setup"] += 1
+                return
+            try:
+                self.blockchain.add_transaction(second)
+            except InsufficientFundsError:
+                stats["attempted"] += 1
+                stats["detected"] += 1
+            except BlockchainError:
+                stats["failed_setup"] += 1
+            else:
+                stats["attempted"] += 1
+        elif name == "immutability":
+            chain = self.blockchain.chain
+            if len(chain) < 2:
+                stats["skipped"] += 1
+                return
+            # Se altera una copia de un bloque minado para no corromper la cadena de la prueba.
+            height = self.rng.randrange(1, len(chain))
+            tampered = Block.from_dict(chain[height].to_dict())
+            tampered.transactions[-1].amount += 1
+            stats["attempted"] += 1
+            try:
+                verify_block(tampered, chain[height - 1].hash)
+            except InvalidBlockError:
+                stats["detected"] += 1
+
+    def mining_due(self, last_mined):
+        if self.mine_threshold and len(self.blockchain.mempool) >= self.mine_threshold:
+            return True
+        return self.mine_interval is not None and time.perf_counter() - last_mined >= self.mine_interval
+
+    def run(self):
+        """Financia las billeteras, genera la carga, mina lo que quede pendiente y retorna el informe."""
+        self.fund_wallets()
+        start = last_mined = time.perf_counter()
+        for i in range(self.transactions):
+            scheduled = start + i / self.tx_rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if self.mining_due(last_mined):
+                self.mine()
+                last_mined = time.perf_counter()
+            if self.attack_rate and self.rng.random() < self.attack_rate:
+                self.run_attack(self.rng.choice(ATTACKS))
+            self.submit(self.next_transaction(), scheduled)
+        submit_elapsed = time.perf_counter() - start
+
+        # Drenado: se mina lo pendiente para medir la confirmación de todo lo aceptado.
+        while len(self.blockchain.mempool) and self.mine() is not None:
+            pass
+        return self.report(submit_elapsed, time.perf_counter() - start)
+
+    def report(self, submit_elapsed, total_elapsed):
+        rejected = sum(self.rejections.values())
+        submitted = self.accepted + rejected
+        confirmed = len(self.confirmation_latencies)
+        return {
+            "seed": self.seed,
+            "wallets": len(self.wallets),
+            "target_tx_rate": self.tx_rate,
+            "submitted": submitted,
+            "accepted": self.accepted,
+            "rejected": rejected,
+            "rejection_rate": rejected / submitted if submitted else 0.0,
+            "rejections": dict(sorted(self.rejections.items())),
+            "submit_seconds": submit_elapsed,
+            "offered_tx_per_second": submitted / submit_elapsed if submit_elapsed else 0.0,
+            "confirmed": confirmed,
+            "unconfirmed": len(self.submitted_at),
+            "confirmed_tx_per_second": confirmed / total_elapsed if total_elapsed else 0.0,
+            "admission_latency": {
+                "p50": percentile(self.admission_latencies, 0.50),
+                "p95": percentile(self.admission_latencies, 0.95),
+                "p99": percentile(self.admission_latencies, 0.99),
+            },
+            "confirmation_latency": {
+                "p50": percentile(self.confirmation_latencies, 0.50),
+                "p95": percentile(self.confirmation_latencies, 0.95),
+                "p99": percentile(self.confirmation_latencies, 0.99),
+            },
+            "blocks": len(self.blocks),
+            "mean_block_transactions": sum(self.blocks) / len(self.blocks) if self.blocks else 0.0,
+            "mining_seconds": self.mining_seconds,
+            "attacks": {name: stats for name, stats in self.attacks.items() if self.attack_rate},
+        }
+
+
+def format_report(report):
+    """Informe legible de `WorkloadGenerator.report`."""
+    ms = lambda seconds: f"{seconds * 1000:.2f} ms"  # noqa: E731
+    admission = report["admission_latency"]
+    confirmation = report["confirmation_latency"]
+    lines = [
+        f"--- Informe de carga (semilla {report['seed']}, {report['wallets']} billeteras) ---",
+        f"Enviadas: {report['submitted']} en {report['submit_seconds']:.2f} s "
+        f"({report['offered_tx_per_second']:.1f} tx/s; objetivo {report['target_tx_rate']} tx/s)",
+        f"Aceptadas: {report['accepted']} | Rechazadas: {report['rejected']} "
+        f"({report['rejection_rate']:.1%})",
+    ]
+    for reason, count in report["rejections"].items():
+        lines.append(f"  - {reason}: {count}")
+    lines += [
+        f"Confirmadas: {report['confirmed']} ({report['confirmed_tx_per_second']:.1f} tx/s) | "
+        f"Sin confirmar: {report['unconfirmed']}",
+        f"Latencia de admisión: p50 {ms(admission['p50'])} | p95 {ms(admission['p95'])} | p99 {ms(admission['p99'])}",
+        f"Latencia de confirmación: p50 {ms(confirmation['p50'])} | p95 {ms(confirmation['p95'])} | "
+        f"p99 {ms(confirmation['p99'])}",
+        f"Bloques: {report['blocks']} (media {report['mean_block_transactions']:.1f} tx) | "
+        f"Tiempo minando: {report['mining_seconds']:.2f} s",
+    ]
+    for name, stats in report["attacks"].items():
+        lines.append(
+            f"Ataque {name}: {stats['detected']}/{stats['attempted']} detectados"
+            + (f" ({stats['skipped']} omitidos)" if stats["skipped"] else "")
+            + (f" ({stats['failed_setup']} con preparación fallida)" if stats["failed_setup"] else "")
+        )
+    return "\n".join(lines)